@@ -2,16 +2,31 @@
 
 from __future__ import annotations
 
+import hmac
+import logging
 import os
+import threading
+import time
+from datetime import datetime
 from pathlib import Path
-from fastapi import FastAPI, Query
+from typing import List
+
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, StreamingResponse
 
+from flood_ai import metrics, serving, storage
+from flood_ai.executor import AssessmentExecutor, ExecutorSaturated
+from flood_ai.export import ExportUnavailable, stream_arrow, stream_csv
+from flood_ai.feed import AssessmentFeed
+from flood_ai.model_registry import WATCH_INTERVAL_ENV, ModelReloader
 from flood_ai.input_schema import ScenarioPayload
+from flood_ai.whatif import SweepTooLarge, WhatIfAnalyzer, WhatIfRequest
 from flood_ai.workflow import FloodAssessmentService
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI(title="GoI Flood AI Prototype", version="0.1.0")
 app.add_middleware(
     CORSMiddleware,
@@ -19,14 +34,113 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
+# with FLOOD_AI_FAST_START=1 artifacts load in the background once the server is up
 service = FloodAssessmentService()
+# scoring and persistence run off the event loop (FLOOD_AI_EXECUTOR / _POOL_SIZE / _MAX_PENDING)
+executor = AssessmentExecutor.from_env(service)
+feed = AssessmentFeed.from_env()
+# versioned artifacts can be swapped in without a restart (FLOOD_AI_MODEL_WATCH_INTERVAL)
+reloader = ModelReloader.from_env(service.scorer)
+reloader.add_listener(executor.recycle)
+MAX_BATCH_SIZE = int(os.getenv("FLOOD_AI_MAX_BATCH_SIZE", "5000"))
+# what-if sweeps score synthetic points only; nothing is recorded (FLOOD_AI_MAX_SWEEP_POINTS)
+whatif = WhatIfAnalyzer.from_env(service.scorer)
+# raw rows past FLOOD_AI_RAW_RETENTION_DAYS are compacted into the rollups periodically
+compaction = storage.retention_scheduler()
+# component stats are read when /metrics is scraped; stage timers record as requests run
+metrics.REGISTRY.register_collector(
+    "executor", executor.stats, counters=("submitted", "completed", "failed", "rejected")
+)
+metrics.REGISTRY.register_collector(
+    "storage",
+    storage.storage_metrics,
+    counters=("enqueued", "written", "batches", "backpressure_events", "sync_writes", "write_errors", "compactions"),
+)
+metrics.REGISTRY.register_collector(
+    "alerts", service.alerts.stats, counters=("assessments", "alerts", "suppressed")
+)
+metrics.REGISTRY.register_collector(
+    "cache",
+    lambda: service.scorer.cache.stats() if service.scorer.cache is not None else {},
+    counters=("hits", "misses", "evictions", "expirations", "invalidations"),
+)
 
 # Mount the static web UI at root (development convenience)
 web_dir = Path(__file__).parent / "web"
 app.mount("/static", StaticFiles(directory=str(web_dir)), name="static")
 
 
+def warm_up() -> None:
+    """Load artifacts and score once; requests arriving meanwhile wait for the load."""
+    try:
+        seconds = service.warm_up()
+    except Exception:
+        logger.exception("Background warm-up failed; artifacts will load on the first request")
+        return
+    logger.info("Scoring service warmed up in %.3fs", seconds)
+
+
+@app.on_event("startup")
+async def start_model_watcher():
+    reloader.start()
+    if serving.is_worker() and not reloader.watching:
+        logger.warning(
+            "Pre-fork worker without %s: /admin/model/reload is disabled and workers keep their startup model",
+            WATCH_INTERVAL_ENV,
+        )
+    if serving.is_worker() and serving.is_primary():
+        logger.warning("Alert state is per worker under the pre-fork server; /alerts needs a single worker")
+    if serving.is_primary():
+        # one compaction pass per database: pre-fork workers other than 0 leave it to worker 0
+        compaction.start()
+    if not service.scorer.loaded:
+        threading.Thread(target=warm_up, name="flood-ai-warm-up", daemon=True).start()
+
+
+@app.on_event("shutdown")
+async def flush_storage():
+    # finish in-flight assessments, then commit any queued writes before the worker exits
+    reloader.stop()
+    compaction.stop()
+    metrics.profiler.stop()
+    executor.shutdown()
+    storage.shutdown()
+
+
+ADMIN_TOKEN_ENV = "FLOOD_AI_ADMIN_TOKEN"
+_LOOPBACK_HOSTS = {"127.0.0.1", "::1", "localhost"}
+
+
+def require_admin(request: Request, x_admin_token: str | None = Header(default=None)) -> None:
+    """Guard for ``/admin/*``: the ``FLOOD_AI_ADMIN_TOKEN`` header when set, else loopback clients only."""
+    token = os.getenv(ADMIN_TOKEN_ENV)
+    if token:
+        if x_admin_token is None or not hmac.compare_digest(x_admin_token, token):
+            raise HTTPException(status_code=401, detail="Missing or invalid X-Admin-Token")
+        return
+    client = request.client.host if request.client else None
+    if client not in _LOOPBACK_HOSTS:
+        raise HTTPException(status_code=403, detail=f"Admin endpoints are local-only unless {ADMIN_TOKEN_ENV} is set")
+
+
+def _saturated(exc: ExecutorSaturated) -> HTTPException:
+    return HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "1"})
+
+
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    # label by route template so path parameters do not create new series
+    route = getattr(request.scope.get("route"), "path", "unmatched")
+    metrics.REQUEST_SECONDS.observe(
+        time.perf_counter() - started, request.method, route, str(response.status_code)
+    )
+    return response
+
+
 @app.get("/")
 async def root_index():
     return RedirectResponse(url="/static/home.html")
@@ -34,10 +148,231 @@ async def root_index():
 
 @app.post("/assess")
 async def assess(payload: ScenarioPayload):
-    return service.assess(payload).to_dict()
+    try:
+        assessment = await executor.assess(payload)
+    except ExecutorSaturated as exc:
+        raise _saturated(exc) from exc
+    with metrics.stage("serialize"):
+        return assessment.to_dict()
+
+
+@app.post("/assess/batch")
+async def assess_batch(payloads: List[ScenarioPayload]):
+    if len(payloads) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {MAX_BATCH_SIZE} scenarios")
+    try:
+        assessments = await executor.assess_many(payloads)
+    except ExecutorSaturated as exc:
+        raise _saturated(exc) from exc
+    with metrics.stage("serialize"):
+        return {"items": [assessment.to_dict() for assessment in assessments]}
+
+
+@app.post("/whatif")
+def what_if(request: WhatIfRequest):
+    # plain ``def``: FastAPI runs the vectorized sweep in its threadpool
+    try:
+        result = whatif.sweep(request.base, request.grid, mode=request.mode, relative=request.relative)
+    except SweepTooLarge as exc:
+        raise HTTPException(status_code=413, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    return result.to_dict()
+
+
+@app.get("/serving/stats")
+async def serving_stats():
+    # per-process view: with pre-fork serving each worker reports its own memory
+    return {
+        "worker": serving.worker_report(),
+        "model_loaded": service.scorer.loaded,
+        "executor": executor.stats(),
+        "storage": storage.storage_metrics(),
+    }
+
 
+@app.get("/metrics")
+def prometheus_metrics():
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
+
+@app.get("/admin/profiler", dependencies=[Depends(require_admin)])
+def profiler_status(format: str = Query(default="json", pattern="^(json|collapsed)$"), limit: int = 20):
+    if format == "collapsed":
+        # flame graph input: one "frame;frame;frame count" line per distinct stack
+        return Response(content=metrics.profiler.collapsed(), media_type="text/plain")
+    return metrics.profiler.status(limit=limit)
+
+
+@app.post("/admin/profiler", dependencies=[Depends(require_admin)])
+def toggle_profiler(enabled: bool, interval: float | None = Query(default=None, gt=0), reset: bool = False):
+    if reset:
+        metrics.profiler.reset()
+    if enabled:
+        metrics.profiler.start(interval)
+    else:
+        metrics.profiler.stop()
+    return metrics.profiler.status(limit=0)
+
+
+@app.get("/admin/model", dependencies=[Depends(require_admin)])
+def model_status():
+    return reloader.status()
+
+
+@app.post("/admin/model/reload", dependencies=[Depends(require_admin)])
+def reload_model(version: str | None = None):
+    # runs on the threadpool: the new version loads while scoring continues on the old one
+    if serving.is_worker() and not reloader.watching:
+        # this request reaches one worker; the others only see a change through CURRENT
+        raise HTTPException(
+            status_code=409,
+            detail=f"Reloading under the pre-fork server needs {WATCH_INTERVAL_ENV} so every worker follows CURRENT",
+        )
+    try:
+        if serving.is_worker():
+            return reloader.publish(version)
+        return reloader.reload(version)
+    except ValueError as exc:  # not a plain version name (path separators, "..", absolute)
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+
+
+# The read endpoints below block on SQLite, so they are plain ``def`` handlers that
+# FastAPI runs on its threadpool rather than on the event loop.
 @app.get("/history")
-async def history(limit: int | None = Query(default=10, ge=1, le=30)):
+def history(limit: int | None = Query(default=10, ge=1, le=30)):
     return {"items": service.history(limit=limit)}
 
+
+@app.get("/history/summary")
+def history_summary(level: str = Query(default="state", pattern="^(state|district)$"), state: str | None = None):
+    # running aggregates of this process's ledger; O(1) per state; always ``{"items": [...]}``
+    if state is not None and level == "state":
+        summary = service.ledger.state_summary(state)
+        if summary is None:
+            raise HTTPException(status_code=404, detail=f"No assessments recorded for {state}")
+        return {"items": [summary]}
+    items = service.ledger.summaries(level)
+    if state is not None:
+        items = [item for item in items if item["state"] == state]
+    return {"items": items}
+
+
+@app.get("/history/feed")
+def history_feed(
+    response: Response,
+    since_id: int | None = Query(default=None, ge=0),
+    limit: int = Query(default=30, ge=1, le=500),
+    if_none_match: str | None = Header(default=None),
+):
+    etag = feed.etag(since_id=since_id, limit=limit)
+    if if_none_match == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return feed.poll(since_id=since_id, limit=limit)
+
+
+@app.get("/history/stream")
+async def history_stream(last_event_id: int | None = Header(default=None)):
+    return StreamingResponse(
+        feed.stream(last_event_id=last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/alerts")
+def alerts(since_id: int = Query(default=0, ge=0), limit: int = Query(default=100, ge=1, le=1000)):
+    # raised only on band transitions or score jumps; repeat assessments are coalesced
+    items = [alert.to_dict() for alert in service.alerts.since(since_id, limit)]
+    return {"items": items, "cursor": items[-1]["id"] if items else since_id, "stats": service.alerts.stats()}
+
+
+@app.get("/alerts/stream")
+async def alert_stream(last_event_id: int | None = Header(default=None)):
+    return StreamingResponse(
+        service.alerts.stream(last_event_id=last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/assessments/trends")
+def assessment_trends(
+    grain: str = Query(default="daily", pattern="^(hourly|daily)$"),
+    state: str | None = None,
+    district: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    by: str | None = Query(default=None, pattern="^(state|district)$"),
+    limit: int = Query(default=500, ge=1, le=5000),
+):
+    # served from the rollup tables; raw payloads are never read
+    return {
+        "items": storage.assessment_trends(
+            grain=grain, state=state, district=district, since=since, until=until, by=by, limit=limit
+        )
+    }
+
+
+@app.get("/assessments/export")
+def export_assessments(
+    format: str = Query(default="csv", pattern="^(csv|arrow)$"),
+    after_id: int = Query(default=0, ge=0),
+    limit: int | None = Query(default=None, ge=1),
+    chunk_size: int = Query(default=5000, ge=1, le=50000),
+):
+    # streamed chunk by chunk; resume an interrupted download with after_id = last id received
+    if format == "arrow":
+        try:
+            chunks = stream_arrow(after_id=after_id, chunk_size=chunk_size, limit=limit)
+            first = next(chunks)
+        except ExportUnavailable as exc:
+            raise HTTPException(status_code=501, detail=str(exc)) from exc
+
+        def body():
+            yield first
+            yield from chunks
+
+        return StreamingResponse(body(), media_type="application/vnd.apache.arrow.stream")
+    return StreamingResponse(
+        stream_csv(after_id=after_id, chunk_size=chunk_size, limit=limit),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="assessments.csv"'},
+    )
+
+
+@app.get("/assessments")
+def assessments(
+    state: str | None = None,
+    district: str | None = None,
+    band: List[str] | None = Query(default=None),
+    min_band: str | None = None,
+    min_score: float | None = None,
+    max_score: float | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    before_id: int | None = Query(default=None, ge=1),
+    after_id: int | None = Query(default=None, ge=0),
+    limit: int = Query(default=50, ge=1, le=500),
+    include_payload: bool = False,
+):
+    try:
+        return service.search_history(
+            state=state,
+            district=district,
+            bands=band,
+            min_band=min_band,
+            min_score=min_score,
+            max_score=max_score,
+            since=since,
+            until=until,
+            before_id=before_id,
+            after_id=after_id,
+            limit=limit,
+            include_payload=include_payload,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
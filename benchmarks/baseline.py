@@ -0,0 +1,66 @@
+"""Saving benchmark results and comparing them against a stored baseline."""
+
+from __future__ import annotations
+
+import json
+import platform
+import time
+from pathlib import Path
+from typing import Dict, List, Mapping
+
+Results = Dict[str, Dict[str, float]]  # case name -> metric -> value
+
+# Metrics where a larger value is better; every other metric is a latency.
+HIGHER_IS_BETTER = ("throughput_rps", "rows_per_s")
+
+
+def save(path: Path, results: Results, **meta: object) -> None:
+    document = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        **meta,
+        "results": results,
+    }
+    path.write_text(json.dumps(document, indent=2, sort_keys=True), encoding="utf-8")
+
+
+def load(path: Path) -> Results:
+    return json.loads(path.read_text(encoding="utf-8"))["results"]
+
+
+def compare(current: Results, baseline: Mapping[str, Mapping[str, float]], tolerance: float) -> List[str]:
+    """Human-readable regressions beyond ``tolerance`` (0.2 = 20% worse) for shared metrics."""
+    regressions = []
+    for case, metrics in current.items():
+        reference = baseline.get(case)
+        if not reference:
+            continue
+        for metric, value in metrics.items():
+            before = reference.get(metric)
+            if not before or value is None:
+                continue
+            if metric in HIGHER_IS_BETTER:
+                worse = value < before * (1 - tolerance)
+            else:
+                worse = value > before * (1 + tolerance)
+            if worse:
+                regressions.append(f"{case} {metric}: {before:.4g} -> {value:.4g} ({(value / before - 1) * 100:+.0f}%)")
+    return regressions
+
+
+def report(current: Results, baseline_path: Path | None, tolerance: float) -> int:
+    """Print the comparison against ``baseline_path``; returns a process exit code."""
+    if baseline_path is None:
+        return 0
+    if not baseline_path.exists():
+        print(f"no baseline at {baseline_path}; run with --save-baseline first")
+        return 0
+    regressions = compare(current, load(baseline_path), tolerance)
+    if not regressions:
+        print(f"no regressions beyond {tolerance:.0%} against {baseline_path}")
+        return 0
+    print(f"{len(regressions)} regression(s) beyond {tolerance:.0%} against {baseline_path}:")
+    for line in regressions:
+        print(f"  {line}")
+    return 1
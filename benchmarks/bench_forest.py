@@ -0,0 +1,90 @@
+"""Compare the compiled forest engine against sklearn's ``predict``.
+
+Usage::
+
+    python benchmarks/bench_forest.py                      # synthetic forest
+    python benchmarks/bench_forest.py --model flood_model.pkl
+
+Every batch size is checked for bit-for-bit equality before it is timed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Sequence
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from flood_ai.ensemble import EnsembleEvaluator  # noqa: E402
+from flood_ai.forest import CompiledForest  # noqa: E402
+
+
+def _synthetic_forest(n_estimators: int, max_depth: int | None) -> Any:
+    from sklearn.ensemble import RandomForestRegressor
+
+    rng = np.random.default_rng(0)
+    features = rng.normal(size=(5000, 20))
+    labels = features[:, 0] * 0.3 + features[:, 5] * 0.2 + rng.normal(0, 0.1, 5000)
+    return RandomForestRegressor(n_estimators=n_estimators, max_depth=max_depth, random_state=0).fit(
+        features, labels
+    )
+
+
+def _timeit(fn: Callable[[], Any], repeat: int) -> float:
+    """Median wall time of ``fn`` in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return float(np.median(timings))
+
+
+def run(model: Any, batch_sizes: Sequence[int], repeat: int) -> None:
+    started = time.perf_counter()
+    compiled = CompiledForest.from_estimator(model)
+    print(
+        f"compiled {compiled.n_trees} trees / {compiled.n_nodes} nodes "
+        f"(max depth {compiled.max_depth}) in {(time.perf_counter() - started) * 1000:.1f} ms"
+    )
+    sklearn_eval = EnsembleEvaluator(model, compile_trees=False)
+    compiled_eval = EnsembleEvaluator(model)
+    rng = np.random.default_rng(1)
+    print(f"{'batch':>7} {'sklearn ms':>11} {'compiled ms':>12} {'speedup':>8} {'+conf sklearn':>14} {'+conf compiled':>15}")
+    for size in batch_sizes:
+        samples = rng.normal(size=(size, compiled.n_features))
+        if not np.array_equal(compiled.predict(samples), model.predict(samples)):
+            raise SystemExit(f"compiled predictions differ from sklearn at batch size {size}")
+        base = _timeit(lambda: model.predict(samples), repeat)
+        fast = _timeit(lambda: compiled.predict(samples), repeat)
+        # prediction plus per-tree confidence, the way the scorer uses it
+        base_conf = _timeit(lambda: sklearn_eval.evaluate(samples), repeat)
+        fast_conf = _timeit(lambda: compiled_eval.evaluate(samples), repeat)
+        print(f"{size:>7} {base:>11.3f} {fast:>12.3f} {base / fast:>7.1f}x {base_conf:>14.3f} {fast_conf:>15.3f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", type=Path, help="Pickled forest (defaults to a synthetic forest)")
+    parser.add_argument("--trees", type=int, default=100, help="Trees in the synthetic forest")
+    parser.add_argument("--max-depth", type=int, default=None, help="Depth limit of the synthetic forest")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 64, 512, 4096])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.model:
+        from joblib import load
+
+        model = load(args.model)
+    else:
+        model = _synthetic_forest(args.trees, args.max_depth)
+    run(model, args.batch_sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Time each stage of the assessment pipeline per batch size and model.
+
+Usage::
+
+    python benchmarks/bench_pipeline.py                              # surrogate + synthetic forest
+    python benchmarks/bench_pipeline.py --models tree --batch-sizes 1 256
+    python benchmarks/bench_pipeline.py --save-baseline benchmarks/pipeline.json
+    python benchmarks/bench_pipeline.py --baseline benchmarks/pipeline.json --tolerance 0.25
+
+Stages are timed in isolation on the same generated scenarios: validation (pydantic per
+record vs. the columnar validator), vectorization, prediction with and without the
+per-tree confidence, driver attribution, the full ``score_many``, the response playbook,
+JSON serialization and persistence (a throwaway SQLite file). With ``--baseline`` the
+run exits non-zero when a stage's median is slower than the stored one by more than
+``--tolerance``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+# measure the pipeline itself, not the repeat-scenario cache or Monte Carlo sampling
+os.environ["FLOOD_AI_CACHE_SIZE"] = "0"
+os.environ["FLOOD_AI_UNCERTAINTY_SAMPLES"] = "0"
+
+import baseline  # noqa: E402
+from flood_ai.artifact_loader import ArtifactBundle  # noqa: E402
+from flood_ai.binding import FEATURE_FIELDS  # noqa: E402
+from flood_ai.columnar import validate_records  # noqa: E402
+from flood_ai.input_schema import ScenarioPayload  # noqa: E402
+from flood_ai.scoring import FloodRiskScorer  # noqa: E402
+from flood_ai.storage import AssessmentStore  # noqa: E402
+from flood_ai.surrogate import SurrogateRegressor  # noqa: E402
+from flood_ai.workflow import FloodAssessmentService  # noqa: E402
+
+MODELS = ("surrogate", "tree")
+
+
+def _bundle(kind: str, trees: int, model_path: Path | None) -> ArtifactBundle:
+    names = tuple(FEATURE_FIELDS)
+    if kind == "surrogate":
+        return ArtifactBundle("bench-surrogate", Path("."), names, None, SurrogateRegressor(list(names)))
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.preprocessing import StandardScaler
+
+    rng = np.random.default_rng(0)
+    features = rng.uniform(0, 100, size=(5000, len(names)))
+    labels = np.clip(features.mean(axis=1) / 100 + rng.normal(0, 0.05, 5000), 0, 1)
+    scaler = StandardScaler().fit(features)
+    if model_path is not None:
+        from joblib import load
+
+        model = load(model_path)
+    else:
+        model = RandomForestRegressor(n_estimators=trees, max_depth=12, random_state=0).fit(
+            scaler.transform(features), labels
+        )
+    return ArtifactBundle(f"bench-{kind}", Path("."), names, scaler, model)
+
+
+def _records(size: int, seed: int) -> List[Dict[str, Any]]:
+    rng = np.random.default_rng(seed)
+    values = rng.integers(0, 101, size=(size, len(FEATURE_FIELDS))).tolist()
+    return [
+        {**dict(zip(FEATURE_FIELDS, row)), "district": f"District {i % 50}", "state": f"State {i % 7}"}
+        for i, row in enumerate(values)
+    ]
+
+
+def _timeit(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Median and p95 wall time of ``fn`` in milliseconds (after one warm-up call)."""
+    fn()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {"median_ms": float(np.median(timings)), "p95_ms": float(np.percentile(timings, 95))}
+
+
+def run(
+    kind: str, bundle: ArtifactBundle, batch_sizes: Sequence[int], repeat: int, store: AssessmentStore
+) -> baseline.Results:
+    scorer = FloodRiskScorer(bundle=bundle)
+    service = FloodAssessmentService(scorer)
+    active = scorer.active_model
+    names = active.feature_names
+    results: baseline.Results = {}
+    print(f"\n{kind}: {type(active.model).__name__}, drivers via {active.attributor.method.value}")
+    print(f"{'stage':<20} {'batch':>6} {'median ms':>10} {'p95 ms':>9} {'us/row':>8}")
+    for size in batch_sizes:
+        records = _records(size, seed=size)
+        payloads = [ScenarioPayload.model_validate(record) for record in records]
+        matrix = active.binding.matrix(payloads)
+        samples = active._samples(matrix)
+        risk = scorer.score_many(payloads, matrix=matrix)
+        assessments = service.evaluate_many(payloads, matrix=matrix)
+        stored = [assessment.to_record() for assessment in assessments]
+
+        def persist() -> None:
+            store.enqueue_many(stored)
+            store.flush()
+
+        stages: Dict[str, Callable[[], Any]] = {
+            "validate_pydantic": lambda: [ScenarioPayload.model_validate(record) for record in records],
+            "validate_columnar": lambda: validate_records(records, names),
+            "vectorize": lambda: active.binding.matrix(payloads),
+            "predict": lambda: active.model.predict(samples),
+            "predict_confidence": lambda: active.predict_many(matrix),
+            "drivers": lambda: active.drivers_many(matrix, scorer.top_k),
+            "score_many": lambda: scorer.score_many(payloads, matrix=matrix),
+            "playbook": lambda: service._actions_many(risk),
+            "json": lambda: json.dumps([assessment.to_dict() for assessment in assessments]),
+            "persist": persist,
+        }
+        for stage, fn in stages.items():
+            timing = _timeit(fn, repeat)
+            results[f"{kind}/{stage}/{size}"] = timing
+            per_row = timing["median_ms"] * 1000 / size
+            print(f"{stage:<20} {size:>6} {timing['median_ms']:>10.3f} {timing['p95_ms']:>9.3f} {per_row:>8.1f}")
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--models", nargs="+", choices=MODELS, default=list(MODELS))
+    parser.add_argument("--model", type=Path, help="Pickled forest for the tree run (defaults to a synthetic one)")
+    parser.add_argument("--trees", type=int, default=100, help="Trees in the synthetic forest")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 16, 256, 4096])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--save-baseline", type=Path, help="Write the results to this JSON file")
+    parser.add_argument("--baseline", type=Path, help="Compare against a file written by --save-baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown before failing (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    results: baseline.Results = {}
+    with tempfile.TemporaryDirectory(prefix="flood-ai-bench-") as scratch:
+        store = AssessmentStore(path=Path(scratch) / "assessments.db")
+        try:
+            for kind in args.models:
+                results.update(run(kind, _bundle(kind, args.trees, args.model), args.batch_sizes, args.repeat, store))
+        finally:
+            store.close()
+    print()
+    if args.save_baseline:
+        baseline.save(args.save_baseline, results, batch_sizes=args.batch_sizes, repeat=args.repeat)
+        print(f"saved {len(results)} timings to {args.save_baseline}")
+    raise SystemExit(baseline.report(results, args.baseline, args.tolerance))
+
+
+if __name__ == "__main__":
+    main()
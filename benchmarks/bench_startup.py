@@ -0,0 +1,134 @@
+"""Measure cold-start cost: import time and time to the first assessment.
+
+Usage::
+
+    python benchmarks/bench_startup.py                        # eager vs FLOOD_AI_FAST_START=1
+    python benchmarks/bench_startup.py --repeat 9 --save-baseline benchmarks/startup.json
+    python benchmarks/bench_startup.py --baseline benchmarks/startup.json
+
+Every number comes from a fresh interpreter, so nothing is cached between runs except
+the OS page cache. In-process probes time ``import flood_ai.workflow``, building the
+service, and the first and second assessment (from the start of the import). The API
+probe times ``import api`` and the first ``POST /assess`` through the ASGI app. ``cli``
+is the wall time of ``python cli.py --input-file ...`` as a shell would see it.
+Assessments are written to a throwaway database.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+import baseline  # noqa: E402
+
+SAMPLE = REPO_ROOT / "sample_inputs" / "assam_flood.json"
+MODES = {"eager": "0", "fast": "1"}
+
+SERVICE_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import flood_ai.workflow
+imported = time.perf_counter()
+from flood_ai.input_schema import ScenarioPayload
+service = flood_ai.workflow.FloodAssessmentService()
+built = time.perf_counter()
+payload = ScenarioPayload(**json.load(open(sys.argv[1])))
+service.assess(payload)
+first = time.perf_counter()
+service.assess(payload)
+second = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "service_ms": (built - imported) * 1000,
+    "first_assessment_ms": (first - started) * 1000,
+    "second_assessment_ms": (second - first) * 1000,
+}))
+"""
+
+API_PROBE = """
+import json, sys, time
+from fastapi.testclient import TestClient
+started = time.perf_counter()
+import api
+imported = time.perf_counter()
+body = json.load(open(sys.argv[1]))
+with TestClient(api.app) as client:
+    ready = time.perf_counter()
+    assert client.post("/assess", json=body).status_code == 200
+    first = time.perf_counter()
+print(json.dumps({
+    "api_import_ms": (imported - started) * 1000,
+    "api_ready_ms": (ready - started) * 1000,
+    "api_first_assessment_ms": (first - started) * 1000,
+}))
+"""
+
+
+def _probe(code: str, env: Dict[str, str]) -> Dict[str, float]:
+    output = subprocess.run(
+        [sys.executable, "-c", code, str(SAMPLE)], cwd=REPO_ROOT, env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _cli(env: Dict[str, str]) -> Dict[str, float]:
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "cli.py", "--input-file", str(SAMPLE)], cwd=REPO_ROOT, env=env, check=True, capture_output=True
+    )
+    return {"cli_ms": (time.perf_counter() - started) * 1000}
+
+
+def run(mode: str, repeat: int, scratch: Path) -> Dict[str, float]:
+    env = {
+        **os.environ,
+        "FLOOD_AI_FAST_START": MODES[mode],
+        "FLOOD_AI_DB_PATH": str(scratch / f"{mode}.db"),
+        "PYTHONWARNINGS": "ignore",
+    }
+    samples: Dict[str, List[float]] = {}
+    for _ in range(repeat):
+        for probe in (_probe(SERVICE_PROBE, env), _probe(API_PROBE, env), _cli(env)):
+            for name, value in probe.items():
+                samples.setdefault(name, []).append(value)
+    return {name: float(np.median(values)) for name, values in samples.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per probe (median is reported)")
+    parser.add_argument("--save-baseline", type=Path, help="Write the results to this JSON file")
+    parser.add_argument("--baseline", type=Path, help="Compare against a file written by --save-baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown before failing (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    results: baseline.Results = {}
+    with tempfile.TemporaryDirectory(prefix="flood-ai-startup-") as scratch:
+        for mode in args.modes:
+            results[mode] = run(mode, args.repeat, Path(scratch))
+    metrics = list(next(iter(results.values())))
+    print(f"{'median ms':<26}" + "".join(f"{mode:>10}" for mode in results))
+    for metric in metrics:
+        print(f"{metric:<26}" + "".join(f"{results[mode][metric]:>10.1f}" for mode in results))
+    print()
+    if args.save_baseline:
+        baseline.save(args.save_baseline, results, repeat=args.repeat)
+        print(f"saved results to {args.save_baseline}")
+    raise SystemExit(baseline.report(results, args.baseline, args.tolerance))
+
+
+if __name__ == "__main__":
+    main()
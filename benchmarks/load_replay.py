@@ -0,0 +1,175 @@
+"""Replay recorded scenarios against the API at a fixed concurrency.
+
+Usage::
+
+    uvicorn api:app &                                           # then, from the repo root:
+    python benchmarks/load_replay.py --concurrency 16 --requests 2000
+    python benchmarks/load_replay.py --in-process --batch-size 50   # no server; drives api:app over ASGI
+    python benchmarks/load_replay.py --source exports/*.ndjson --save-baseline benchmarks/load.json
+    python benchmarks/load_replay.py --baseline benchmarks/load.json --tolerance 0.25
+
+Sources are JSON files holding one scenario or a list of them (``sample_inputs/`` by
+default) and NDJSON files, including the bulk-scoring envelopes. Lines that are not
+valid scenarios are skipped and counted, so a mixed log can be replayed as-is. Each
+worker sends its next request as soon as the previous one returns; the report gives
+throughput, p50/p95/p99 latency and the status codes seen.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+
+import httpx
+import numpy as np
+from pydantic import ValidationError
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+import baseline  # noqa: E402
+from flood_ai.bulk import read_ndjson  # noqa: E402
+from flood_ai.input_schema import ScenarioPayload  # noqa: E402
+
+
+def _candidates(path: Path) -> Iterable[Any]:
+    if path.suffix in {".ndjson", ".jsonl"}:
+        with path.open(encoding="utf-8") as handle:
+            for _, record in read_ndjson(handle):
+                yield record
+        return
+    data = json.loads(path.read_text(encoding="utf-8"))
+    yield from data if isinstance(data, list) else [data]
+
+
+def load_scenarios(sources: Sequence[Path]) -> tuple[List[Dict[str, Any]], int]:
+    """Valid scenario dicts from ``sources`` (files or directories) and the number skipped."""
+    scenarios: List[Dict[str, Any]] = []
+    skipped = 0
+    for source in sources:
+        paths = sorted([*source.glob("*.json"), *source.glob("*.ndjson")]) if source.is_dir() else [source]
+        for path in paths:
+            for record in _candidates(path):
+                try:
+                    ScenarioPayload.model_validate(record)
+                except ValidationError:
+                    skipped += 1
+                    continue
+                scenarios.append(record)
+    return scenarios, skipped
+
+
+async def replay(
+    client: httpx.AsyncClient,
+    scenarios: Sequence[Dict[str, Any]],
+    requests: int,
+    concurrency: int,
+    batch_size: int,
+    warmup: int,
+) -> Dict[str, Any]:
+    if batch_size > 1:
+        bodies: List[Any] = [
+            [scenarios[(i * batch_size + j) % len(scenarios)] for j in range(batch_size)] for i in range(len(scenarios))
+        ]
+        endpoint = "/assess/batch"
+    else:
+        bodies = list(scenarios)
+        endpoint = "/assess"
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+
+    async def worker(cursor: Iterator[int], timed: bool) -> None:
+        for index in cursor:  # shared iterator: each index is taken by exactly one worker
+            started = time.perf_counter()
+            try:
+                response = await client.post(endpoint, json=bodies[index % len(bodies)])
+                status = str(response.status_code)
+            except httpx.HTTPError as exc:
+                status = type(exc).__name__
+            if timed:
+                latencies.append((time.perf_counter() - started) * 1000)
+                statuses[status] += 1
+
+    # untimed requests first, so model loading and connection setup are not measured
+    warm = iter(range(warmup))
+    await asyncio.gather(*(worker(warm, timed=False) for _ in range(concurrency)))
+    measured = iter(range(warmup, warmup + requests))
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(measured, timed=True) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    timings = np.asarray(latencies)
+    return {
+        "endpoint": endpoint,
+        "elapsed_s": elapsed,
+        "statuses": dict(statuses),
+        "throughput_rps": requests / elapsed,
+        "scenarios_per_s": requests * batch_size / elapsed,
+        "p50_ms": float(np.percentile(timings, 50)),
+        "p95_ms": float(np.percentile(timings, 95)),
+        "p99_ms": float(np.percentile(timings, 99)),
+    }
+
+
+def _client(url: str, in_process: bool, timeout: float) -> httpx.AsyncClient:
+    if not in_process:
+        return httpx.AsyncClient(base_url=url, timeout=timeout)
+    import api
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=api.app), base_url="http://replay", timeout=timeout)
+
+
+async def _main(args: argparse.Namespace, scenarios: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    async with _client(args.url, args.in_process, args.timeout) as client:
+        report = await replay(client, scenarios, args.requests, args.concurrency, args.batch_size, args.warmup)
+    if args.in_process:
+        from flood_ai import storage
+
+        storage.flush()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", type=Path, nargs="+", default=[REPO_ROOT / "sample_inputs"])
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of a running api:app")
+    parser.add_argument("--in-process", action="store_true", help="Drive api:app over ASGI instead of a socket")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=500, help="Timed requests (sources are cycled)")
+    parser.add_argument("--batch-size", type=int, default=1, help="Scenarios per request; >1 uses /assess/batch")
+    parser.add_argument("--warmup", type=int, default=20, help="Untimed requests sent first")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--save-baseline", type=Path, help="Write the results to this JSON file")
+    parser.add_argument("--baseline", type=Path, help="Compare against a file written by --save-baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression before failing (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    scenarios, skipped = load_scenarios(args.source)
+    if not scenarios:
+        raise SystemExit(f"no valid scenarios in {', '.join(map(str, args.source))} ({skipped} records skipped)")
+    print(f"replaying {len(scenarios)} scenarios ({skipped} non-scenario records skipped)")
+    report = asyncio.run(_main(args, scenarios))
+    print(
+        f"{report['endpoint']} x{args.requests} at concurrency {args.concurrency}: "
+        f"{report['throughput_rps']:.1f} req/s ({report['scenarios_per_s']:.1f} scenarios/s) in {report['elapsed_s']:.2f} s"
+    )
+    print(f"latency p50 {report['p50_ms']:.2f} ms, p95 {report['p95_ms']:.2f} ms, p99 {report['p99_ms']:.2f} ms")
+    print(f"statuses {report['statuses']}")
+
+    case = f"{report['endpoint']}/b{args.batch_size}/c{args.concurrency}"
+    results: baseline.Results = {
+        case: {name: report[name] for name in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")}
+    }
+    if args.save_baseline:
+        baseline.save(args.save_baseline, results, requests=args.requests, in_process=args.in_process)
+        print(f"saved results to {args.save_baseline}")
+    raise SystemExit(baseline.report(results, args.baseline, args.tolerance))
+
+
+if __name__ == "__main__":
+    main()
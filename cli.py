@@ -4,11 +4,12 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
 from pathlib import Path
 from typing import Any, Dict
 
-from flood_ai.input_schema import ScenarioPayload
-from flood_ai.workflow import FloodAssessmentService
+# Each mode imports what it needs when it runs, so a single assessment or an export
+# does not pay for the bulk pipeline (and vice versa).
 
 
 def load_payload(path: Path) -> Dict[str, Any]:
@@ -18,14 +19,78 @@ def load_payload(path: Path) -> Dict[str, Any]:
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Flood detection and response prototype")
-    parser.add_argument(
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument(
         "--input-file",
         type=Path,
-        required=True,
         help="Path to a JSON file matching the ScenarioPayload schema",
     )
+    source.add_argument(
+        "--bulk",
+        type=Path,
+        metavar="FILE",
+        help="Assess every scenario in an NDJSON or CSV file (envelopes with a body/payload/scenario key are unwrapped)",
+    )
+    source.add_argument(
+        "--export",
+        type=Path,
+        metavar="FILE",
+        help="Stream stored assessments to a CSV, Parquet or Arrow file",
+    )
+    bulk = parser.add_argument_group("bulk mode")
+    bulk.add_argument("--output", type=Path, help="NDJSON results file (default: stdout)")
+    bulk.add_argument("--format", choices=["ndjson", "csv"], help="Input format (default: from the file extension)")
+    bulk.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count; 1 = inline)")
+    bulk.add_argument("--chunk-size", type=int, default=1000, help="Scenarios per worker task")
+    bulk.add_argument("--persist", action="store_true", help="Also store every assessment in the history database")
+    export = parser.add_argument_group("export mode")
+    export.add_argument("--export-format", choices=("csv", "parquet", "arrow"), help="Output format (default: from the file extension)")
+    export.add_argument("--after-id", type=int, default=0, help="Resume after this assessment id")
+    export.add_argument("--append", action="store_true", help="Append to an existing CSV without a header row")
     args = parser.parse_args()
 
+    if args.export:
+        from flood_ai.export import ExportUnavailable, export_assessments
+
+        fmt = args.export_format or {".parquet": "parquet", ".arrow": "arrow"}.get(args.export.suffix.lower(), "csv")
+        if args.append and fmt != "csv":
+            parser.error("--append only applies to CSV exports")
+        try:
+            if args.append:
+                with args.export.open("a", encoding="utf-8", newline="") as handle:
+                    report = export_assessments(
+                        handle, fmt, after_id=args.after_id, chunk_size=args.chunk_size, header=False
+                    )
+                report.output = str(args.export)
+            else:
+                report = export_assessments(args.export, fmt, after_id=args.after_id, chunk_size=args.chunk_size)
+        except ExportUnavailable as exc:
+            parser.error(str(exc))
+        print(json.dumps(report.to_dict(), indent=2), file=sys.stderr)
+        return
+
+    if args.bulk:
+        from flood_ai.binding import SchemaBindingError
+        from flood_ai.bulk import run_bulk_file
+
+        try:
+            report = run_bulk_file(
+                args.bulk,
+                args.output,
+                fmt=args.format,
+                workers=args.workers,
+                chunk_size=args.chunk_size,
+                persist=args.persist,
+                progress=sys.stderr,
+            )
+        except SchemaBindingError as exc:
+            parser.error(str(exc))
+        print(json.dumps(report.to_dict(), indent=2), file=sys.stderr)
+        return
+
+    from flood_ai.input_schema import ScenarioPayload
+    from flood_ai.workflow import FloodAssessmentService
+
     payload_dict = load_payload(args.input_file)
     scenario = ScenarioPayload(**payload_dict)
     assessment = FloodAssessmentService().assess(scenario)
@@ -34,4 +99,3 @@ def main() -> None:
 
 if __name__ == "__main__":
     main()
-
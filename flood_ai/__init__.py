@@ -1,5 +1,16 @@
 """Flood AI prototype package for detection and response."""
 
-from .workflow import FloodAssessmentService
+from __future__ import annotations
+
+from typing import Any
+
 __all__ = ["FloodAssessmentService"]
 
+
+def __getattr__(name: str) -> Any:
+    # imported on first use so ``import flood_ai.<module>`` stays cheap
+    if name == "FloodAssessmentService":
+        from .workflow import FloodAssessmentService
+
+        return FloodAssessmentService
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,271 @@
+"""Band-transition alerts: one alert per real change instead of one per assessment.
+
+``AlertTracker`` keeps the band and score each district was last alerted at in a
+dict (O(1) per assessment). An assessment raises an alert when the district is new,
+when its band changes by more than ``band_margin`` past the crossed threshold (so a
+score hovering on a boundary does not flap), or when its score moved at least
+``score_delta`` since the last alert. Everything else is coalesced: it only bumps
+the district's ``unchanged`` counter, and the next alert reports how many
+assessments it absorbed in ``suppressed``.
+
+Recent alerts are kept in a bounded buffer for polling and ``Last-Event-ID``
+catch-up; ``stream`` yields them as Server-Sent Events as they are raised.
+
+All of this state lives in the process that scored the assessment. Pre-fork workers
+(or ``uvicorn --workers``) each keep their own tracker, so the same district can alert
+once per worker and ``/alerts`` only shows what the answering worker saw. Run the
+alerting API as a single worker.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Mapping, Sequence
+
+from .scoring import BAND_ORDER, FloodRiskResult, RiskBand
+
+ALERT_SCORE_DELTA_ENV = "FLOOD_AI_ALERT_SCORE_DELTA"
+ALERT_BAND_MARGIN_ENV = "FLOOD_AI_ALERT_BAND_MARGIN"
+ALERT_BUFFER_ENV = "FLOOD_AI_ALERT_BUFFER"
+
+DEFAULT_SCORE_DELTA = 0.10
+DEFAULT_BAND_MARGIN = 0.02
+DEFAULT_BUFFER = 1000
+
+_BAND_INDEX = {band: code for code, band in enumerate(BAND_ORDER)}
+
+AlertListener = Callable[[List["Alert"]], None]
+
+
+@dataclass
+class Alert:
+    id: int
+    kind: str  # "new", "escalation", "de-escalation" or "score_jump"
+    district: str
+    state: str
+    band: str
+    score: float
+    previous_band: str | None
+    previous_score: float | None
+    timestamp: str
+    suppressed: int  # assessments coalesced since the district's previous alert
+    actions: Dict[str, str] = field(default_factory=dict)
+    model_version: str | None = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass(slots=True)
+class _DistrictState:
+    band: int  # band code and score of the last alert, the reference for the next one
+    score: float
+    last_score: float  # most recent assessment, alerted or not
+    assessments: int = 1
+    alerts: int = 1
+    unchanged: int = 0  # coalesced since the last alert
+
+
+class AlertTracker:
+    def __init__(
+        self,
+        thresholds: Mapping[RiskBand, tuple[float, float]],
+        score_delta: float = DEFAULT_SCORE_DELTA,
+        band_margin: float = DEFAULT_BAND_MARGIN,
+        buffer_size: int = DEFAULT_BUFFER,
+    ):
+        if score_delta <= 0:
+            raise ValueError("score_delta must be positive")
+        if band_margin < 0:
+            raise ValueError("band_margin must not be negative")
+        if buffer_size <= 0:
+            raise ValueError("buffer_size must be positive")
+        self.score_delta = score_delta
+        self.band_margin = band_margin
+        self._bounds = [thresholds[band] for band in BAND_ORDER]
+        self._districts: Dict[tuple[str, str], _DistrictState] = {}
+        self._recent: Deque[Alert] = deque(maxlen=buffer_size)
+        self._next_id = 1
+        self._listeners: List[AlertListener] = []
+        self._lock = threading.Lock()
+        self._stats = {"assessments": 0, "alerts": 0, "suppressed": 0}
+
+    @classmethod
+    def from_env(cls, thresholds: Mapping[RiskBand, tuple[float, float]]) -> "AlertTracker":
+        return cls(
+            thresholds,
+            score_delta=float(os.getenv(ALERT_SCORE_DELTA_ENV, str(DEFAULT_SCORE_DELTA))),
+            band_margin=float(os.getenv(ALERT_BAND_MARGIN_ENV, str(DEFAULT_BAND_MARGIN))),
+            buffer_size=int(os.getenv(ALERT_BUFFER_ENV, str(DEFAULT_BUFFER))),
+        )
+
+    # -- change detection ------------------------------------------------
+
+    def _band_changed(self, previous: int, band: int, score: float) -> bool:
+        if band == previous:
+            return False
+        if band > previous:
+            return score >= self._bounds[previous][1] + self.band_margin
+        return score <= self._bounds[previous][0] - self.band_margin
+
+    def _check(self, result: FloodRiskResult) -> tuple[str, tuple[int, float, int] | None] | None:
+        """The alert kind plus the prior (band, score, unchanged) reference, or None to coalesce."""
+        scenario = result.scenario
+        key = (scenario.district, scenario.state)
+        band = _BAND_INDEX[result.band]
+        current = self._districts.get(key)
+        if current is None:
+            self._districts[key] = _DistrictState(band=band, score=result.score, last_score=result.score)
+            return "new", None
+        current.assessments += 1
+        current.last_score = result.score
+        jumped = abs(result.score - current.score) >= self.score_delta
+        if self._band_changed(current.band, band, result.score) or (jumped and band != current.band):
+            kind = "escalation" if band > current.band else "de-escalation"
+        elif jumped:
+            kind = "score_jump"
+        else:
+            current.unchanged += 1
+            return None
+        previous = (current.band, current.score, current.unchanged)
+        current.band, current.score, current.unchanged = band, result.score, 0
+        current.alerts += 1
+        return kind, previous
+
+    def observe(
+        self, results: Sequence[FloodRiskResult], actions: Sequence[Mapping[str, str]] | None = None
+    ) -> List[Alert]:
+        """Feed assessments in order; returns (and publishes) the alerts they raise.
+
+        ``actions`` are the playbook actions already built for each result; only the
+        ones that raise an alert are copied onto it.
+        """
+        raised: List[Alert] = []
+        with self._lock:
+            for position, result in enumerate(results):
+                self._stats["assessments"] += 1
+                change = self._check(result)
+                if change is None:
+                    self._stats["suppressed"] += 1
+                    continue
+                kind, previous = change
+                alert = Alert(
+                    id=self._next_id,
+                    kind=kind,
+                    district=result.scenario.district,
+                    state=result.scenario.state,
+                    band=result.band.value,
+                    score=round(result.score, 4),
+                    previous_band=BAND_ORDER[previous[0]].value if previous else None,
+                    previous_score=round(previous[1], 4) if previous else None,
+                    timestamp=result.scenario.timestamp.isoformat(),
+                    suppressed=previous[2] if previous else 0,
+                    actions=dict(actions[position]) if actions is not None else {},
+                    model_version=result.model_version,
+                )
+                self._next_id += 1
+                self._recent.append(alert)
+                raised.append(alert)
+            self._stats["alerts"] += len(raised)
+            listeners = list(self._listeners)
+        if raised:
+            for listener in listeners:
+                listener(raised)
+        return raised
+
+    # -- reads -----------------------------------------------------------
+
+    def since(self, after_id: int = 0, limit: int = 100) -> List[Alert]:
+        """Buffered alerts with ``id > after_id``, oldest first."""
+        with self._lock:
+            recent = list(self._recent)
+        return [alert for alert in recent if alert.id > after_id][:limit]
+
+    def district(self, district: str, state: str) -> Dict[str, Any] | None:
+        with self._lock:
+            current = self._districts.get((district, state))
+            if current is None:
+                return None
+            return {
+                "district": district,
+                "state": state,
+                "band": BAND_ORDER[current.band].value,
+                "score": current.score,
+                "last_score": current.last_score,
+                "assessments": current.assessments,
+                "alerts": current.alerts,
+                "unchanged": current.unchanged,
+            }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "districts": len(self._districts),
+                "buffered": len(self._recent),
+                "last_id": self._next_id - 1,
+                "score_delta": self.score_delta,
+                "band_margin": self.band_margin,
+            }
+
+    # -- subscriptions ---------------------------------------------------
+
+    def add_listener(self, listener: AlertListener) -> None:
+        """Call ``listener(alerts)`` from the recording thread whenever alerts are raised."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: AlertListener) -> None:
+        with self._lock:
+            try:
+                self._listeners.remove(listener)
+            except ValueError:
+                pass
+
+    async def stream(
+        self, last_event_id: int | None = None, heartbeat: float = 15.0, queue_size: int = 256
+    ) -> AsyncIterator[str]:
+        """SSE frames for new alerts, after replaying buffered ones newer than ``last_event_id``."""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue[List[Alert] | None] = asyncio.Queue(maxsize=queue_size)
+
+        def offer(alerts: List[Alert] | None) -> None:
+            try:
+                queue.put_nowait(alerts)
+            except asyncio.QueueFull:
+                # slow consumer: drop the backlog and let it catch up from the buffer
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+        def deliver(alerts: List[Alert]) -> None:
+            loop.call_soon_threadsafe(offer, alerts)
+
+        self.add_listener(deliver)
+        cursor = last_event_id if last_event_id is not None else self.stats()["last_id"]
+        try:
+            pending: List[Alert] | None = self.since(cursor, limit=self._recent.maxlen or DEFAULT_BUFFER)
+            while True:
+                if pending is None:
+                    pending = self.since(cursor, limit=self._recent.maxlen or DEFAULT_BUFFER)
+                for alert in pending:
+                    if alert.id <= cursor:
+                        continue
+                    cursor = alert.id
+                    yield _frame(alert)
+                try:
+                    pending = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    pending = []
+                    yield ": keep-alive\n\n"
+        finally:
+            self.remove_listener(deliver)
+
+
+def _frame(alert: Alert) -> str:
+    return f"id: {alert.id}\nevent: {alert.kind}\ndata: {json.dumps(alert.to_dict())}\n\n"
@@ -1,25 +1,57 @@
-"""Utilities for loading pre-trained artifacts shipped with the prototype."""
+"""Utilities for loading pre-trained artifacts shipped with the prototype.
+
+Artifacts live either directly in the artifact directory (the original flat layout)
+or in versioned sub-directories::
+
+    <artifact dir>/CURRENT              # name of the active version, e.g. "2025-07-01"
+    <artifact dir>/versions/<version>/  # feature_names.pkl, flood_scaler.pkl, flood_model.pkl
+
+The ``load_*`` helpers always read the active version; ``load_bundle`` loads any
+version as one immutable unit so it can be swapped into a running scorer. joblib is
+imported on the first read, and bundles scored by the surrogate skip the scaler.
+"""
 
 from __future__ import annotations
 
+import hashlib
 import os
+import threading
 import warnings
+import weakref
+from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, Sequence, cast
-
-from joblib import load as joblib_load  # type: ignore[attr-defined]
+from typing import Any, Callable, List, Sequence, cast
 
+from .metrics import ARTIFACT_LOAD_SECONDS, timed
 from .surrogate import SurrogateRegressor
 
 ARTIFACT_DIR_ENV = "FLOOD_AI_ARTIFACT_DIR"
+USE_TRAINED_MODEL_ENV = "FLOOD_AI_USE_TRAINED_MODEL"
+ARTIFACT_FILES = ("feature_names.pkl", "flood_scaler.pkl", "flood_model.pkl")
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+
+_reload_lock = threading.Lock()
+_reload_listeners: List[weakref.ReferenceType] = []
+
+
+@dataclass(frozen=True)
+class ArtifactBundle:
+    """Everything needed to score, loaded together from one artifact version."""
+
+    version: str
+    path: Path
+    feature_names: tuple[str, ...]
+    scaler: Any
+    model: Any
 
 
 def _default_artifact_dir() -> Path:
     return Path(__file__).resolve().parents[1]
 
 
-def resolve_artifact_dir() -> Path:
+def resolve_artifact_root() -> Path:
     custom = os.getenv(ARTIFACT_DIR_ENV)
     if custom:
         custom_path = Path(custom).expanduser().resolve()
@@ -29,39 +61,90 @@ def resolve_artifact_dir() -> Path:
     return _default_artifact_dir()
 
 
-@lru_cache(maxsize=1)
-def load_feature_names(path: Path | None = None) -> Sequence[str]:
-    artifact_dir = path or resolve_artifact_dir()
+def current_version_name(root: Path | None = None) -> str | None:
+    """Active version named by ``CURRENT``, or ``None`` for the flat layout."""
+    pointer = (root or resolve_artifact_root()) / CURRENT_FILE
+    if not pointer.exists():
+        return None
+    name = pointer.read_text(encoding="utf-8").strip()
+    return name or None
+
+
+def _check_version_name(version: str) -> None:
+    if (
+        not version
+        or version in {".", ".."}
+        or any(sep in version for sep in ("/", "\\", "\x00"))
+        or Path(version).is_absolute()
+    ):
+        raise ValueError(f"Invalid artifact version name '{version}'")
+
+
+def version_dir(version: str, root: Path | None = None) -> Path:
+    """Directory of a version under ``versions/``; only plain names listed there resolve."""
+    root = root or resolve_artifact_root()
+    _check_version_name(version)
+    if version not in available_versions(root):
+        raise FileNotFoundError(f"Artifact version '{version}' not found under {root / VERSIONS_DIR}")
+    return root / VERSIONS_DIR / version
+
+
+def set_current_version(version: str, root: Path | None = None) -> None:
+    """Point ``CURRENT`` at an existing version; the file is replaced atomically."""
+    root = root or resolve_artifact_root()
+    version_dir(version, root)
+    staging = root / f".{CURRENT_FILE}.{os.getpid()}"
+    staging.write_text(f"{version}\n", encoding="utf-8")
+    os.replace(staging, root / CURRENT_FILE)
+
+
+def available_versions(root: Path | None = None) -> List[str]:
+    versions = (root or resolve_artifact_root()) / VERSIONS_DIR
+    if not versions.is_dir():
+        return []
+    return sorted(entry.name for entry in versions.iterdir() if entry.is_dir())
+
+
+def resolve_artifact_dir() -> Path:
+    root = resolve_artifact_root()
+    version = current_version_name(root)
+    return version_dir(version, root) if version else root
+
+
+def _use_surrogate_default() -> bool:
+    # the trained model is opt-in until it is retrained (see load_model)
+    return os.getenv(USE_TRAINED_MODEL_ENV, "").strip().lower() not in {"1", "true", "yes"}
+
+
+def joblib_load(path: Path, **kwargs: Any) -> Any:
+    from joblib import load  # type: ignore[attr-defined]
+
+    return load(path, **kwargs)
+
+
+def _read_feature_names(artifact_dir: Path) -> List[str]:
     file_path = artifact_dir / "feature_names.pkl"
     if not file_path.exists():
         raise FileNotFoundError(f"Missing feature name artifact at {file_path}")
-    raw_names = cast(Sequence[Any], joblib_load(file_path))
+    with timed(ARTIFACT_LOAD_SECONDS, "feature_names"):
+        raw_names = cast(Sequence[Any], joblib_load(file_path))
     if not isinstance(raw_names, (list, tuple)):
         raise ValueError("feature_names.pkl must contain a sequence of strings")
     normalized = [str(name) for name in raw_names]
     return normalized
 
 
-@lru_cache(maxsize=1)
-def load_scaler(path: Path | None = None) -> Any:
-    artifact_dir = path or resolve_artifact_dir()
+def _read_scaler(artifact_dir: Path) -> Any:
     scaler_path = artifact_dir / "flood_scaler.pkl"
     if not scaler_path.exists():
         raise FileNotFoundError(f"Missing scaler artifact at {scaler_path}")
-    return joblib_load(scaler_path)
+    with timed(ARTIFACT_LOAD_SECONDS, "scaler"):
+        return joblib_load(scaler_path)
 
 
-@lru_cache(maxsize=1)
-def load_model(path: Path | None = None, force_surrogate: bool = True) -> Any:
-    """Load the flood model, optionally forcing surrogate heuristic model.
-    
-    Args:
-        path: Optional custom artifact directory
-        force_surrogate: If True, always use surrogate model (default for prototype)
-    """
-    artifact_dir = path or resolve_artifact_dir()
+def _read_model(artifact_dir: Path, force_surrogate: bool, feature_names: Sequence[str]) -> Any:
     model_path = artifact_dir / "flood_model.pkl"
-    
+
     # Use surrogate by default since trained model has quality issues
     if force_surrogate:
         warnings.warn(
@@ -69,11 +152,15 @@ def load_model(path: Path | None = None, force_surrogate: bool = True) -> Any:
             "The original trained model produces constant predictions and needs retraining.",
             RuntimeWarning,
         )
-        feature_names = list(load_feature_names())
-        return SurrogateRegressor(feature_names)
-    
+        return SurrogateRegressor(list(feature_names))
+
     if not model_path.exists():
         raise FileNotFoundError(f"Missing model artifact at {model_path}")
+    with timed(ARTIFACT_LOAD_SECONDS, "model"):
+        return _load_model_file(model_path, feature_names)
+
+
+def _load_model_file(model_path: Path, feature_names: Sequence[str]) -> Any:
     try:
         return joblib_load(model_path, mmap_mode="r")
     except (TypeError, MemoryError):
@@ -86,6 +173,108 @@ def load_model(path: Path | None = None, force_surrogate: bool = True) -> Any:
                 "on a machine with more RAM for production use.",
                 RuntimeWarning,
             )
-            feature_names = list(load_feature_names())
-            return SurrogateRegressor(feature_names)
+            return SurrogateRegressor(list(feature_names))
+
+
+def _fingerprint(artifact_dir: Path) -> str:
+    """Short hash of the artifact files' name, size and mtime."""
+    digest = hashlib.sha1()
+    for name in ARTIFACT_FILES:
+        file_path = artifact_dir / name
+        if file_path.exists():
+            stat = file_path.stat()
+            digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()[:12]
+
+
+@lru_cache(maxsize=1)
+def load_feature_names(path: Path | None = None) -> Sequence[str]:
+    return _read_feature_names(path or resolve_artifact_dir())
+
+
+@lru_cache(maxsize=1)
+def load_scaler(path: Path | None = None) -> Any:
+    return _read_scaler(path or resolve_artifact_dir())
+
+
+@lru_cache(maxsize=1)
+def load_model(path: Path | None = None, force_surrogate: bool | None = None) -> Any:
+    """Load the flood model, optionally forcing surrogate heuristic model.
+
+    Args:
+        path: Optional custom artifact directory
+        force_surrogate: If True, always use surrogate model. Defaults to True (the
+            prototype behaviour) unless FLOOD_AI_USE_TRAINED_MODEL is set.
+    """
+    if force_surrogate is None:
+        force_surrogate = _use_surrogate_default()
+    return _read_model(path or resolve_artifact_dir(), force_surrogate, load_feature_names())
+
+
+def probe_version() -> str:
+    """Uncached name of the active version (``CURRENT``, or the flat layout's fingerprint)."""
+    root = resolve_artifact_root()
+    return current_version_name(root) or _fingerprint(root)
+
+
+@lru_cache(maxsize=1)
+def artifact_version(path: Path | None = None) -> str:
+    """Name of the active artifact version, or a fingerprint of the flat layout's files."""
+    if path is None:
+        return probe_version()
+    return _fingerprint(path)
+
+
+def current_bundle() -> ArtifactBundle:
+    """The active version assembled from the process-wide cached loaders."""
+    model = load_model()
+    return ArtifactBundle(
+        version=artifact_version(),
+        path=resolve_artifact_dir(),
+        feature_names=tuple(load_feature_names()),
+        # the surrogate scores raw feature values, so its bundles never unpickle the scaler
+        scaler=None if isinstance(model, SurrogateRegressor) else load_scaler(),
+        model=model,
+    )
+
+
+def load_bundle(version: str | None = None, force_surrogate: bool | None = None) -> ArtifactBundle:
+    """Load one artifact version (the active one by default) without touching the caches."""
+    root = resolve_artifact_root()
+    version = version or current_version_name(root)
+    artifact_dir = version_dir(version, root) if version else root
+    if force_surrogate is None:
+        force_surrogate = _use_surrogate_default()
+    feature_names = _read_feature_names(artifact_dir)
+    model = _read_model(artifact_dir, force_surrogate, feature_names)
+    return ArtifactBundle(
+        version=version or _fingerprint(artifact_dir),
+        path=artifact_dir,
+        feature_names=tuple(feature_names),
+        scaler=None if isinstance(model, SurrogateRegressor) else _read_scaler(artifact_dir),
+        model=model,
+    )
+
+
+def add_reload_listener(listener: Callable[[], None]) -> None:
+    """Call ``listener`` after ``reload_artifacts``; bound methods are held weakly."""
+    ref: weakref.ReferenceType
+    if hasattr(listener, "__self__"):
+        ref = weakref.WeakMethod(listener)  # type: ignore[arg-type]
+    else:
+        ref = weakref.ref(listener)
+    with _reload_lock:
+        _reload_listeners.append(ref)
+
 
+def reload_artifacts() -> None:
+    """Drop cached artifacts so the next load reads them from disk again."""
+    for loader in (load_feature_names, load_scaler, load_model, artifact_version):
+        loader.cache_clear()
+    with _reload_lock:
+        live = [ref for ref in _reload_listeners if ref() is not None]
+        _reload_listeners[:] = live
+    for ref in live:
+        listener = ref()
+        if listener is not None:
+            listener()
@@ -0,0 +1,152 @@
+"""Batched driver attribution: which features push each score, and by how much.
+
+Two methods are available:
+
+* ``path`` credits each feature with the change in prediction along the tree paths a
+  sample takes (``CompiledForest.contributions``), or with the model's own
+  ``feature_contributions(X)`` decomposition when it has one (the surrogate does).
+  Contributions plus the bias add up to the model output, and ``impact`` is signed.
+* ``importance`` is the original heuristic: global feature importance times the
+  distance of the raw value from 50.
+
+``auto`` (the default) picks ``path`` whenever the model supports it. The top ``k``
+drivers of a whole batch are chosen with one ``argpartition`` and only those ``k``
+columns are sorted.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Dict, List, Sequence
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .forest import CompiledForest
+
+DRIVER_METHOD_ENV = "FLOOD_AI_DRIVER_METHOD"
+DRIVER_TOP_K_ENV = "FLOOD_AI_DRIVER_TOP_K"
+DEFAULT_TOP_K = 3
+
+Vector = NDArray[np.float64]
+Matrix = NDArray[np.float64]
+Drivers = List[Dict[str, float]]
+
+
+class AttributionMethod(str, Enum):
+    AUTO = "auto"
+    PATH = "path"
+    IMPORTANCE = "importance"
+
+
+@dataclass
+class Attribution:
+    """Per-feature contributions of a batch, in model feature order."""
+
+    method: AttributionMethod
+    feature_names: Sequence[str]
+    bias: Vector  # (n_samples,)
+    contributions: Matrix  # (n_samples, n_features)
+
+
+def default_top_k() -> int:
+    return int(os.getenv(DRIVER_TOP_K_ENV, str(DEFAULT_TOP_K)) or DEFAULT_TOP_K)
+
+
+def top_k_indices(weights: Matrix, k: int) -> NDArray[np.intp]:
+    """Column indices of the ``k`` largest ``weights`` per row, largest first."""
+    n_rows, n_columns = weights.shape
+    k = max(0, min(k, n_columns))
+    if k == 0:
+        return np.empty((n_rows, 0), dtype=np.intp)
+    rows = np.arange(n_rows)[:, None]
+    if k < n_columns:
+        picked = np.argpartition(-weights, k - 1, axis=1)[:, :k]
+    else:
+        picked = np.broadcast_to(np.arange(n_columns), (n_rows, n_columns))
+    order = np.argsort(-weights[rows, picked], axis=1, kind="stable")
+    return picked[rows, order]
+
+
+class DriverAttributor:
+    """Attribution for one loaded model; everything derived from the model is built once."""
+
+    def __init__(
+        self,
+        feature_names: Sequence[str],
+        model: Any,
+        forest: CompiledForest | None = None,
+        method: AttributionMethod | str | None = None,
+    ):
+        self.feature_names = list(feature_names)
+        importances = getattr(model, "feature_importances_", None)
+        self.importances = None
+        if importances is not None:
+            importances = np.asarray(importances, dtype=float)
+            if importances.size == len(self.feature_names):
+                self.importances = importances
+        self._decompose: Callable[[Matrix], tuple[Vector, Matrix]] | None = getattr(
+            model, "feature_contributions", None
+        )
+        if self._decompose is None and forest is not None:
+            self._decompose = lambda samples: (np.full(samples.shape[0], forest.bias), forest.contributions(samples))
+
+        requested = AttributionMethod(method or os.getenv(DRIVER_METHOD_ENV, AttributionMethod.AUTO.value))
+        if requested is AttributionMethod.PATH and self._decompose is None:
+            raise ValueError("Path attribution needs a tree ensemble or a model with feature_contributions")
+        if requested is AttributionMethod.AUTO:
+            requested = AttributionMethod.PATH if self._decompose is not None else AttributionMethod.IMPORTANCE
+        self.method = requested
+
+    @property
+    def available(self) -> bool:
+        if self.method is AttributionMethod.PATH:
+            return True
+        return self.importances is not None
+
+    def attribute(self, matrix: Matrix, samples: Matrix) -> Attribution:
+        """Contributions for raw feature rows ``matrix`` (``samples`` is what the model sees)."""
+        if self.method is AttributionMethod.PATH:
+            assert self._decompose is not None
+            bias, contributions = self._decompose(samples)
+        elif self.importances is not None:
+            contributions = self.importances * np.abs(matrix - 50.0)
+            bias = np.zeros(matrix.shape[0])
+        else:
+            raise ValueError("The model exposes no feature importances to attribute with")
+        return Attribution(
+            method=self.method,
+            feature_names=self.feature_names,
+            bias=np.asarray(bias, dtype=float),
+            contributions=np.asarray(contributions, dtype=float),
+        )
+
+    def drivers(self, matrix: Matrix, samples: Matrix, k: int = DEFAULT_TOP_K) -> List[Drivers]:
+        """Top ``k`` drivers of every row as ``{"feature", "score", "impact"}`` dicts.
+
+        Path drivers are ranked by absolute contribution and keep their sign; importance
+        drivers only list features with a positive impact.
+        """
+        if not self.available or k <= 0:
+            return [[] for _ in range(matrix.shape[0])]
+        contributions = self.attribute(matrix, samples).contributions
+        path = self.method is AttributionMethod.PATH
+        top = top_k_indices(np.abs(contributions) if path else contributions, k)
+        rows = np.arange(matrix.shape[0])[:, None]
+        impacts = contributions[rows, top]
+        keep = impacts != 0 if path else impacts > 0
+        impacts = np.round(impacts, 4 if path else 2)
+        values = np.round(matrix[rows, top], 2)
+        names = self.feature_names
+        return [
+            [
+                {"feature": names[idx], "score": value, "impact": impact}
+                for idx, value, impact, kept in zip(idx_row, value_row, impact_row, keep_row)
+                if kept
+            ]
+            for idx_row, value_row, impact_row, keep_row in zip(
+                top.tolist(), values.tolist(), impacts.tolist(), keep.tolist()
+            )
+        ]
@@ -0,0 +1,129 @@
+"""Binding between model feature names, ``ScenarioPayload`` fields and their input aliases.
+
+Artifacts, sample files and exports do not always agree on column names (older ones
+say ``InfrastructureDecay`` where the schema says ``DeterioratingInfrastructure``). The
+aliases accepted on input are declared once on the schema with ``AliasChoices``; a
+``SchemaBinding`` resolves a model's feature list against them when the model is
+loaded, fails right there on names it cannot place, and keeps the resulting index map
+so scoring never looks names up per request.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from operator import attrgetter
+from typing import Any, Callable, Dict, List, Mapping, Sequence
+
+import numpy as np
+from numpy.typing import NDArray
+from pydantic import AliasChoices
+
+from .input_schema import ScenarioPayload
+
+Matrix = NDArray[np.float64]
+
+
+class SchemaBindingError(ValueError):
+    """Raised when model feature names cannot be mapped onto ``ScenarioPayload``."""
+
+
+def _input_keys() -> Dict[str, tuple[str, ...]]:
+    """Keys accepted for every schema field, in the priority order pydantic applies."""
+    keys: Dict[str, tuple[str, ...]] = {}
+    for name, info in ScenarioPayload.model_fields.items():
+        alias = info.validation_alias
+        if isinstance(alias, AliasChoices):
+            keys[name] = tuple(choice for choice in alias.choices if isinstance(choice, str))
+        elif isinstance(alias, str):
+            keys[name] = (alias,)
+        else:
+            keys[name] = (name,)
+    return keys
+
+
+# schema field -> accepted input keys; accepted key -> schema field
+INPUT_KEYS: Mapping[str, tuple[str, ...]] = _input_keys()
+FIELD_FOR_KEY: Mapping[str, str] = {key: name for name, keys in INPUT_KEYS.items() for key in keys}
+FEATURE_FIELDS: tuple[str, ...] = tuple(
+    name for name, info in ScenarioPayload.model_fields.items() if info.annotation is float
+)
+
+
+def canonical_name(name: str) -> str:
+    """Schema field for a feature name or alias."""
+    try:
+        resolved = FIELD_FOR_KEY[name]
+    except KeyError:
+        raise SchemaBindingError(f"Unknown feature '{name}'") from None
+    if resolved not in FEATURE_FIELDS:
+        raise SchemaBindingError(f"'{name}' is not a feature field")
+    return resolved
+
+
+@dataclass(frozen=True)
+class SchemaBinding:
+    """Model feature order bound to schema fields, built once per loaded model."""
+
+    feature_names: tuple[str, ...]  # as the model/scaler know them
+    fields: tuple[str, ...]  # matching ScenarioPayload attribute per model column
+    index: Mapping[str, int] = field(repr=False)  # any accepted key -> model column
+    getter: Callable[[Any], tuple[float, ...]] = field(repr=False, compare=False)
+
+    @classmethod
+    def build(cls, feature_names: Sequence[str]) -> "SchemaBinding":
+        problems: List[str] = []
+        fields: List[str] = []
+        for name in feature_names:
+            try:
+                fields.append(canonical_name(name))
+            except SchemaBindingError as exc:
+                problems.append(str(exc))
+        if not feature_names:
+            problems.append("the model declares no features")
+        duplicated = sorted({name for name in fields if fields.count(name) > 1})
+        if duplicated:
+            problems.append(f"several model features map to {', '.join(duplicated)}")
+        if problems:
+            raise SchemaBindingError("Model features do not match ScenarioPayload: " + "; ".join(problems))
+        index = {key: column for column, name in enumerate(fields) for key in INPUT_KEYS[name]}
+        index.update({name: column for column, name in enumerate(feature_names)})
+        getter = attrgetter(*fields)
+        return cls(
+            feature_names=tuple(feature_names),
+            fields=tuple(fields),
+            index=index,
+            # attrgetter returns a bare value rather than a 1-tuple for a single name
+            getter=getter if len(fields) > 1 else lambda obj: (getter(obj),),
+        )
+
+    def vector(self, scenario: ScenarioPayload) -> tuple[float, ...]:
+        return self.getter(scenario)
+
+    def matrix(self, scenarios: Sequence[ScenarioPayload]) -> Matrix:
+        getter = self.getter
+        return np.array([getter(scenario) for scenario in scenarios], dtype=float).reshape(
+            len(scenarios), len(self.fields)
+        )
+
+    def column_map(self, columns: Sequence[str]) -> NDArray[np.intp]:
+        """Model column for each incoming column name (``-1`` for columns that are not read).
+
+        When a feature arrives under several accepted names, the one pydantic would pick
+        wins and the others are ignored; a feature with no column at all is an error.
+        """
+        mapping = np.full(len(columns), -1, dtype=np.intp)
+        chosen: Dict[int, tuple[int, int]] = {}  # model column -> (priority, position)
+        for position, column in enumerate(columns):
+            model_column = self.index.get(column)
+            if model_column is None:
+                continue
+            keys = INPUT_KEYS[self.fields[model_column]]
+            priority = keys.index(column) if column in keys else len(keys)
+            if model_column not in chosen or priority < chosen[model_column][0]:
+                chosen[model_column] = (priority, position)
+        missing = [self.fields[column] for column in range(len(self.fields)) if column not in chosen]
+        if missing:
+            raise SchemaBindingError(f"Columns missing features: {', '.join(missing)}")
+        for model_column, (_, position) in chosen.items():
+            mapping[position] = model_column
+        return mapping
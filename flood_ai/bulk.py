@@ -0,0 +1,254 @@
+"""Streaming bulk assessment of NDJSON/CSV scenario files.
+
+Records are read lazily, grouped into chunks, validated column-wise and scored in a
+process pool whose workers each load the artifacts once. Results are written back in input order as
+NDJSON, one line per record, while only a bounded number of chunks is in flight, so
+memory stays flat regardless of the input size.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import Any, Deque, Dict, IO, Iterable, Iterator, List, Sequence, Tuple
+
+from .artifact_loader import load_feature_names
+from .binding import SchemaBinding
+from .columnar import validate_records
+from .storage import flush, save_assessments
+from .workflow import FloodAssessmentService
+
+# Keys under which an envelope record (e.g. ``{"request_id": ..., "body": {...}}``) nests its scenario.
+ENVELOPE_KEYS = ("scenario", "payload", "body")
+ID_KEYS = ("request_id", "id")
+
+Record = Tuple[Any, Any]  # (record id, raw scenario)
+ChunkResult = Tuple[List[str], List[Dict[str, Any]], List[Dict[str, Any]]]  # (output lines, to persist, errors)
+
+_worker_service: FloodAssessmentService | None = None
+_worker_persist = False
+
+
+@dataclass
+class BulkReport:
+    records: int = 0
+    assessed: int = 0
+    invalid: int = 0
+    chunks: int = 0
+    workers: int = 1
+    seconds: float = 0.0
+    records_per_second: float = 0.0
+    output: str | None = None
+    persisted: bool = False
+    errors_sample: List[Dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def detect_format(path: Path) -> str:
+    return "csv" if path.suffix.lower() in {".csv", ".tsv"} else "ndjson"
+
+
+def _unwrap(record: Dict[str, Any], fallback_id: Any) -> Record:
+    record_id = next((record[key] for key in ID_KEYS if key in record), fallback_id)
+    for key in ENVELOPE_KEYS:
+        if key in record:
+            inner = record[key]
+            if isinstance(inner, str):
+                try:
+                    inner = json.loads(inner)
+                except json.JSONDecodeError:
+                    pass
+            return record_id, inner
+    return record_id, record
+
+
+def read_ndjson(handle: IO[str]) -> Iterator[Record]:
+    for line_no, line in enumerate(handle, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield line_no, {"__error__": f"invalid JSON: {exc.msg}"}
+            continue
+        yield _unwrap(record, line_no) if isinstance(record, dict) else (line_no, record)
+
+
+def read_csv(handle: IO[str], delimiter: str = ",") -> Iterator[Record]:
+    reader = csv.DictReader(handle, delimiter=delimiter)
+    for line_no, row in enumerate(reader, start=2):
+        # empty cells mean "not provided" so optional fields fall back to their defaults
+        yield _unwrap({key: value for key, value in row.items() if key and value not in ("", None)}, line_no)
+
+
+def read_records(handle: IO[str], fmt: str, delimiter: str = ",") -> Iterator[Record]:
+    if fmt == "csv":
+        return read_csv(handle, delimiter)
+    if fmt == "ndjson":
+        return read_ndjson(handle)
+    raise ValueError(f"Unknown input format '{fmt}' (expected 'ndjson' or 'csv')")
+
+
+def chunked(records: Iterable[Record], size: int) -> Iterator[List[Record]]:
+    iterator = iter(records)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _init_worker(persist: bool = False) -> None:
+    global _worker_service, _worker_persist
+    _worker_service = FloodAssessmentService()
+    _worker_persist = persist
+
+
+def _validation_error(raw: Any) -> List[Dict[str, Any]] | None:
+    if isinstance(raw, dict) and "__error__" in raw:
+        return [{"type": "json_invalid", "loc": [], "msg": raw["__error__"]}]
+    if not isinstance(raw, dict):
+        return [{"type": "model_type", "loc": [], "msg": "Input should be a scenario object"}]
+    return None
+
+
+def assess_chunk(chunk: Sequence[Record]) -> ChunkResult:
+    """Validate and score one chunk; runs inside a pool worker (or inline)."""
+    if _worker_service is None:
+        _init_worker()
+    assert _worker_service is not None
+    lines: List[str | None] = [None] * len(chunk)
+    invalid: List[Dict[str, Any]] = []
+
+    def reject(position: int, errors: List[Dict[str, Any]]) -> None:
+        invalid.append({"id": chunk[position][0], "error": errors})
+        lines[position] = json.dumps(invalid[-1], default=str)
+
+    records: List[Dict[str, Any]] = []
+    positions: List[int] = []
+    for position, (_, raw) in enumerate(chunk):
+        errors = _validation_error(raw)
+        if errors is None:
+            records.append(raw)
+            positions.append(position)
+        else:
+            reject(position, errors)
+    batch = validate_records(records, _worker_service.scorer.feature_names)
+    for index, errors in batch.errors.items():
+        reject(positions[index], errors)
+
+    persisted: List[Dict[str, Any]] = []
+    assessments = _worker_service.evaluate_many(batch.payloads(), matrix=batch.matrix)
+    for index, assessment in zip(batch.rows.tolist(), assessments):
+        position = positions[index]
+        lines[position] = json.dumps({"id": chunk[position][0], "assessment": assessment.to_dict()})
+        if _worker_persist:
+            persisted.append(assessment.to_record())
+    return [line for line in lines if line is not None], persisted, invalid
+
+
+def _pool(workers: int, persist: bool) -> ProcessPoolExecutor:
+    # spawn keeps workers independent of the parent's threads (e.g. the storage writer)
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(persist,),
+    )
+
+
+def run_bulk(
+    records: Iterable[Record],
+    output: IO[str],
+    workers: int | None = None,
+    chunk_size: int = 1000,
+    persist: bool = False,
+    max_in_flight: int | None = None,
+    progress: IO[str] | None = None,
+    progress_interval: float = 5.0,
+) -> BulkReport:
+    """Score ``records`` and write one NDJSON result line per record to ``output``.
+
+    With ``workers <= 1`` chunks are scored inline. Otherwise at most ``max_in_flight``
+    chunks (twice the worker count by default) are submitted at any time and results
+    are written in submission order.
+    """
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    report = BulkReport(workers=max(workers, 1), persisted=persist)
+    started = last_progress = time.perf_counter()
+
+    def consume(result: ChunkResult) -> None:
+        nonlocal last_progress
+        lines, persisted, invalid = result
+        for line in lines:
+            output.write(line)
+            output.write("\n")
+        report.chunks += 1
+        report.records += len(lines)
+        report.invalid += len(invalid)
+        report.assessed += len(lines) - len(invalid)
+        report.errors_sample.extend(invalid[: 5 - len(report.errors_sample)])
+        if persisted:
+            save_assessments(persisted)
+        now = time.perf_counter()
+        if progress is not None and now - last_progress >= progress_interval:
+            last_progress = now
+            rate = report.records / (now - started)
+            progress.write(f"{report.records} records ({report.invalid} invalid), {rate:,.0f} records/s\n")
+            progress.flush()
+
+    chunks = chunked(records, chunk_size)
+    if workers <= 1:
+        _init_worker(persist)
+        for chunk in chunks:
+            consume(assess_chunk(chunk))
+    else:
+        limit = max_in_flight or workers * 2
+        pending: Deque[Future] = deque()
+        with _pool(workers, persist) as pool:
+            for chunk in chunks:
+                if len(pending) >= limit:
+                    consume(pending.popleft().result())
+                pending.append(pool.submit(assess_chunk, chunk))
+            while pending:
+                consume(pending.popleft().result())
+
+    if persist:
+        flush()
+    report.seconds = round(time.perf_counter() - started, 3)
+    report.records_per_second = round(report.records / report.seconds, 1) if report.seconds else 0.0
+    return report
+
+
+def run_bulk_file(
+    input_path: Path,
+    output_path: Path | None = None,
+    fmt: str | None = None,
+    **options: Any,
+) -> BulkReport:
+    fmt = fmt or detect_format(input_path)
+    delimiter = "\t" if input_path.suffix.lower() == ".tsv" else ","
+    with input_path.open("r", encoding="utf-8", newline="") as source:
+        if fmt == "csv":
+            # a column mismatch would reject every row; refuse the file up front instead
+            header = next(csv.reader(source, delimiter=delimiter), [])
+            source.seek(0)
+            if not set(header) & set(ENVELOPE_KEYS):
+                SchemaBinding.build(load_feature_names()).column_map(header)
+        records = read_records(source, fmt, delimiter)
+        if output_path is None:
+            report = run_bulk(records, sys.stdout, **options)
+        else:
+            with output_path.open("w", encoding="utf-8") as sink:
+                report = run_bulk(records, sink, **options)
+            report.output = str(output_path)
+    return report
@@ -0,0 +1,108 @@
+"""Memoizing cache for scoring results keyed by quantized feature vectors."""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Sequence, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+CACHE_SIZE_ENV = "FLOOD_AI_CACHE_SIZE"
+CACHE_TTL_ENV = "FLOOD_AI_CACHE_TTL"
+CACHE_PRECISION_ENV = "FLOOD_AI_CACHE_PRECISION"
+
+
+@dataclass(frozen=True)
+class CachedScore:
+    score: float
+    band_code: int
+    confidence: float
+    drivers: Tuple[Dict[str, float], ...]
+
+
+class ScoreCache:
+    """Thread-safe LRU cache with optional TTL for per-scenario scoring outputs.
+
+    Keys are the feature vector (in ``feature_names`` order) rounded to ``precision``
+    plus the model version, so resubmissions that differ only by sensor noise below
+    the precision share one entry and a new model never serves stale scores.
+    """
+
+    def __init__(self, max_entries: int = 4096, ttl: float | None = None, precision: float = 0.01):
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        if precision <= 0:
+            raise ValueError("precision must be positive")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.precision = precision
+        self._entries: "OrderedDict[Hashable, tuple[float, CachedScore]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    @classmethod
+    def from_env(cls) -> "ScoreCache | None":
+        """Build a cache from ``FLOOD_AI_CACHE_*`` settings; ``None`` when disabled (size 0)."""
+        size = int(os.getenv(CACHE_SIZE_ENV, "0") or 0)
+        if size <= 0:
+            return None
+        ttl = os.getenv(CACHE_TTL_ENV)
+        precision = os.getenv(CACHE_PRECISION_ENV)
+        return cls(
+            max_entries=size,
+            ttl=float(ttl) if ttl else None,
+            precision=float(precision) if precision else 0.01,
+        )
+
+    def keys(self, version: str, matrix: NDArray[np.float64]) -> List[Hashable]:
+        quantized = np.rint(matrix / self.precision).astype(np.int64)
+        return [(version, row.tobytes()) for row in quantized]
+
+    def get_many(self, keys: Sequence[Hashable]) -> List[CachedScore | None]:
+        now = time.monotonic()
+        found: List[CachedScore | None] = []
+        with self._lock:
+            for key in keys:
+                item = self._entries.get(key)
+                if item is not None and self.ttl is not None and now - item[0] > self.ttl:
+                    del self._entries[key]
+                    self._stats["expirations"] += 1
+                    item = None
+                if item is None:
+                    self._stats["misses"] += 1
+                    found.append(None)
+                else:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    found.append(item[1])
+        return found
+
+    def put_many(self, keys: Sequence[Hashable], values: Sequence[CachedScore]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for key, value in zip(keys, values):
+                self._entries[key] = (now, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._stats["invalidations"] += 1
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hit_ratio": self._stats["hits"] / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,244 @@
+"""Column-wise validation of many raw scenario records at once.
+
+``ScenarioPayload(**record)`` validates twenty ``ge=0, le=100`` floats object by
+object. ``validate_records`` checks whole feature columns with numpy instead and only
+falls back to pydantic for cells that are not plain ints/floats (numeric strings,
+bools, ``None``...), so the accepted inputs and the reported errors (``type``, ``loc``,
+``msg``, ``input``, ``ctx``) are the same as the model's.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from operator import itemgetter
+from typing import Any, Dict, List, Mapping, Sequence
+
+import numpy as np
+from numpy.typing import NDArray
+from pydantic import TypeAdapter, ValidationError
+
+from .binding import INPUT_KEYS, SchemaBinding, canonical_name
+from .input_schema import ScenarioPayload
+
+Matrix = NDArray[np.float64]
+
+_MISSING = object()
+_FLOAT = TypeAdapter(float)
+_NUMERIC_TYPES = (float, int)
+
+
+def _bound(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+def _range_constraints() -> Dict[str, tuple[float | None, float | None]]:
+    """``(ge, le)`` bounds of every float field declared on ``ScenarioPayload``."""
+    constraints: Dict[str, tuple[float | None, float | None]] = {}
+    for name, info in ScenarioPayload.model_fields.items():
+        if info.annotation is not float:
+            continue
+        ge = le = None
+        for meta in info.metadata:
+            ge = getattr(meta, "ge", ge)
+            le = getattr(meta, "le", le)
+        constraints[name] = (ge, le)
+    return constraints
+
+
+FEATURE_BOUNDS = _range_constraints()
+_OTHER_FIELDS = {
+    name: TypeAdapter(info.annotation, config=ScenarioPayload.model_config)
+    for name, info in ScenarioPayload.model_fields.items()
+    if name not in FEATURE_BOUNDS
+}
+
+
+@dataclass
+class ColumnarBatch:
+    """Validated records as a feature matrix plus per-row errors for the rejected ones."""
+
+    feature_names: tuple[str, ...]
+    matrix: Matrix  # (n_valid, n_features), rows in input order
+    rows: NDArray[np.intp]  # input index of each matrix row
+    errors: Dict[int, List[Dict[str, Any]]] = field(default_factory=dict)
+    fields: Dict[str, List[Any]] = field(default_factory=dict)  # non-feature values of valid rows
+
+    @property
+    def n_valid(self) -> int:
+        return int(self.rows.size)
+
+    def payloads(self) -> List[ScenarioPayload]:
+        """``ScenarioPayload`` objects for the valid rows, built without re-validating."""
+        names = [canonical_name(name) for name in self.feature_names]
+        extra = list(self.fields)
+        columns = [self.fields[name] for name in extra]
+        payloads = []
+        for position, values in enumerate(self.matrix.tolist()):
+            data: Dict[str, Any] = dict(zip(names, values))
+            for name, column in zip(extra, columns):
+                if column[position] is not _MISSING:
+                    data[name] = column[position]
+            payloads.append(ScenarioPayload.model_construct(**data))
+        return payloads
+
+
+def _error(kind: str, name: str, msg: str, value: Any, ctx: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    error = {"type": kind, "loc": [name], "msg": msg, "input": value}
+    if ctx is not None:
+        error["ctx"] = ctx
+    return error
+
+
+def _pydantic_errors(name: str, exc: ValidationError) -> List[Dict[str, Any]]:
+    errors = []
+    for item in exc.errors(include_url=False):
+        entry = {"type": item["type"], "loc": [name, *item["loc"]], "msg": item["msg"], "input": item["input"]}
+        if "ctx" in item:
+            entry["ctx"] = {key: value if isinstance(value, (int, float, str)) else str(value) for key, value in item["ctx"].items()}
+        errors.append(entry)
+    return errors
+
+
+def _lookup(record: Mapping[str, Any], keys: Sequence[str]) -> tuple[str, Any]:
+    """First accepted key present in ``record`` (pydantic's ``AliasChoices`` order) and its value."""
+    for key in keys:
+        if key in record:
+            return key, record[key]
+    return keys[0], _MISSING
+
+
+def _uniform_keys(records: Sequence[Mapping[str, Any]], order: Sequence[str]) -> List[str] | None:
+    """The key every record uses for each field, or ``None`` when records mix aliases."""
+    first = records[0]
+    chosen = []
+    for name in order:
+        keys = INPUT_KEYS[name]
+        key = next((key for key in keys if key in first), name)
+        higher = keys[: keys.index(key)] if key in keys else ()
+        if higher and any(other in record for record in records for other in higher):
+            return None
+        chosen.append(key)
+    return chosen
+
+
+def _parse_columns(
+    records: Sequence[Mapping[str, Any]],
+    order: Sequence[str],
+    ranks: Sequence[int],
+    row_errors: List[List[tuple[int, Dict[str, Any]]]],
+) -> tuple[Matrix, NDArray[np.bool_]]:
+    """Float matrix of the feature fields plus a mask of cells that parsed as numbers."""
+    n_rows = len(records)
+    keys = _uniform_keys(records, order)
+    table = None
+    if keys is not None:
+        getter = itemgetter(*keys)
+        try:
+            table = np.array([getter(record) for record in records]).reshape(n_rows, len(order))
+        except (KeyError, ValueError):
+            table = None
+    # common case: every cell is an int/float/bool, which pydantic accepts as is
+    if table is not None and table.dtype.kind in "fiub":
+        return table.astype(np.float64, copy=False), np.ones(table.shape, dtype=bool)
+
+    matrix = np.zeros((n_rows, len(order)), dtype=np.float64)
+    parsed = np.zeros(matrix.shape, dtype=bool)
+    for col, (name, rank) in enumerate(zip(order, ranks)):
+        accepted = INPUT_KEYS[name]
+        raw = [_lookup(record, accepted)[1] for record in records]
+        plain = np.fromiter((type(value) in _NUMERIC_TYPES for value in raw), dtype=bool, count=n_rows)
+        plain_rows = np.flatnonzero(plain)
+        matrix[plain_rows, col] = [raw[index] for index in plain_rows.tolist()]
+        parsed[plain_rows, col] = True
+        for index in np.flatnonzero(~plain).tolist():
+            value = raw[index]
+            if value is _MISSING:
+                row_errors[index].append((rank, _error("missing", name, "Field required", dict(records[index]))))
+                continue
+            try:
+                matrix[index, col] = _FLOAT.validate_python(value)
+                parsed[index, col] = True
+            except ValidationError as exc:
+                key = _lookup(records[index], accepted)[0]
+                row_errors[index].extend((rank, error) for error in _pydantic_errors(key, exc))
+    return matrix, parsed
+
+
+def validate_records(records: Sequence[Mapping[str, Any]], feature_names: Sequence[str]) -> ColumnarBatch:
+    """Validate ``records`` column by column and stack the valid ones in ``feature_names`` order.
+
+    Every field declared on ``ScenarioPayload`` is required as it is there; unknown keys
+    are ignored. A record whose feature fails more than one check reports the first, as
+    pydantic does (``le`` is checked before ``ge``).
+    """
+    names = tuple(feature_names)
+    # raises SchemaBindingError for names that are neither schema fields nor aliases
+    binding = SchemaBinding.build(names)
+    n_rows = len(records)
+    field_order = list(ScenarioPayload.model_fields)
+    feature_order = [name for name in field_order if name in FEATURE_BOUNDS]
+    ranks = [field_order.index(name) for name in feature_order]
+    row_errors: List[List[tuple[int, Dict[str, Any]]]] = [[] for _ in range(n_rows)]
+
+    matrix, parsed = _parse_columns(records, feature_order, ranks, row_errors) if n_rows else (
+        np.empty((0, len(feature_order))),
+        np.empty((0, len(feature_order)), dtype=bool),
+    )
+    lower = np.array([FEATURE_BOUNDS[name][0] if FEATURE_BOUNDS[name][0] is not None else -np.inf for name in feature_order])
+    upper = np.array([FEATURE_BOUNDS[name][1] if FEATURE_BOUNDS[name][1] is not None else np.inf for name in feature_order])
+    # NaN fails every comparison, so it is reported against ``le`` like pydantic does
+    too_high = ~(matrix <= upper) & parsed
+    too_low = ~(matrix >= lower) & parsed & ~too_high
+    for index, col in zip(*np.nonzero(too_high | too_low)):
+        name = feature_order[col]
+        ge, le = FEATURE_BOUNDS[name]
+        key, value = _lookup(records[index], INPUT_KEYS[name])
+        if too_high[index, col]:
+            error = _error("less_than_equal", key, f"Input should be less than or equal to {_bound(le)}", value, {"le": float(le)})
+        else:
+            error = _error("greater_than_equal", key, f"Input should be greater than or equal to {_bound(ge)}", value, {"ge": float(ge)})
+        row_errors[index].append((ranks[col], error))
+    valid = parsed.all(axis=1) & ~(too_high | too_low).any(axis=1)
+
+    other_values: Dict[str, List[Any]] = {}
+    for rank, name in enumerate(field_order):
+        adapter = _OTHER_FIELDS.get(name)
+        if adapter is None:
+            continue
+        required = ScenarioPayload.model_fields[name].is_required()
+        strips = ScenarioPayload.model_fields[name].annotation is str
+        accepted = INPUT_KEYS[name]
+        values: List[Any] = []
+        for index, record in enumerate(records):
+            key, value = _lookup(record, accepted)
+            if value is _MISSING:
+                if required:
+                    row_errors[index].append((rank, _error("missing", name, "Field required", dict(record))))
+                    valid[index] = False
+                values.append(_MISSING)
+            elif strips and type(value) is str:
+                values.append(value.strip())
+            elif type(value) is datetime:
+                values.append(value)
+            else:
+                try:
+                    values.append(adapter.validate_python(value))
+                except ValidationError as exc:
+                    row_errors[index].extend((rank, error) for error in _pydantic_errors(key, exc))
+                    valid[index] = False
+                    values.append(_MISSING)
+        other_values[name] = values
+
+    rows = np.flatnonzero(valid)
+    columns = [feature_order.index(name) for name in binding.fields]
+    errors = {
+        index: [error for _, error in sorted(entries, key=lambda entry: entry[0])]
+        for index, entries in enumerate(row_errors)
+        if entries
+    }
+    kept = rows.tolist()
+    fields = {name: [values[index] for index in kept] for name, values in other_values.items()}
+    return ColumnarBatch(
+        feature_names=names, matrix=matrix[np.ix_(rows, columns)], rows=rows, errors=errors, fields=fields
+    )
@@ -0,0 +1,113 @@
+"""Per-estimator ensemble evaluation shared by prediction and confidence scoring."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .forest import CompiledForest
+from .metrics import stage
+
+Vector = NDArray[np.float64]
+Matrix = NDArray[np.float64]
+
+# Confidence reported for models that do not expose per-estimator outputs.
+DEFAULT_CONFIDENCE = 0.65
+
+# Largest batch routed through the compiled forest; beyond it sklearn's compiled
+# per-tree loop is faster than numpy gathers (see benchmarks/bench_forest.py).
+COMPILED_MAX_BATCH = 256
+
+
+@dataclass
+class EnsembleOutput:
+    prediction: Vector
+    confidence: Vector
+    estimator_predictions: Matrix | None
+
+
+def _is_averaging_forest(model: Any) -> bool:
+    """True when ``model.predict`` is exactly the mean of its trees' predictions."""
+    estimators = getattr(model, "estimators_", None)
+    if not isinstance(estimators, list) or not estimators or not hasattr(estimators[0], "tree_"):
+        return False
+    # sklearn is already imported at this point (the model was unpickled from it)
+    from sklearn.ensemble import ExtraTreesRegressor, RandomForestRegressor
+
+    return isinstance(model, (RandomForestRegressor, ExtraTreesRegressor)) and model.n_outputs_ == 1
+
+
+class EnsembleEvaluator:
+    """Evaluates every estimator of an ensemble in one stacked pass.
+
+    The per-estimator matrix (``n_estimators x n_samples``) feeds both the confidence
+    spread and, for averaging forests, the prediction itself so trees are walked once.
+    Models may provide ``predict_estimators(X)`` to return that matrix directly, or
+    ``predict_with_estimators(X)`` to return the prediction alongside it; sklearn
+    tree ensembles are compiled into a ``CompiledForest`` (unless ``compile_trees`` is
+    off) that serves batches of up to ``compiled_max_batch`` rows.
+    """
+
+    def __init__(self, model: Any, compile_trees: bool = True, compiled_max_batch: int = COMPILED_MAX_BATCH):
+        self.model = model
+        estimators = getattr(model, "estimators_", None)
+        self._estimators = list(estimators) if isinstance(estimators, (list, tuple)) else []
+        self._stacked = getattr(model, "predict_estimators", None)
+        self._fused = getattr(model, "predict_with_estimators", None)
+        self._sklearn_trees = bool(self._estimators) and all(hasattr(est, "tree_") for est in self._estimators)
+        self.averages_estimators = _is_averaging_forest(model)
+        self.compiled_max_batch = compiled_max_batch
+        self.compiled: CompiledForest | None = None
+        if compile_trees and self._stacked is None and self._sklearn_trees:
+            try:
+                self.compiled = CompiledForest.from_estimator(model)
+            except TypeError:
+                self.compiled = None
+
+    @property
+    def has_estimators(self) -> bool:
+        return self._fused is not None or self._stacked is not None or bool(self._estimators)
+
+    def estimator_predictions(self, samples: Matrix) -> Matrix | None:
+        if self._stacked is not None:
+            return np.asarray(self._stacked(samples), dtype=float)
+        if self.compiled is not None and samples.shape[0] <= self.compiled_max_batch:
+            return self.compiled.predict_trees(samples)
+        if not self._estimators:
+            return None
+        stacked = np.empty((len(self._estimators), samples.shape[0]), dtype=float)
+        if self._sklearn_trees:
+            # validate/convert once, as the forest itself does, instead of per tree
+            samples = np.ascontiguousarray(samples, dtype=np.float32)
+            for row, est in enumerate(self._estimators):
+                stacked[row] = est.predict(samples, check_input=False)
+        else:
+            for row, est in enumerate(self._estimators):
+                stacked[row] = est.predict(samples)
+        return stacked
+
+    def evaluate(self, samples: Matrix) -> EnsembleOutput:
+        with stage("predict"):
+            if self._fused is not None:
+                prediction, per_estimator = self._fused(samples)
+                prediction = np.asarray(prediction, dtype=float)
+                per_estimator = np.asarray(per_estimator, dtype=float)
+            else:
+                prediction, per_estimator = self._evaluate_stacked(samples)
+        with stage("confidence"):
+            if per_estimator is None:
+                confidence = np.full(samples.shape[0], DEFAULT_CONFIDENCE)
+            else:
+                confidence = np.maximum(0.0, 100.0 - per_estimator.std(axis=0))
+        return EnsembleOutput(prediction=prediction, confidence=confidence, estimator_predictions=per_estimator)
+
+    def _evaluate_stacked(self, samples: Matrix) -> tuple[Vector, Matrix | None]:
+        per_estimator = self.estimator_predictions(samples)
+        if per_estimator is not None and self.averages_estimators:
+            prediction = CompiledForest.average(per_estimator)
+        else:
+            prediction = np.asarray(self.model.predict(samples), dtype=float)
+        return prediction, per_estimator
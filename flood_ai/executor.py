@@ -0,0 +1,173 @@
+"""Off-loop execution of assessments for the asyncio API server.
+
+Scoring is CPU-bound numpy/pandas work and persistence may block on SQLite, so the
+API hands both to a pool instead of running them on the event loop. Thread pools
+share the process's artifacts and release the GIL inside numpy/sklearn; process
+pools load artifacts once per worker and score there, while ledger and storage
+updates stay in the serving process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Sequence
+
+from .artifact_loader import load_bundle
+from .input_schema import ScenarioPayload
+from .scoring import FloodRiskScorer
+from .workflow import FloodAssessment, FloodAssessmentService
+
+EXECUTOR_MODE_ENV = "FLOOD_AI_EXECUTOR"
+POOL_SIZE_ENV = "FLOOD_AI_POOL_SIZE"
+MAX_PENDING_ENV = "FLOOD_AI_MAX_PENDING"
+
+_worker_service: FloodAssessmentService | None = None
+
+
+def _init_worker(version: str | None = None) -> None:
+    global _worker_service
+    scorer = FloodRiskScorer(bundle=load_bundle(version)) if version else None
+    _worker_service = FloodAssessmentService(scorer=scorer)
+
+
+def _evaluate_in_worker(payloads: Sequence[ScenarioPayload]) -> List[FloodAssessment]:
+    assert _worker_service is not None, "worker initializer did not run"
+    return _worker_service.evaluate_many(payloads)
+
+
+class ExecutorSaturated(RuntimeError):
+    """Raised when admitting a request would push pending assessments past ``max_pending``."""
+
+
+class AssessmentExecutor:
+    def __init__(
+        self,
+        service: FloodAssessmentService,
+        mode: str = "thread",
+        max_workers: int | None = None,
+        max_pending: int | None = None,
+    ):
+        if mode not in {"thread", "process"}:
+            raise ValueError(f"Unknown executor mode '{mode}' (expected 'thread' or 'process')")
+        self.service = service
+        self.mode = mode
+        cpus = os.cpu_count() or 1
+        # threads mostly wait on numpy/sqlite with the GIL released; processes are CPU bound
+        self.max_workers = max_workers or (min(32, cpus + 4) if mode == "thread" else cpus)
+        self.max_pending = max_pending or self.max_workers * 8
+        self._pool: Executor | None = None
+        self._worker_version: str | None = None
+        self._io_pool: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "max_pending_seen": 0}
+
+    @classmethod
+    def from_env(cls, service: FloodAssessmentService) -> "AssessmentExecutor":
+        pool_size = os.getenv(POOL_SIZE_ENV)
+        max_pending = os.getenv(MAX_PENDING_ENV)
+        return cls(
+            service,
+            mode=os.getenv(EXECUTOR_MODE_ENV, "thread").strip().lower(),
+            max_workers=int(pool_size) if pool_size else None,
+            max_pending=int(max_pending) if max_pending else None,
+        )
+
+    def _ensure_pools(self) -> None:
+        if self._pool is not None:
+            return
+        with self._lock:
+            if self._pool is not None:
+                return
+            if self.mode == "process":
+                # spawn avoids forking the server's storage writer and event-loop threads
+                self._pool = self._process_pool()
+                self._io_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="flood-ai-record")
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="flood-ai-assess")
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self._worker_version,),
+        )
+
+    def recycle(self, version: str) -> None:
+        """Point process workers at a new model version.
+
+        Thread mode shares the swapped scorer, so nothing is needed there. In process
+        mode a fresh pool is started on ``version`` and the old one drains in the
+        background, letting in-flight assessments finish on the old model.
+        """
+        if self.mode != "process":
+            return
+        with self._lock:
+            self._worker_version = version
+            old, self._pool = self._pool, (self._process_pool() if self._pool is not None else None)
+        if old is not None:
+            old.shutdown(wait=False)
+
+    def _acquire(self, count: int) -> None:
+        with self._lock:
+            # an idle executor admits any request, so a batch larger than the limit is slow
+            # rather than permanently rejected; the batch size itself is capped by the API
+            if self._pending and self._pending + count > self.max_pending:
+                self._stats["rejected"] += count
+                raise ExecutorSaturated(f"{self._pending} assessments already pending (limit {self.max_pending})")
+            self._pending += count
+            self._stats["submitted"] += count
+            self._stats["max_pending_seen"] = max(self._stats["max_pending_seen"], self._pending)
+
+    def _release(self, count: int, failed: bool) -> None:
+        with self._lock:
+            self._pending -= count
+            self._stats["failed" if failed else "completed"] += count
+
+    async def _run(self, payloads: Sequence[ScenarioPayload]) -> List[FloodAssessment]:
+        self._ensure_pools()
+        self._acquire(len(payloads))
+        loop = asyncio.get_running_loop()
+        failed = True
+        try:
+            if self.mode == "process":
+                assessments = await loop.run_in_executor(self._pool, _evaluate_in_worker, list(payloads))
+                await loop.run_in_executor(self._io_pool, self.service.record, assessments)
+            else:
+                assessments = await loop.run_in_executor(self._pool, self.service.assess_many, payloads)
+            failed = False
+            return assessments
+        finally:
+            self._release(len(payloads), failed)
+
+    async def assess(self, payload: ScenarioPayload) -> FloodAssessment:
+        return (await self._run([payload]))[0]
+
+    async def assess_many(self, payloads: Sequence[ScenarioPayload]) -> List[FloodAssessment]:
+        if not payloads:
+            return []
+        return await self._run(payloads)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "mode": self.mode,
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, io_pool = self._pool, self._io_pool
+            self._pool = self._io_pool = None
+        if pool is not None:
+            pool.shutdown(wait=True)
+        if io_pool is not None:
+            io_pool.shutdown(wait=True)
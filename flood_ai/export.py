@@ -0,0 +1,280 @@
+"""Streaming columnar export of persisted assessments.
+
+Rows are read from ``assessments`` in id order through one cursor on a dedicated
+read-only connection, ``chunk_size`` rows at a time, and each chunk is flattened into
+fixed columns (summary fields, ``driver_{i}_*``, ``action_<agency>`` and
+``feature_<name>``) before it is written. Only one chunk is held in memory, and
+``after_id`` resumes an interrupted export from the last id it reported.
+
+CSV needs nothing extra; Parquet and Arrow IPC use ``pyarrow`` when it is installed.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import re
+import sqlite3
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterator, List, Sequence
+
+from .binding import FEATURE_FIELDS
+from .response import ResponseEngine
+from .storage import flush, resolve_db_path
+
+FORMATS = ("csv", "parquet", "arrow")
+DEFAULT_CHUNK_SIZE = 5000
+DEFAULT_DRIVERS = 3
+
+SUMMARY_COLUMNS = ("id", "district", "state", "timestamp", "score", "band", "confidence", "model_version")
+_FLOAT_COLUMNS = {"score", "confidence"}
+
+
+class ExportUnavailable(RuntimeError):
+    """Raised when the requested format needs an optional dependency that is missing."""
+
+
+@dataclass
+class ExportReport:
+    format: str
+    rows: int = 0
+    chunks: int = 0
+    first_id: int | None = None
+    last_id: int | None = None  # pass back as ``after_id`` to resume
+    seconds: float = 0.0
+    output: str | None = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^0-9a-z]+", "_", name.lower()).strip("_")
+
+
+def default_agencies() -> List[str]:
+    """Every agency the configured response playbook can assign, in rule order."""
+    return ResponseEngine.from_env().agencies()
+
+
+class ExportSchema:
+    """Fixed column layout shared by every chunk of one export."""
+
+    def __init__(self, agencies: Sequence[str] | None = None, drivers: int = DEFAULT_DRIVERS):
+        self.agencies = list(agencies if agencies is not None else default_agencies())
+        self.drivers = drivers
+        self.action_columns = {agency: f"action_{_slug(agency)}" for agency in self.agencies}
+        self.columns: List[str] = [
+            *SUMMARY_COLUMNS,
+            *(f"driver_{i}_{part}" for i in range(1, drivers + 1) for part in ("feature", "score", "impact")),
+            *self.action_columns.values(),
+            "actions_other",
+            *(f"feature_{name}" for name in FEATURE_FIELDS),
+        ]
+
+    def arrow_schema(self) -> Any:
+        pa = _pyarrow()
+        fields = []
+        for name in self.columns:
+            if name == "id":
+                kind = pa.int64()
+            elif name in _FLOAT_COLUMNS or name.startswith("feature_") or name.endswith(("_score", "_impact")):
+                kind = pa.float64()
+            else:
+                kind = pa.string()
+            fields.append(pa.field(name, kind))
+        return pa.schema(fields)
+
+    def flatten(self, rows: Sequence[tuple]) -> Dict[str, List[Any]]:
+        """Columns for ``(id, district, state, timestamp, score, band, confidence, payload)`` rows."""
+        columns: Dict[str, List[Any]] = {name: [] for name in self.columns}
+        known = self.action_columns
+        for row_id, district, state, timestamp, score, band, confidence, payload in rows:
+            try:
+                record = json.loads(payload) if payload else {}
+            except (TypeError, ValueError):
+                record = {}
+            risk = record.get("risk") or {}
+            for name, value in zip(
+                SUMMARY_COLUMNS,
+                (row_id, district, state, timestamp, score, band, confidence, risk.get("model_version")),
+            ):
+                columns[name].append(value)
+            drivers = risk.get("drivers") or []
+            for i in range(self.drivers):
+                driver = drivers[i] if i < len(drivers) else {}
+                columns[f"driver_{i + 1}_feature"].append(driver.get("feature"))
+                columns[f"driver_{i + 1}_score"].append(driver.get("score"))
+                columns[f"driver_{i + 1}_impact"].append(driver.get("impact"))
+            actions = record.get("actions") or {}
+            for agency, column in known.items():
+                columns[column].append(actions.get(agency))
+            other = {agency: text for agency, text in actions.items() if agency not in known}
+            columns["actions_other"].append(json.dumps(other) if other else None)
+            features = record.get("features") or {}
+            for name in FEATURE_FIELDS:
+                columns[f"feature_{name}"].append(features.get(name))
+        return columns
+
+
+def _pyarrow() -> Any:
+    try:
+        import pyarrow
+    except ImportError as exc:
+        raise ExportUnavailable("Parquet/Arrow export needs pyarrow (pip install pyarrow); CSV works without it") from exc
+    return pyarrow
+
+
+def iter_chunks(
+    path: Path | None = None, after_id: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE, limit: int | None = None
+) -> Iterator[List[tuple]]:
+    """Raw rows with ``id > after_id`` in id order, ``chunk_size`` at a time."""
+    flush()  # include everything queued before the export started
+    db_path = path or resolve_db_path()
+    conn = sqlite3.connect(f"{db_path.as_uri()}?mode=ro", uri=True, check_same_thread=False)
+    try:
+        sql = (
+            "SELECT id, district, state, timestamp, score, band, confidence, payload "
+            "FROM assessments WHERE id > ? ORDER BY id"
+        )
+        params: tuple = (after_id,)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params += (limit,)
+        cursor = conn.execute(sql, params)
+        while rows := cursor.fetchmany(chunk_size):
+            yield rows
+    finally:
+        conn.close()
+
+
+class _CsvSink:
+    def __init__(self, handle: IO[str], schema: ExportSchema, header: bool):
+        self.writer = csv.writer(handle)
+        if header:
+            self.writer.writerow(schema.columns)
+
+    def write(self, columns: Dict[str, List[Any]]) -> None:
+        self.writer.writerows(zip(*columns.values()))
+
+    def close(self) -> None:
+        pass
+
+
+class _ArrowSink:
+    def __init__(self, target: Any, schema: ExportSchema, fmt: str):
+        pa = _pyarrow()
+        self.pa = pa
+        self.schema = schema.arrow_schema()
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            self.writer = pq.ParquetWriter(target, self.schema)
+        else:
+            self.writer = pa.ipc.new_stream(target, self.schema)
+
+    def write(self, columns: Dict[str, List[Any]]) -> None:
+        self.writer.write_batch(self.pa.RecordBatch.from_pydict(columns, schema=self.schema))
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+def export_assessments(
+    output: IO[Any] | Path,
+    fmt: str = "csv",
+    after_id: int = 0,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    limit: int | None = None,
+    schema: ExportSchema | None = None,
+    header: bool = True,
+    db_path: Path | None = None,
+    progress: Callable[[ExportReport], None] | None = None,
+) -> ExportReport:
+    """Write assessments with ``id > after_id`` to ``output`` chunk by chunk.
+
+    ``output`` is a text stream for CSV and a binary stream or path for Parquet/Arrow.
+    Set ``header=False`` when appending to a CSV written by an earlier, resumed run.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}' (expected one of {', '.join(FORMATS)})")
+    if fmt != "csv":
+        _pyarrow()  # fail before creating the output file
+    schema = schema or ExportSchema()
+    report = ExportReport(format=fmt, output=str(output) if isinstance(output, Path) else None)
+    started = time.perf_counter()
+    owned: IO[Any] | None = None
+    if isinstance(output, Path):
+        owned = output.open("w", encoding="utf-8", newline="") if fmt == "csv" else output.open("wb")
+    target = owned or output
+    sink = _CsvSink(target, schema, header) if fmt == "csv" else _ArrowSink(target, schema, fmt)
+    try:
+        for rows in iter_chunks(db_path, after_id=after_id, chunk_size=chunk_size, limit=limit):
+            sink.write(schema.flatten(rows))
+            report.rows += len(rows)
+            report.chunks += 1
+            report.first_id = report.first_id if report.first_id is not None else rows[0][0]
+            report.last_id = rows[-1][0]
+            if progress is not None:
+                progress(report)
+    finally:
+        sink.close()
+        if owned is not None:
+            owned.close()
+    report.seconds = round(time.perf_counter() - started, 3)
+    return report
+
+
+def stream_csv(after_id: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE, limit: int | None = None) -> Iterator[str]:
+    """CSV text of an export, one piece per chunk (for streaming HTTP responses)."""
+    schema = ExportSchema()
+    buffer = io.StringIO()
+    sink = _CsvSink(buffer, schema, header=True)
+    for rows in iter_chunks(after_id=after_id, chunk_size=chunk_size, limit=limit):
+        sink.write(schema.flatten(rows))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():  # header only: nothing matched
+        yield buffer.getvalue()
+
+
+class _Pending(io.RawIOBase):
+    """Write-only stream whose bytes are handed out (and dropped) by ``drain``."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        chunk = bytes(data)
+        self._parts.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data, self._parts = b"".join(self._parts), []
+        return data
+
+
+def stream_arrow(after_id: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE, limit: int | None = None) -> Iterator[bytes]:
+    """Arrow IPC stream bytes of an export, one piece per chunk."""
+    schema = ExportSchema()
+    pending = _Pending()
+    # the IPC stream format has no footer, so each chunk can be sent as soon as it is written
+    sink = _ArrowSink(pending, schema, "arrow")
+    for rows in iter_chunks(after_id=after_id, chunk_size=chunk_size, limit=limit):
+        sink.write(schema.flatten(rows))
+        yield pending.drain()
+    sink.close()
+    yield pending.drain()
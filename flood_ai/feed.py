@@ -0,0 +1,100 @@
+"""Incremental assessment feed for dashboard pollers and Server-Sent Events."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from typing import Any, AsyncIterator, Dict, List
+
+from .storage import add_commit_listener, latest_assessment_id, query_assessments, remove_commit_listener
+
+FEED_POLL_INTERVAL_ENV = "FLOOD_AI_FEED_POLL_INTERVAL"
+
+
+class AssessmentFeed:
+    """Cursor-based view over persisted assessments.
+
+    ``poll`` returns only rows newer than the client's ``since_id`` (oldest first) and
+    ``etag`` identifies the newest committed row together with the poll's ``since_id``
+    and ``limit``, so an unchanged poll can be answered with ``304 Not Modified`` without
+    touching the table while a client paging through a truncated poll never is.
+    ``stream`` yields SSE frames read from storage: it wakes when this process commits
+    and otherwise every ``poll_interval`` seconds, so with pre-fork serving it also
+    delivers rows written by other workers.
+    """
+
+    def __init__(self, default_limit: int = 30, max_limit: int = 500, poll_interval: float = 1.0):
+        self.default_limit = default_limit
+        self.max_limit = max_limit
+        self.poll_interval = poll_interval
+
+    @classmethod
+    def from_env(cls) -> "AssessmentFeed":
+        return cls(poll_interval=float(os.getenv(FEED_POLL_INTERVAL_ENV, "1.0")))
+
+    def etag(self, since_id: int | None = None, limit: int | None = None) -> str:
+        limit = min(limit or self.default_limit, self.max_limit)
+        since = "" if since_id is None else since_id
+        return f'W/"{latest_assessment_id()}:{since}:{limit}"'
+
+    def poll(self, since_id: int | None = None, limit: int | None = None) -> Dict[str, Any]:
+        limit = min(limit or self.default_limit, self.max_limit)
+        if since_id is None:
+            # first load: the newest ``limit`` rows, returned oldest first like later polls
+            page = query_assessments(limit=limit)
+            items = list(reversed(page["items"]))
+            has_more = False
+        else:
+            page = query_assessments(after_id=since_id, limit=limit)
+            items = page["items"]
+            has_more = len(items) == limit and items[-1]["id"] < latest_assessment_id()
+        cursor = items[-1]["id"] if items else since_id or 0
+        return {"items": items, "cursor": cursor, "has_more": has_more}
+
+    async def stream(self, last_event_id: int | None = None, heartbeat: float = 15.0) -> AsyncIterator[str]:
+        loop = asyncio.get_running_loop()
+        wake = asyncio.Event()
+
+        def deliver(items: List[Dict[str, Any]]) -> None:
+            # runs on this process's storage writer thread; only a hint to read sooner
+            loop.call_soon_threadsafe(wake.set)
+
+        add_commit_listener(deliver)
+        try:
+            # the cursor always comes from storage, so every wake can catch up from it
+            cursor = last_event_id if last_event_id is not None else await asyncio.to_thread(latest_assessment_id)
+            idle = 0.0
+            while True:
+                wake.clear()
+                frames: List[tuple[str, int]] = []
+                if await asyncio.to_thread(latest_assessment_id) > cursor:
+                    frames = await self._catch_up(cursor)
+                for frame, cursor in frames:
+                    yield frame
+                if frames:
+                    idle = 0.0
+                elif idle >= heartbeat:
+                    idle = 0.0
+                    yield ": keep-alive\n\n"
+                try:
+                    # other workers' commits are only seen by polling storage
+                    await asyncio.wait_for(wake.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    idle += self.poll_interval
+        finally:
+            remove_commit_listener(deliver)
+
+    async def _catch_up(self, cursor: int) -> List[tuple[str, int]]:
+        frames: List[tuple[str, int]] = []
+        while True:
+            page = await asyncio.to_thread(self.poll, cursor, self.max_limit)
+            for item in page["items"]:
+                cursor = item["id"]
+                frames.append((_frame(item), cursor))
+            if not page["has_more"]:
+                return frames
+
+
+def _frame(item: Dict[str, Any]) -> str:
+    return f"id: {item['id']}\nevent: assessment\ndata: {json.dumps(item)}\n\n"
@@ -0,0 +1,193 @@
+"""Flat-array inference engine for trained tree ensembles.
+
+sklearn's ``RandomForestRegressor.predict`` validates its input and dispatches one
+Python call per tree, which dominates latency for small batches. ``CompiledForest``
+copies every tree into a handful of contiguous arrays once and walks all trees for a
+whole batch level by level with numpy gathers, producing the per-tree outputs used
+for confidence as a by-product. Gathers lose to sklearn's own per-tree loop on large
+batches, so ``EnsembleEvaluator`` only routes latency-sized batches here.
+
+Results are bit-for-bit identical to sklearn: inputs are cast to float32 exactly as
+sklearn's tree code does, comparisons use the same ``x <= threshold`` rule (including
+the learned direction for missing values), and the ensemble mean accumulates trees
+in order before dividing, like ``ForestRegressor.predict``.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+Matrix = NDArray[np.float64]
+
+# Samples walked per chunk; bounds the (n_trees x chunk) index arrays.
+DEFAULT_CHUNK_SIZE = 2048
+
+
+class CompiledForest:
+    """All trees of a forest as flat node arrays.
+
+    Node ``i`` splits on ``feature[i]`` at ``threshold[i]``; its children sit at
+    ``children[2 * i]`` (left, ``x <= threshold``) and ``children[2 * i + 1]`` so one
+    gather picks the next node. Leaves have ``feature == -1`` and carry ``value``.
+    """
+
+    def __init__(
+        self,
+        feature: NDArray[np.intp],
+        threshold: NDArray[np.float64],
+        children: NDArray[np.intp],
+        missing_left: NDArray[np.bool_],
+        value: NDArray[np.float64],
+        roots: NDArray[np.intp],
+        max_depth: int,
+        n_features: int,
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.missing_left = missing_left
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.n_features = n_features
+        self._has_missing = bool(missing_left.any())
+
+    @property
+    def n_trees(self) -> int:
+        return int(self.roots.size)
+
+    @property
+    def n_nodes(self) -> int:
+        return int(self.feature.size)
+
+    @classmethod
+    def from_estimator(cls, model: Any) -> "CompiledForest":
+        """Compile a fitted single-output sklearn forest regressor."""
+        estimators = getattr(model, "estimators_", None)
+        if not isinstance(estimators, list) or not estimators or not all(hasattr(est, "tree_") for est in estimators):
+            raise TypeError("CompiledForest needs an ensemble of fitted sklearn decision trees")
+        if getattr(model, "n_outputs_", 1) != 1:
+            raise TypeError("CompiledForest supports single-output regressors only")
+
+        features, thresholds, children, missing, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for est in estimators:
+            tree = est.tree_
+            n_nodes = tree.node_count
+            is_leaf = tree.children_left == -1
+            features.append(np.where(is_leaf, -1, tree.feature))
+            thresholds.append(tree.threshold)
+            pairs = np.column_stack([tree.children_left, tree.children_right]) + offset
+            pairs[is_leaf] = -1
+            children.append(pairs.ravel())
+            missing.append(np.asarray(getattr(tree, "missing_go_to_left", np.zeros(n_nodes)), dtype=bool) & ~is_leaf)
+            values.append(tree.value[:, 0, 0])
+            roots.append(offset)
+            offset += n_nodes
+            max_depth = max(max_depth, int(tree.max_depth))
+
+        return cls(
+            feature=np.ascontiguousarray(np.concatenate(features), dtype=np.intp),
+            threshold=np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64),
+            children=np.ascontiguousarray(np.concatenate(children), dtype=np.intp),
+            missing_left=np.ascontiguousarray(np.concatenate(missing)),
+            value=np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+            roots=np.asarray(roots, dtype=np.intp),
+            max_depth=max_depth,
+            n_features=int(getattr(model, "n_features_in_", max(int(f.max()) for f in features) + 1)),
+        )
+
+    def _walk(self, samples: NDArray[np.float32]) -> NDArray[np.intp]:
+        """Leaf index reached by every (tree, sample) pair, as an ``(n_trees, n_samples)`` array.
+
+        Only pairs that have not reached a leaf are advanced at each level, so the work
+        is the total path length rather than ``max_depth`` steps for every pair.
+        """
+        n_samples = samples.shape[0]
+        flat = samples.ravel()
+        nodes = np.repeat(self.roots, n_samples)
+        # row offset of each pair's sample in the flattened input
+        row_base = np.tile(np.arange(n_samples, dtype=np.intp) * self.n_features, self.n_trees)
+        active = np.flatnonzero(self.feature[nodes] >= 0)
+        while active.size:
+            current = nodes[active]
+            x = flat[row_base[active] + self.feature[current]]
+            go_right = ~(x <= self.threshold[current])
+            if self._has_missing:
+                go_right &= ~(np.isnan(x) & self.missing_left[current])
+            current = self.children[2 * current + go_right]
+            nodes[active] = current
+            active = active[self.feature[current] >= 0]
+        return nodes.reshape(self.n_trees, n_samples)
+
+    def predict_trees(self, X: Matrix, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Matrix:
+        """Per-tree predictions as an ``(n_trees, n_samples)`` matrix."""
+        # sklearn evaluates trees on float32 inputs; cast once for identical splits
+        samples = np.ascontiguousarray(X, dtype=np.float32)
+        if samples.ndim != 2 or samples.shape[1] != self.n_features:
+            raise ValueError(f"Expected input of shape (n, {self.n_features}), got {samples.shape}")
+        out = np.empty((self.n_trees, samples.shape[0]), dtype=np.float64)
+        for start in range(0, samples.shape[0], chunk_size):
+            stop = start + chunk_size
+            out[:, start:stop] = self.value[self._walk(samples[start:stop])]
+        return out
+
+    @staticmethod
+    def average(per_tree: Matrix) -> NDArray[np.float64]:
+        """Mean over trees, accumulated in tree order exactly like ``ForestRegressor.predict``."""
+        total = np.zeros(per_tree.shape[1], dtype=np.float64)
+        for row in per_tree:
+            total += row
+        total /= per_tree.shape[0]
+        return total
+
+    def predict(self, X: Matrix) -> NDArray[np.float64]:
+        return self.average(self.predict_trees(X))
+
+    @property
+    def bias(self) -> float:
+        """Mean root value: the forest's prediction before any split is taken."""
+        return float(self.value[self.roots].mean())
+
+    def contributions(self, X: Matrix, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Matrix:
+        """Path attribution of every prediction as an ``(n_samples, n_features)`` matrix.
+
+        Each split on a sample's path credits its feature with the change in node value
+        it causes, averaged over trees, so ``bias + contributions.sum(axis=1)`` equals the
+        prediction up to float rounding. All (tree, sample) pairs of a chunk are walked
+        together, and credits are accumulated with one ``bincount`` per level.
+        """
+        samples = np.ascontiguousarray(X, dtype=np.float32)
+        if samples.ndim != 2 or samples.shape[1] != self.n_features:
+            raise ValueError(f"Expected input of shape (n, {self.n_features}), got {samples.shape}")
+        out = np.empty((samples.shape[0], self.n_features), dtype=np.float64)
+        for start in range(0, samples.shape[0], chunk_size):
+            chunk = samples[start : start + chunk_size]
+            out[start : start + chunk.shape[0]] = self._credit(chunk)
+        out /= self.n_trees
+        return out
+
+    def _credit(self, samples: NDArray[np.float32]) -> Matrix:
+        """Summed (not yet averaged) path credits for one chunk; mirrors ``_walk``."""
+        n_samples = samples.shape[0]
+        flat = samples.ravel()
+        nodes = np.repeat(self.roots, n_samples)
+        row_base = np.tile(np.arange(n_samples, dtype=np.intp) * self.n_features, self.n_trees)
+        credit = np.zeros(n_samples * self.n_features, dtype=np.float64)
+        active = np.flatnonzero(self.feature[nodes] >= 0)
+        while active.size:
+            current = nodes[active]
+            cells = row_base[active] + self.feature[current]
+            x = flat[cells]
+            go_right = ~(x <= self.threshold[current])
+            if self._has_missing:
+                go_right &= ~(np.isnan(x) & self.missing_left[current])
+            following = self.children[2 * current + go_right]
+            credit += np.bincount(cells, weights=self.value[following] - self.value[current], minlength=credit.size)
+            nodes[active] = following
+            active = active[self.feature[following] >= 0]
+        return credit.reshape(n_samples, self.n_features)
@@ -1,16 +1,36 @@
-"""In-memory assessment ledger for quick situational awareness dashboards."""
+"""In-memory assessment ledger for quick situational awareness dashboards.
+
+Entries live in preallocated numpy ring buffers (timestamps, scores, band codes,
+confidence and interned district/state ids), so the ledger can hold hundreds of
+thousands of assessments without one Python object each. Per-district and per-state
+aggregates (count, latest, max, EWMA, band counts) are updated incrementally on every
+add and cover everything recorded since start-up, including entries that have since
+been overwritten, so a summary lookup is O(1).
+"""
 
 from __future__ import annotations
 
-from collections import deque
-from dataclasses import dataclass, asdict
-from datetime import datetime
-from typing import Deque, Dict, List
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .scoring import BAND_ORDER, FloodRiskResult
+
+LEDGER_CAPACITY_ENV = "FLOOD_AI_LEDGER_CAPACITY"
+DEFAULT_LEDGER_CAPACITY = 100_000
+DEFAULT_EWMA_ALPHA = 0.3
 
-from .scoring import FloodRiskResult
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_NAIVE = np.iinfo(np.int32).min  # offset marker for timestamps without a timezone
+_BAND_INDEX = {band: code for code, band in enumerate(BAND_ORDER)}
 
 
-@dataclass
+@dataclass(slots=True)
 class HistoryEntry:
     timestamp: datetime
     district: str
@@ -20,31 +40,294 @@ class HistoryEntry:
     confidence: float
 
     def to_dict(self) -> Dict[str, str | float]:
-        payload = asdict(self)
-        payload["timestamp"] = self.timestamp.isoformat()
-        return payload
+        return {
+            "timestamp": self.timestamp.isoformat(),
+            "district": self.district,
+            "state": self.state,
+            "score": self.score,
+            "band": self.band,
+            "confidence": self.confidence,
+        }
+
+
+def _encode_timestamp(value: datetime) -> tuple[int, int]:
+    """Microseconds since the epoch plus the UTC offset in seconds (``_NAIVE`` if none)."""
+    offset = value.utcoffset()
+    aware = value if offset is not None else value.replace(tzinfo=timezone.utc)
+    micros = (aware - _EPOCH) // timedelta(microseconds=1)
+    return micros, int(offset.total_seconds()) if offset is not None else _NAIVE
+
+
+def _decode_timestamp(micros: int, offset: int) -> datetime:
+    value = _EPOCH + timedelta(microseconds=micros)
+    if offset == _NAIVE:
+        return value.replace(tzinfo=None)
+    return value.astimezone(timezone(timedelta(seconds=offset)))
+
+
+class _Aggregates:
+    """Running per-key aggregates stored column-wise and indexed by interned id."""
+
+    def __init__(self, alpha: float, size: int = 64):
+        self.alpha = alpha
+        self.count = np.zeros(size, dtype=np.int64)
+        self.latest_time = np.zeros(size, dtype=np.int64)
+        self.latest_score = np.zeros(size)
+        self.latest_band = np.zeros(size, dtype=np.int8)
+        self.max_score = np.full(size, -np.inf)
+        self.ewma = np.zeros(size)
+        self.bands = np.zeros((size, len(BAND_ORDER)), dtype=np.int64)
+
+    def _reserve(self, size: int) -> None:
+        current = self.count.size
+        if size <= current:
+            return
+        grown = max(size, current * 2)
+        for name in ("count", "latest_time", "latest_score", "latest_band", "max_score", "ewma", "bands"):
+            old = getattr(self, name)
+            fill = -np.inf if name == "max_score" else 0
+            new = np.full((grown, *old.shape[1:]), fill, dtype=old.dtype)
+            new[:current] = old
+            setattr(self, name, new)
+
+    def update_one(self, key: int, time: int, score: float, band: int) -> None:
+        """Scalar form of ``update`` for single assessments, which skips the grouping work."""
+        self._reserve(key + 1)
+        self.bands[key, band] += 1
+        if self.count[key] == 0:
+            self.ewma[key] = score
+            self.max_score[key] = score
+        else:
+            self.ewma[key] = self.alpha * score + (1.0 - self.alpha) * self.ewma[key]
+            self.max_score[key] = max(self.max_score[key], score)
+        if self.count[key] == 0 or time >= self.latest_time[key]:
+            self.latest_time[key] = time
+            self.latest_score[key] = score
+            self.latest_band[key] = band
+        self.count[key] += 1
+
+    def update(
+        self, keys: NDArray[np.intp], times: NDArray[np.int64], scores: NDArray[np.float64], bands: NDArray[np.int8]
+    ) -> None:
+        """Fold a batch (in arrival order) into the aggregates of its keys."""
+        self._reserve(int(keys.max()) + 1)
+        np.add.at(self.bands, (keys, bands), 1)
+        np.maximum.at(self.max_score, keys, scores)
+
+        # group the batch by key, keeping arrival order inside each group
+        order = np.argsort(keys, kind="stable")
+        grouped = keys[order]
+        starts = np.flatnonzero(np.r_[True, grouped[1:] != grouped[:-1]])
+        groups = grouped[starts]
+        sizes = np.diff(np.r_[starts, grouped.size])
+        rank = np.arange(grouped.size) - np.repeat(starts, sizes)
+
+        # EWMA over each group's new values: e_m = (1-a)^m e_0 + sum_j a (1-a)^(m-1-j) x_j.
+        # A key seen for the first time starts from its first value instead of e_0.
+        decay = 1.0 - self.alpha
+        fresh = self.count[groups] == 0
+        first = scores[order[starts]]
+        seeded = np.where(fresh, first, self.ewma[groups])
+        steps = sizes - fresh  # values still to fold in after the seed
+        skip = np.repeat(fresh, sizes) & (rank == 0)
+        remaining = np.repeat(sizes, sizes) - 1 - rank
+        weights = np.where(skip, 0.0, self.alpha * decay ** remaining)
+        folded = np.zeros(groups.size)
+        np.add.at(folded, np.repeat(np.arange(groups.size), sizes), weights * scores[order])
+        self.ewma[groups] = seeded * decay**steps + folded
+        self.count[groups] += sizes
+
+        # latest = newest scenario timestamp; later arrivals win ties
+        newest = np.lexsort((np.arange(keys.size), times, keys))
+        last = newest[np.r_[np.flatnonzero(keys[newest][1:] != keys[newest][:-1]), keys.size - 1]]
+        newer = fresh | (times[last] >= self.latest_time[groups])
+        target, source = groups[newer], last[newer]
+        self.latest_time[target] = times[source]
+        self.latest_score[target] = scores[source]
+        self.latest_band[target] = bands[source]
+
+    def summary(self, key: int) -> Dict[str, Any]:
+        counts = self.bands[key].tolist()
+        return {
+            "count": int(self.count[key]),
+            "latest_score": float(self.latest_score[key]),
+            "latest_band": BAND_ORDER[int(self.latest_band[key])].value,
+            "latest_timestamp": _decode_timestamp(int(self.latest_time[key]), 0).isoformat(),
+            "max_score": float(self.max_score[key]),
+            "ewma_score": round(float(self.ewma[key]), 6),
+            "band_counts": {band.value: count for band, count in zip(BAND_ORDER, counts)},
+        }
 
 
 class HistoryLedger:
-    def __init__(self, capacity: int = 20):
+    def __init__(self, capacity: int = 20, ewma_alpha: float = DEFAULT_EWMA_ALPHA):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if not 0.0 < ewma_alpha <= 1.0:
+            raise ValueError("ewma_alpha must be in (0, 1]")
         self.capacity = capacity
-        self._entries: Deque[HistoryEntry] = deque(maxlen=capacity)
+        self._times = np.zeros(capacity, dtype=np.int64)
+        self._offsets = np.zeros(capacity, dtype=np.int32)
+        self._scores = np.zeros(capacity)
+        self._bands = np.zeros(capacity, dtype=np.int8)
+        self._confidence = np.zeros(capacity)
+        self._districts = np.zeros(capacity, dtype=np.int32)
+        self._states = np.zeros(capacity, dtype=np.int32)
+        self._head = 0  # next slot to write
+        self._size = 0
+        self._names: List[str] = []
+        self._name_ids: Dict[str, int] = {}
+        # districts are keyed by (district, state) so same-named districts stay apart
+        self._district_keys: Dict[tuple[int, int], int] = {}
+        self._district_list: List[tuple[int, int]] = []
+        self._by_district = _Aggregates(ewma_alpha)
+        self._by_state = _Aggregates(ewma_alpha)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "HistoryLedger":
+        return cls(capacity=int(os.getenv(LEDGER_CAPACITY_ENV, str(DEFAULT_LEDGER_CAPACITY))))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _intern(self, name: str) -> int:
+        ident = self._name_ids.get(name)
+        if ident is None:
+            ident = self._name_ids[name] = len(self._names)
+            self._names.append(name)
+        return ident
+
+    def _district_key(self, district: int, state: int) -> int:
+        key = self._district_keys.get((district, state))
+        if key is None:
+            key = self._district_keys[(district, state)] = len(self._district_list)
+            self._district_list.append((district, state))
+        return key
 
     def add(self, result: FloodRiskResult) -> HistoryEntry:
-        entry = HistoryEntry(
-            timestamp=result.scenario.timestamp,
-            district=result.scenario.district,
-            state=result.scenario.state,
+        scenario = result.scenario
+        micros, offset = _encode_timestamp(scenario.timestamp)
+        band = _BAND_INDEX[result.band]
+        with self._lock:
+            state = self._intern(scenario.state)
+            district = self._intern(scenario.district)
+            self._by_district.update_one(self._district_key(district, state), micros, result.score, band)
+            self._by_state.update_one(state, micros, result.score, band)
+            slot = self._head
+            self._times[slot] = micros
+            self._offsets[slot] = offset
+            self._scores[slot] = result.score
+            self._bands[slot] = band
+            self._confidence[slot] = result.confidence
+            self._districts[slot] = district
+            self._states[slot] = state
+            self._head = (slot + 1) % self.capacity
+            self._size = min(self.capacity, self._size + 1)
+        return HistoryEntry(
+            timestamp=scenario.timestamp,
+            district=scenario.district,
+            state=scenario.state,
             score=result.score,
             band=result.band.value,
             confidence=result.confidence,
         )
-        self._entries.appendleft(entry)
-        return entry
+
+    def add_many(self, results: Sequence[FloodRiskResult]) -> None:
+        """Record a batch in order; the newest entries overwrite the oldest when full."""
+        if not results:
+            return
+        if len(results) == 1:
+            self.add(results[0])
+            return
+        encoded = [_encode_timestamp(result.scenario.timestamp) for result in results]
+        times = np.fromiter((micros for micros, _ in encoded), dtype=np.int64, count=len(results))
+        offsets = np.fromiter((offset for _, offset in encoded), dtype=np.int32, count=len(results))
+        scores = np.fromiter((result.score for result in results), dtype=np.float64, count=len(results))
+        confidence = np.fromiter((result.confidence for result in results), dtype=np.float64, count=len(results))
+        bands = np.fromiter((_BAND_INDEX[result.band] for result in results), dtype=np.int8, count=len(results))
+        with self._lock:
+            states = np.fromiter(
+                (self._intern(result.scenario.state) for result in results), dtype=np.int32, count=len(results)
+            )
+            districts = np.fromiter(
+                (self._intern(result.scenario.district) for result in results), dtype=np.int32, count=len(results)
+            )
+            district_keys = np.fromiter(
+                (self._district_key(d, s) for d, s in zip(districts.tolist(), states.tolist())),
+                dtype=np.intp,
+                count=len(results),
+            )
+            self._by_district.update(district_keys, times, scores, bands)
+            self._by_state.update(states.astype(np.intp), times, scores, bands)
+
+            # only the last ``capacity`` entries of an oversized batch survive
+            keep = slice(max(0, len(results) - self.capacity), None)
+            slots = (self._head + np.arange(len(results))[keep]) % self.capacity
+            for buffer, values in (
+                (self._times, times),
+                (self._offsets, offsets),
+                (self._scores, scores),
+                (self._bands, bands),
+                (self._confidence, confidence),
+                (self._districts, districts),
+                (self._states, states),
+            ):
+                buffer[slots] = values[keep]
+            self._head = (self._head + len(results)) % self.capacity
+            self._size = min(self.capacity, self._size + len(results))
 
     def list(self, limit: int | None = None) -> List[Dict[str, str | float]]:
-        entries = list(self._entries)
-        if limit:
-            entries = entries[:limit]
-        return [entry.to_dict() for entry in entries]
+        """Newest entries first, as dicts."""
+        with self._lock:
+            count = min(limit, self._size) if limit else self._size
+            slots = (self._head - 1 - np.arange(count)) % self.capacity
+            rows = zip(
+                self._times[slots].tolist(),
+                self._offsets[slots].tolist(),
+                self._districts[slots].tolist(),
+                self._states[slots].tolist(),
+                self._scores[slots].tolist(),
+                self._bands[slots].tolist(),
+                self._confidence[slots].tolist(),
+            )
+            names = self._names
+            return [
+                HistoryEntry(
+                    timestamp=_decode_timestamp(micros, offset),
+                    district=names[district],
+                    state=names[state],
+                    score=score,
+                    band=BAND_ORDER[band].value,
+                    confidence=confidence,
+                ).to_dict()
+                for micros, offset, district, state, score, band, confidence in rows
+            ]
+
+    def state_summary(self, state: str) -> Dict[str, Any] | None:
+        with self._lock:
+            ident = self._name_ids.get(state)
+            if ident is None or ident >= self._by_state.count.size or not self._by_state.count[ident]:
+                return None
+            return {"state": state, **self._by_state.summary(ident)}
+
+    def district_summary(self, district: str, state: str) -> Dict[str, Any] | None:
+        with self._lock:
+            key = self._district_keys.get((self._name_ids.get(district, -1), self._name_ids.get(state, -1)))
+            if key is None:
+                return None
+            return {"district": district, "state": state, **self._by_district.summary(key)}
 
+    def summaries(self, level: str = "state") -> List[Dict[str, Any]]:
+        """Aggregates for every state (``level="state"``) or district (``"district"``)."""
+        if level not in {"state", "district"}:
+            raise ValueError(f"Unknown summary level '{level}' (expected 'state' or 'district')")
+        with self._lock:
+            names = self._names
+            if level == "district":
+                return [
+                    {"district": names[district], "state": names[state], **self._by_district.summary(key)}
+                    for key, (district, state) in enumerate(self._district_list)
+                ]
+            seen = np.flatnonzero(self._by_state.count[: len(names)])
+            return [{"state": names[ident], **self._by_state.summary(ident)} for ident in seen.tolist()]
@@ -5,7 +5,7 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import Dict, Sequence
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field
 
 FEATURE_DESC = """Each feature is expected to be a normalized score between 0 and 100 "\
 "capturing structural, climatic, and governance factors defined by the Govt. of India."""
@@ -27,7 +27,10 @@ class ScenarioPayload(BaseModel):
     CoastalVulnerability: float = Field(..., ge=0, le=100)
     Landslides: float = Field(..., ge=0, le=100)
     Watersheds: float = Field(..., ge=0, le=100)
-    DeterioratingInfrastructure: float = Field(..., ge=0, le=100)
+    # sample_inputs and older exports call this column InfrastructureDecay
+    DeterioratingInfrastructure: float = Field(
+        ..., ge=0, le=100, validation_alias=AliasChoices("DeterioratingInfrastructure", "InfrastructureDecay")
+    )
     PopulationScore: float = Field(..., ge=0, le=100)
     WetlandLoss: float = Field(..., ge=0, le=100)
     InadequatePlanning: float = Field(..., ge=0, le=100)
@@ -40,7 +43,9 @@ class ScenarioPayload(BaseModel):
     model_config = ConfigDict(str_strip_whitespace=True)
 
     def vector(self, ordered_features: Sequence[str]) -> Sequence[float]:
-        payload = self.model_dump()
-        return [float(payload[name]) for name in ordered_features]
+        # scoring goes through a precomputed ``binding.SchemaBinding``; this resolves per call
+        from .binding import canonical_name
+
+        return [float(getattr(self, canonical_name(name))) for name in ordered_features]
 
 
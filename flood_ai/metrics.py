@@ -0,0 +1,357 @@
+"""In-process latency histograms, counters and a sampling profiler for the hot path.
+
+``stage(name)`` times one step of an assessment (transform, predict, confidence,
+drivers, playbook, persist, ...) into ``flood_ai_stage_seconds``; a timer is two
+``perf_counter`` calls and one locked bucket increment, and with ``FLOOD_AI_METRICS=0``
+it is a shared no-op. Counters owned by other components (cache, storage queue,
+executor) are read at scrape time through registered collectors, so nothing is
+double-counted. ``render`` produces the Prometheus text exposition format.
+
+Metrics are per process: with pre-fork serving each worker reports its own, and
+stage timings recorded inside process-pool workers stay in those workers.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter as _Tally
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Sequence
+
+METRICS_ENV = "FLOOD_AI_METRICS"
+PROFILE_INTERVAL_ENV = "FLOOD_AI_PROFILE_INTERVAL"
+
+# seconds; covers a cached single-row score (~10us) up to a slow bulk batch
+DEFAULT_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025,
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+Labels = tuple  # label values, in the metric's ``labelnames`` order
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter, optionally split by label values."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, *labels: Any) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: Any) -> float:
+        return self._values.get(labels, 0.0)
+
+    def lines(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        if not values and not self.labelnames:
+            values = [((), 0.0)]
+        return [f"{self.name}{_label_text(self.labelnames, labels)} {_number(value)}" for labels, value in values]
+
+
+class Histogram:
+    """Fixed-bucket latency histogram, optionally split by label values."""
+
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [count per bucket (+Inf last), sum, count]
+        self._series: Dict[Labels, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: Any) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self, *labels: Any) -> Dict[str, float]:
+        """Count, sum and estimated p50/p95/p99 (bucket upper bounds) for one label set."""
+        with self._lock:
+            series = self._series.get(labels)
+            counts, total, count = (list(series[0]), series[1], series[2]) if series else ([], 0.0, 0)
+        report: Dict[str, float] = {"count": count, "sum": total}
+        for name, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+            report[name] = self._quantile(counts, count, q)
+        return report
+
+    def _quantile(self, counts: List[int], count: int, q: float) -> float:
+        if not count:
+            return 0.0
+        running = 0
+        for bound, bucket in zip((*self.buckets, float("inf")), counts):
+            running += bucket
+            if running >= q * count:
+                return bound
+        return float("inf")
+
+    def lines(self) -> List[str]:
+        with self._lock:
+            series = sorted((labels, list(counts), total, count) for labels, (counts, total, count) in self._series.items())
+        lines = []
+        for labels, counts, total, count in series:
+            running = 0
+            for bound, bucket in zip((*self.buckets, float("inf")), counts):
+                running += bucket
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_label_text(self.labelnames, labels, le)} {running}")
+            lines.append(f"{self.name}_sum{_label_text(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_label_text(self.labelnames, labels)} {count}")
+        return lines
+
+
+Collector = Callable[[], Mapping[str, Any]]
+
+
+class Registry:
+    """Owned metrics plus collectors that expose other components' stats at scrape time."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Counter | Histogram] = {}
+        self._collectors: Dict[str, tuple[Collector, frozenset]] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), **kwargs: Any) -> Histogram:
+        return self._add(Histogram(name, help, labelnames, **kwargs))
+
+    def _add(self, metric: Any) -> Any:
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def register_collector(self, prefix: str, collect: Collector, counters: Iterable[str] = ()) -> None:
+        """Expose ``collect()``'s numeric values as ``flood_ai_<prefix>_<key>``.
+
+        Keys in ``counters`` are exported as counters (``_total``), the rest as gauges.
+        Registering the same prefix again replaces the previous collector.
+        """
+        with self._lock:
+            self._collectors[prefix] = (collect, frozenset(counters))
+
+    def unregister_collector(self, prefix: str) -> None:
+        with self._lock:
+            self._collectors.pop(prefix, None)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors.items())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.lines())
+        for prefix, (collect, counters) in collectors:
+            try:
+                values = collect()
+            except Exception:  # a failing component must not break the scrape
+                continue
+            for key, value in values.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                kind = "counter" if key in counters else "gauge"
+                name = f"flood_ai_{prefix}_{key}" + ("_total" if kind == "counter" else "")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"{name} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+STAGE_SECONDS = REGISTRY.histogram(
+    "flood_ai_stage_seconds", "Time spent in each stage of scoring and assessment", ("stage",)
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "flood_ai_request_seconds", "HTTP request latency including validation and serialization", ("method", "route", "status")
+)
+ARTIFACT_LOAD_SECONDS = REGISTRY.histogram(
+    "flood_ai_artifact_load_seconds", "Time to read one model artifact from disk", ("artifact",),
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+PERSIST_FAILURES = REGISTRY.counter(
+    "flood_ai_persist_failures_total", "Assessments that could not be queued for persistence"
+)
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram: Histogram, labels: Labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+
+
+class _NoTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoTimer":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        pass
+
+
+_NO_TIMER = _NoTimer()
+_enabled = os.getenv(METRICS_ENV, "1").strip().lower() not in {"0", "false", "no", "off"}
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def set_enabled(flag: bool) -> None:
+    """Turn stage timers on or off at runtime (collectors and counters are unaffected)."""
+    global _enabled
+    _enabled = bool(flag)
+
+
+def stage(name: str) -> _Timer | _NoTimer:
+    """Context manager recording the wall time of one pipeline stage."""
+    return _Timer(STAGE_SECONDS, (name,)) if _enabled else _NO_TIMER
+
+
+def timed(histogram: Histogram, *labels: Any) -> _Timer:
+    """Context manager timing a rare event into ``histogram``; recorded even when stages are off."""
+    return _Timer(histogram, labels)
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+class SamplingProfiler:
+    """Periodically samples every thread's Python stack and tallies collapsed stacks.
+
+    The tally is in the ``frame;frame;frame count`` format flame graph tools read. It
+    costs nothing while stopped; while running, one background thread wakes every
+    ``interval`` seconds.
+    """
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 64):
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples = 0
+        self._stacks: _Tally = _Tally()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @classmethod
+    def from_env(cls) -> "SamplingProfiler":
+        """A stopped profiler using ``FLOOD_AI_PROFILE_INTERVAL`` (seconds) when set."""
+        interval = os.getenv(PROFILE_INTERVAL_ENV)
+        return cls(interval=float(interval)) if interval else cls()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval: float | None = None) -> None:
+        if interval is not None:
+            if interval <= 0:
+                raise ValueError("interval must be positive")
+            self.interval = interval
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="flood-ai-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stacks.clear()
+            self.samples = 0
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.sample(skip=own)
+
+    def sample(self, skip: int | None = None) -> None:
+        """Take one sample of every thread except ``skip``."""
+        stacks = []
+        for ident, frame in sys._current_frames().items():
+            if ident == skip:
+                continue
+            names = []
+            while frame is not None and len(names) < self.max_depth:
+                code = frame.f_code
+                names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            stacks.append(";".join(reversed(names)))
+        with self._lock:
+            self._stacks.update(stacks)
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        with self._lock:
+            stacks = self._stacks.most_common()
+        return "".join(f"{stack} {count}\n" for stack, count in stacks)
+
+    def status(self, limit: int = 20) -> Dict[str, Any]:
+        with self._lock:
+            top = self._stacks.most_common(limit)
+            samples = self.samples
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "samples": samples,
+            "top": [{"stack": stack, "count": count} for stack, count in top],
+        }
+
+
+profiler = SamplingProfiler.from_env()
@@ -0,0 +1,137 @@
+"""Hot reload of versioned model artifacts into a running scorer."""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+from .artifact_loader import (
+    available_versions,
+    current_version_name,
+    load_bundle,
+    probe_version,
+    reload_artifacts,
+    set_current_version,
+)
+from .scoring import FloodRiskScorer
+
+logger = logging.getLogger(__name__)
+
+WATCH_INTERVAL_ENV = "FLOOD_AI_MODEL_WATCH_INTERVAL"
+
+
+class ModelReloader:
+    """Loads a new artifact version off the request path and swaps it in atomically.
+
+    The new bundle is fully loaded before ``FloodRiskScorer.swap`` replaces the active
+    model, so scoring never pauses; batches already running finish on the version
+    they started with. With ``poll_interval`` set, a watcher thread follows the
+    ``CURRENT`` pointer (or the flat layout's file fingerprint) and reloads when it
+    changes. An explicit ``reload(version)`` pins that version until the pointer
+    itself moves again, so the watcher does not undo an admin rollback.
+    """
+
+    def __init__(self, scorer: FloodRiskScorer, poll_interval: float | None = None):
+        self.scorer = scorer
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: threading.Thread | None = None
+        self._listeners: List[Callable[[str], None]] = []
+        self.last_reload: Dict[str, Any] | None = None
+        self.last_error: str | None = None
+        # pointer value the active model was chosen against; None until the first reload
+        self._followed: str | None = None
+
+    @classmethod
+    def from_env(cls, scorer: FloodRiskScorer) -> "ModelReloader":
+        interval = float(os.getenv(WATCH_INTERVAL_ENV, "0") or 0)
+        return cls(scorer, poll_interval=interval if interval > 0 else None)
+
+    def add_listener(self, listener: Callable[[str], None]) -> None:
+        """Call ``listener(version)`` after each successful swap."""
+        self._listeners.append(listener)
+
+    def reload(self, version: str | None = None) -> Dict[str, Any]:
+        """Load ``version`` (default: the active pointer) and swap it into the scorer."""
+        with self._lock:
+            started = time.perf_counter()
+            try:
+                bundle = load_bundle(version)
+            except Exception as exc:
+                self.last_error = f"{type(exc).__name__}: {exc}"
+                raise
+            previous = self.scorer.swap(bundle)
+            if version is None:
+                # process-wide loader caches follow the pointer, so refresh them with it
+                reload_artifacts()
+                self._followed = bundle.version
+            else:
+                # pinned: remember the pointer as it is now and react only when it moves
+                self._followed = probe_version()
+            self.last_error = None
+            self.last_reload = {
+                "previous": previous,
+                "current": bundle.version,
+                "load_seconds": round(time.perf_counter() - started, 4),
+                "at": time.time(),
+            }
+        logger.info("Swapped model %s -> %s", previous, bundle.version)
+        for listener in list(self._listeners):
+            try:
+                listener(bundle.version)
+            except Exception:
+                logger.exception("Model reload listener failed")
+        return dict(self.last_reload)
+
+    def publish(self, version: str | None = None) -> Dict[str, Any]:
+        """Move ``CURRENT`` to ``version`` and reload from the pointer.
+
+        Pre-fork workers do not share a scorer, so a pinned ``reload(version)`` would
+        only change the worker that served it. Rewriting the pointer instead lets every
+        other worker's watcher pick the version up within one poll interval.
+        """
+        if version is not None:
+            set_current_version(version)
+        return self.reload()
+
+    @property
+    def watching(self) -> bool:
+        return self._watcher is not None and self._watcher.is_alive()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "active": self.scorer.model_version,
+            "pointer": current_version_name(),
+            "available": available_versions(),
+            "watching": self.watching,
+            "last_reload": self.last_reload,
+            "last_error": self.last_error,
+        }
+
+    def _watch(self) -> None:
+        assert self.poll_interval is not None
+        while not self._stop.wait(self.poll_interval):
+            try:
+                pointer = probe_version()
+                followed = self._followed if self._followed is not None else self.scorer.model_version
+                if pointer != followed:
+                    self.reload()
+            except Exception:
+                logger.exception("Background model reload failed; keeping %s", self.scorer.model_version)
+
+    def start(self) -> None:
+        if self.poll_interval is None or (self._watcher is not None and self._watcher.is_alive()):
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name="flood-ai-model-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
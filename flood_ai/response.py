@@ -1,83 +1,218 @@
-"""Rule-based response orchestration tuned for Indian disaster-management workflows."""
+"""Rule-based response orchestration tuned for Indian disaster-management workflows.
+
+The playbook is a list of ``PlaybookRule`` objects (the built-in rules, optionally
+extended or replaced by a JSON file named in ``FLOOD_AI_PLAYBOOK``). At start-up it is
+compiled into one immutable action block per (band, population bucket, state) cell,
+so recommending actions for a batch is an integer key computation plus a table
+lookup, and every assessment in the same cell shares the same preformatted block.
+
+A playbook file looks like::
+
+    {
+      "extend": true,
+      "rules": [
+        {"agency": "ASDMA", "priority": "High", "description": "Open relief camps on char islands",
+         "bands": ["High", "Severe"], "states": ["Assam"], "min_population": 60}
+      ]
+    }
+
+``bands`` defaults to every band; ``min_population`` matches ``PopulationScore`` strictly
+above it; ``states`` restricts a rule to those states. ``"extend": false`` drops the
+built-in rules. When two matching rules name the same agency the later one wins.
+"""
 
 from __future__ import annotations
 
+import json
+import os
 from dataclasses import dataclass
-from typing import Dict, List
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Sequence
+
+import numpy as np
 
-from .scoring import FloodRiskResult, RiskBand
+from .scoring import BAND_ORDER, FloodRiskResult, RiskBand
 
+PLAYBOOK_ENV = "FLOOD_AI_PLAYBOOK"
 
-@dataclass
+_BAND_INDEX = {band: code for code, band in enumerate(BAND_ORDER)}
+
+
+@dataclass(frozen=True)
 class ResponseAction:
     agency: str
     priority: str
     description: str
 
+    @property
+    def text(self) -> str:
+        return f"{self.priority}: {self.description}"
 
-class ResponseEngine:
-    def __init__(self):
-        self.playbook: Dict[RiskBand, List[ResponseAction]] = {
-            RiskBand.LOW: [
-                ResponseAction(
-                    agency="IMD",
-                    priority="Routine",
-                    description="Continue synoptic monitoring and share 6-hourly advisories",
-                ),
-                ResponseAction(
-                    agency="State Water Resources",
-                    priority="Routine",
-                    description="Audit local embankments; prep de-silting teams",
-                ),
-            ],
-            RiskBand.MODERATE: [
-                ResponseAction(
-                    agency="SDMA",
-                    priority="High",
-                    description="Activate district EOCs and ensure mock evacuation drill readiness",
-                ),
-                ResponseAction(
-                    agency="CWC",
-                    priority="High",
-                    description="Increase telemetry frequency for upstream reservoirs",
-                ),
-            ],
-            RiskBand.HIGH: [
-                ResponseAction(
-                    agency="NDRF",
-                    priority="Critical",
-                    description="Pre-position boats, divers, and medical teams within 2 hours",
-                ),
-                ResponseAction(
-                    agency="Ministry of Jal Shakti",
-                    priority="Critical",
-                    description="Issue gate-operation advisories for interstate dams",
-                ),
-            ],
-            RiskBand.SEVERE: [
-                ResponseAction(
-                    agency="Cabinet Committee on Security",
-                    priority="Emergency",
-                    description="Coordinate airlift assets and inter-state resource pooling",
-                ),
-                ResponseAction(
-                    agency="NDMA",
-                    priority="Emergency",
-                    description="Broadcast multi-lingual evacuation orders via SANCHAR network",
-                ),
-            ],
-        }
 
-    def recommend(self, result: FloodRiskResult) -> List[ResponseAction]:
-        base_actions = list(self.playbook[result.band])
-        # Add contextual note for densely populated districts
-        if result.scenario.PopulationScore > 70 and result.band in {RiskBand.HIGH, RiskBand.SEVERE}:
-            base_actions.append(
-                ResponseAction(
-                    agency="MoHFW",
-                    priority="Emergency",
-                    description="Deploy mobile health units and epidemic surveillance teams",
-                )
+@dataclass(frozen=True)
+class PlaybookRule:
+    action: ResponseAction
+    bands: frozenset = frozenset(BAND_ORDER)
+    min_population: float | None = None  # applies when PopulationScore is strictly above
+    states: frozenset | None = None  # casefolded state names; None matches every state
+
+    def matches(self, band: RiskBand, population: float, state: str) -> bool:
+        return (
+            band in self.bands
+            and (self.min_population is None or population > self.min_population)
+            and (self.states is None or state.casefold() in self.states)
+        )
+
+
+def _rule(agency: str, priority: str, description: str, *bands: RiskBand, **conditions: Any) -> PlaybookRule:
+    return PlaybookRule(ResponseAction(agency, priority, description), frozenset(bands), **conditions)
+
+
+DEFAULT_RULES: tuple[PlaybookRule, ...] = (
+    _rule("IMD", "Routine", "Continue synoptic monitoring and share 6-hourly advisories", RiskBand.LOW),
+    _rule("State Water Resources", "Routine", "Audit local embankments; prep de-silting teams", RiskBand.LOW),
+    _rule("SDMA", "High", "Activate district EOCs and ensure mock evacuation drill readiness", RiskBand.MODERATE),
+    _rule("CWC", "High", "Increase telemetry frequency for upstream reservoirs", RiskBand.MODERATE),
+    _rule("NDRF", "Critical", "Pre-position boats, divers, and medical teams within 2 hours", RiskBand.HIGH),
+    _rule("Ministry of Jal Shakti", "Critical", "Issue gate-operation advisories for interstate dams", RiskBand.HIGH),
+    _rule(
+        "Cabinet Committee on Security",
+        "Emergency",
+        "Coordinate airlift assets and inter-state resource pooling",
+        RiskBand.SEVERE,
+    ),
+    _rule("NDMA", "Emergency", "Broadcast multi-lingual evacuation orders via SANCHAR network", RiskBand.SEVERE),
+    # contextual note for densely populated districts
+    _rule(
+        "MoHFW",
+        "Emergency",
+        "Deploy mobile health units and epidemic surveillance teams",
+        RiskBand.HIGH,
+        RiskBand.SEVERE,
+        min_population=70,
+    ),
+)
+
+
+def _parse_band(value: Any) -> RiskBand:
+    for band in BAND_ORDER:
+        if str(value).strip().casefold() == band.value.casefold():
+            return band
+    raise ValueError(f"Unknown risk band '{value}' (expected one of {', '.join(b.value for b in BAND_ORDER)})")
+
+
+def parse_rules(document: Mapping[str, Any]) -> List[PlaybookRule]:
+    """Rules from a parsed playbook document (see the module docstring for the format)."""
+    rules = list(DEFAULT_RULES) if document.get("extend", True) else []
+    for position, raw in enumerate(document.get("rules", [])):
+        try:
+            action = ResponseAction(str(raw["agency"]), str(raw["priority"]), str(raw["description"]))
+        except (KeyError, TypeError) as exc:
+            raise ValueError(f"Playbook rule {position} needs agency, priority and description") from exc
+        bands = raw.get("bands")
+        states = raw.get("states")
+        min_population = raw.get("min_population")
+        rules.append(
+            PlaybookRule(
+                action,
+                frozenset(_parse_band(band) for band in bands) if bands is not None else frozenset(BAND_ORDER),
+                float(min_population) if min_population is not None else None,
+                frozenset(str(state).casefold() for state in states) if states is not None else None,
             )
-        return base_actions
+        )
+    return rules
+
+
+def load_rules(path: Path) -> List[PlaybookRule]:
+    with path.open("r", encoding="utf-8") as handle:
+        return parse_rules(json.load(handle))
 
+
+class ActionBlock(dict):
+    """Read-only agency -> "Priority: description" mapping shared by every assessment in a cell.
+
+    A ``dict`` subclass so it serializes like the per-request dicts it replaces.
+    """
+
+    __slots__ = ("actions",)
+
+    def __init__(self, actions: Sequence[ResponseAction]):
+        # one action per agency, the later rule winning but keeping the first one's position
+        by_agency: Dict[str, ResponseAction] = {}
+        for action in actions:
+            by_agency[action.agency] = action
+        super().__init__((agency, action.text) for agency, action in by_agency.items())
+        self.actions = tuple(by_agency.values())
+
+    def __reduce__(self) -> tuple:
+        # rebuilt from the actions: unpickling item by item would hit the read-only guard
+        return (type(self), (self.actions,))
+
+    def _read_only(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError("ActionBlock is shared between assessments and cannot be modified")
+
+    __setitem__ = __delitem__ = update = pop = popitem = clear = setdefault = __ior__ = _read_only  # type: ignore
+
+
+class ResponseEngine:
+    def __init__(self, rules: Sequence[PlaybookRule] | None = None):
+        self.rules: tuple[PlaybookRule, ...] = tuple(rules) if rules is not None else DEFAULT_RULES
+        # population cut points and the states that have their own rules define the cells
+        self._cutoffs = np.array(sorted({rule.min_population for rule in self.rules if rule.min_population is not None}))
+        states = sorted({state for rule in self.rules if rule.states for state in rule.states})
+        self._state_ids = {state: position + 1 for position, state in enumerate(states)}  # 0 = any other state
+        self._n_population = len(self._cutoffs) + 1
+        self._n_states = len(states) + 1
+        self._blocks = self._compile([""] + states)
+
+    @classmethod
+    def from_env(cls) -> "ResponseEngine":
+        """The built-in rules, plus those in the ``FLOOD_AI_PLAYBOOK`` JSON file when it is set."""
+        path = os.getenv(PLAYBOOK_ENV)
+        return cls(load_rules(Path(path))) if path else cls()
+
+    def _compile(self, states: List[str]) -> List[ActionBlock]:
+        # a representative PopulationScore inside each bucket: (cutoff[i-1], cutoff[i]]
+        representatives = [float("-inf"), *self._cutoffs.tolist()]
+        blocks = []
+        for band in BAND_ORDER:
+            for lower in representatives:
+                population = np.nextafter(lower, np.inf) if lower != float("-inf") else lower
+                for state in states:
+                    matching = [rule.action for rule in self.rules if rule.matches(band, population, state)]
+                    blocks.append(ActionBlock(matching))
+        return blocks
+
+    @property
+    def blocks(self) -> int:
+        return len(self._blocks)
+
+    def agencies(self) -> List[str]:
+        """Every agency the playbook can assign, in rule order."""
+        return list(dict.fromkeys(rule.action.agency for rule in self.rules))
+
+    def _keys(self, bands: Iterable[RiskBand], population: Iterable[float], states: Iterable[str]) -> np.ndarray:
+        band_codes = np.fromiter((_BAND_INDEX[band] for band in bands), dtype=np.intp)
+        buckets = np.searchsorted(self._cutoffs, np.fromiter(population, dtype=float), side="left")
+        lookup = self._state_ids
+        state_ids = np.fromiter((lookup.get(state.casefold(), 0) for state in states), dtype=np.intp)
+        return (band_codes * self._n_population + buckets) * self._n_states + state_ids
+
+    def blocks_for(self, results: Sequence[FloodRiskResult]) -> List[ActionBlock]:
+        """The shared action block of every result, computed as one vectorized key lookup."""
+        if not results:
+            return []
+        scenarios = [result.scenario for result in results]
+        keys = self._keys(
+            (result.band for result in results),
+            (scenario.PopulationScore for scenario in scenarios),
+            (scenario.state for scenario in scenarios) if self._n_states > 1 else ("" for _ in scenarios),
+        )
+        blocks = self._blocks
+        return [blocks[key] for key in keys.tolist()]
+
+    def block_for(self, result: FloodRiskResult) -> ActionBlock:
+        return self.blocks_for([result])[0]
+
+    def recommend(self, result: FloodRiskResult) -> List[ResponseAction]:
+        return list(self.block_for(result).actions)
@@ -0,0 +1,289 @@
+"""Hourly/daily per-district rollups of stored assessments, and raw-row retention.
+
+Every batch committed by ``AssessmentStore`` is folded into ``assessment_rollups`` in
+the same transaction: one row per (grain, bucket, state, district) holding the count,
+score sum/max and a band histogram. Trend queries read these rows only, so they never
+decode payloads and keep working after old raw rows have been compacted away.
+
+``RetentionPolicy`` decides how long raw rows (and hourly rollups) are kept;
+``RetentionScheduler`` applies it periodically off the request path, followed by an
+incremental vacuum so the file actually shrinks.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+RAW_RETENTION_DAYS_ENV = "FLOOD_AI_RAW_RETENTION_DAYS"
+HOURLY_RETENTION_DAYS_ENV = "FLOOD_AI_HOURLY_ROLLUP_DAYS"
+COMPACTION_INTERVAL_ENV = "FLOOD_AI_COMPACTION_INTERVAL"
+
+GRAINS = ("hourly", "daily")
+BANDS = ("Low", "Moderate", "High", "Severe")
+_BAND_COLUMNS = tuple(band.lower() for band in BANDS)
+
+# Bucket start for a normalized UTC timestamp (``YYYY-MM-DDTHH:MM:SS.ffffff+00:00``),
+# in the same text format so buckets compare with raw timestamps.
+_BUCKET_SUFFIX = {"hourly": (13, ":00:00.000000+00:00"), "daily": (10, "T00:00:00.000000+00:00")}
+_NORMALIZED_GLOB = "[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]T[0-9][0-9]:*+00:00"
+
+RollupKey = Tuple[str, str, str | None, str | None]  # (grain, bucket, state, district)
+
+SCHEMA_SQL = f"""
+CREATE TABLE IF NOT EXISTS assessment_rollups (
+    grain TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT '',
+    district TEXT NOT NULL DEFAULT '',
+    count INTEGER NOT NULL,
+    scored INTEGER NOT NULL,
+    score_sum REAL NOT NULL,
+    score_max REAL,
+    {", ".join(f"{column} INTEGER NOT NULL" for column in _BAND_COLUMNS)},
+    PRIMARY KEY (grain, bucket, state, district)
+) WITHOUT ROWID
+"""
+
+UPSERT_SQL = f"""
+INSERT INTO assessment_rollups
+    (grain, bucket, state, district, count, scored, score_sum, score_max, {", ".join(_BAND_COLUMNS)})
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, {", ".join("?" * len(_BAND_COLUMNS))})
+ON CONFLICT (grain, bucket, state, district) DO UPDATE SET
+    count = count + excluded.count,
+    scored = scored + excluded.scored,
+    score_sum = score_sum + excluded.score_sum,
+    score_max = CASE
+        WHEN score_max IS NULL THEN excluded.score_max
+        WHEN excluded.score_max IS NULL THEN score_max
+        ELSE MAX(score_max, excluded.score_max)
+    END,
+    {", ".join(f"{column} = {column} + excluded.{column}" for column in _BAND_COLUMNS)}
+"""
+
+
+def bucket_for(timestamp: str | None, grain: str) -> str | None:
+    """Bucket start for a normalized timestamp, or ``None`` when it is not normalized."""
+    if not timestamp or len(timestamp) < 26 or not timestamp.endswith("+00:00") or timestamp[10:11] != "T":
+        return None
+    width, suffix = _BUCKET_SUFFIX[grain]
+    return timestamp[:width] + suffix
+
+
+def ensure_schema(conn: sqlite3.Connection) -> None:
+    """Create the rollup table, backfilling it from raw rows the first time."""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'assessment_rollups'"
+    ).fetchone()
+    conn.execute(SCHEMA_SQL)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_rollups_state ON assessment_rollups (grain, state, bucket)")
+    if not exists:
+        backfill(conn)
+
+
+def backfill(conn: sqlite3.Connection) -> None:
+    """Rebuild rollups for every raw row (used when the table is first created)."""
+    band_sums = ", ".join(f"COALESCE(SUM(band_rank = {rank}), 0)" for rank in range(len(BANDS)))
+    for grain in GRAINS:
+        width, suffix = _BUCKET_SUFFIX[grain]
+        conn.execute(
+            f"""
+            INSERT INTO assessment_rollups
+                (grain, bucket, state, district, count, scored, score_sum, score_max, {", ".join(_BAND_COLUMNS)})
+            SELECT ?, substr(timestamp, 1, {width}) || ?, COALESCE(state, ''), COALESCE(district, ''),
+                   COUNT(*), COUNT(score), COALESCE(SUM(score), 0), MAX(score), {band_sums}
+            FROM assessments
+            WHERE timestamp GLOB ?
+            GROUP BY 2, 3, 4
+            """,
+            (grain, suffix, _NORMALIZED_GLOB),
+        )
+
+
+def deltas(rows: Iterable[Sequence[Any]]) -> List[tuple]:
+    """Upsert parameters for a batch of ``INSERT_SQL`` rows, merged per rollup key.
+
+    Rows are ``(district, state, timestamp, score, band, band_rank, confidence, ...)``.
+    """
+    merged: Dict[RollupKey, List[Any]] = {}
+    for district, state, timestamp, score, _band, band_rank, *_ in rows:
+        for grain in GRAINS:
+            bucket = bucket_for(timestamp, grain)
+            if bucket is None:
+                continue
+            key = (grain, bucket, state or "", district or "")
+            entry = merged.get(key)
+            if entry is None:
+                entry = merged[key] = [0, 0, 0.0, None, *([0] * len(BANDS))]
+            entry[0] += 1
+            if score is not None:
+                entry[1] += 1
+                entry[2] += score
+                entry[3] = score if entry[3] is None else max(entry[3], score)
+            if band_rank is not None:
+                entry[4 + band_rank] += 1
+    return [(*key, *values) for key, values in merged.items()]
+
+
+def apply(conn: sqlite3.Connection, rows: Sequence[Sequence[Any]]) -> None:
+    """Fold freshly inserted rows into the rollups (call inside the insert transaction)."""
+    conn.executemany(UPSERT_SQL, deltas(rows))
+
+
+def trends(
+    conn: sqlite3.Connection,
+    grain: str = "daily",
+    state: str | None = None,
+    district: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    by: str | None = None,
+    limit: int = 500,
+) -> List[Dict[str, Any]]:
+    """Bucketed aggregates read from the rollups, oldest bucket first.
+
+    ``by`` splits each bucket per ``"state"`` or ``"district"``; otherwise every matching
+    district is merged into one series. ``since``/``until`` are normalized timestamps.
+    """
+    if grain not in GRAINS:
+        raise ValueError(f"Unknown grain '{grain}' (expected one of {', '.join(GRAINS)})")
+    if by not in (None, "state", "district"):
+        raise ValueError(f"Unknown grouping '{by}' (expected 'state' or 'district')")
+    clauses = ["grain = ?"]
+    params: List[Any] = [grain]
+    if state is not None:
+        clauses.append("state = ?")
+        params.append(state)
+    if district is not None:
+        clauses.append("district = ?")
+        params.append(district)
+    if since is not None:
+        clauses.append("bucket >= ?")
+        params.append(since)
+    if until is not None:
+        clauses.append("bucket < ?")
+        params.append(until)
+    group = ["bucket"] + (["state"] if by else []) + (["district"] if by == "district" else [])
+    band_sums = ", ".join(f"SUM({column})" for column in _BAND_COLUMNS)
+    sql = f"""
+        SELECT {", ".join(group)}, SUM(count), SUM(scored), SUM(score_sum), MAX(score_max), {band_sums}
+        FROM assessment_rollups WHERE {" AND ".join(clauses)}
+        GROUP BY {", ".join(group)} ORDER BY {", ".join(group)} LIMIT ?
+    """
+    items = []
+    for row in conn.execute(sql, (*params, limit)).fetchall():
+        keys, (count, scored, score_sum, score_max, *bands) = row[: len(group)], row[len(group) :]
+        item: Dict[str, Any] = dict(zip(group, keys))
+        item.update(
+            count=count,
+            mean_score=round(score_sum / scored, 6) if scored else None,
+            max_score=score_max,
+            bands=dict(zip(BANDS, bands)),
+        )
+        items.append(item)
+    return items
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """How long raw assessments and hourly rollups are kept (``None`` keeps them forever)."""
+
+    raw_days: float | None = None
+    hourly_days: float | None = 90.0
+    interval: float = 3600.0  # seconds between scheduled compactions
+    vacuum_pages: int = 0  # pages reclaimed per incremental vacuum (0 = all free pages)
+
+    @classmethod
+    def from_env(cls) -> "RetentionPolicy":
+        raw = os.getenv(RAW_RETENTION_DAYS_ENV)
+        hourly = os.getenv(HOURLY_RETENTION_DAYS_ENV)
+        return cls(
+            raw_days=float(raw) if raw else None,
+            hourly_days=float(hourly) if hourly else 90.0,
+            interval=float(os.getenv(COMPACTION_INTERVAL_ENV, "3600") or 3600),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.raw_days is not None or self.hourly_days is not None
+
+
+def _cutoff(now: datetime, days: float) -> str:
+    return (now - timedelta(days=days)).astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+
+def compact(conn: sqlite3.Connection, policy: RetentionPolicy, now: datetime | None = None) -> Dict[str, Any]:
+    """Delete raw rows and hourly rollups past their horizon, then reclaim the space.
+
+    The raw horizon applies to when a row was stored (``inserted_at``), not to its
+    client-supplied scenario timestamp, so a backdated reanalysis is kept for the full
+    horizon. Raw rows are already counted in the rollups, so trends are unaffected.
+    A database created before incremental vacuum was enabled gets one full ``VACUUM``
+    to switch it over.
+    """
+    now = now or datetime.now(timezone.utc)
+    started = time.perf_counter()
+    report: Dict[str, Any] = {"raw_deleted": 0, "hourly_deleted": 0, "vacuum": None}
+    with conn:
+        if policy.raw_days is not None:
+            report["raw_deleted"] = conn.execute(
+                "DELETE FROM assessments WHERE inserted_at < ?", (_cutoff(now, policy.raw_days),)
+            ).rowcount
+        if policy.hourly_days is not None:
+            report["hourly_deleted"] = conn.execute(
+                "DELETE FROM assessment_rollups WHERE grain = 'hourly' AND bucket < ?",
+                (_cutoff(now, policy.hourly_days),),
+            ).rowcount
+    if report["raw_deleted"] or report["hourly_deleted"]:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+            pages = f"({policy.vacuum_pages})" if policy.vacuum_pages else ""
+            # the pragma frees pages as its rows are stepped through
+            conn.execute(f"PRAGMA incremental_vacuum{pages}").fetchall()
+            report["vacuum"] = "incremental"
+        else:
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+            report["vacuum"] = "full"
+    report["seconds"] = round(time.perf_counter() - started, 4)
+    return report
+
+
+class RetentionScheduler:
+    """Runs ``compact`` every ``policy.interval`` seconds on a daemon thread."""
+
+    def __init__(self, run: Callable[[], Dict[str, Any]], policy: RetentionPolicy):
+        self.run = run
+        self.policy = policy
+        self.last_report: Dict[str, Any] | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.policy.interval):
+            try:
+                self.last_report = self.run()
+            except Exception:
+                logger.exception("Scheduled assessment compaction failed")
+
+    def start(self) -> None:
+        if not self.policy.enabled or self.policy.interval <= 0:
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="flood-ai-compaction", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
@@ -2,21 +2,36 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import os
+import threading
+import time
+from dataclasses import dataclass, replace
 from enum import Enum
-from statistics import pstdev
-from typing import Dict, Sequence
+from typing import Any, Callable, Dict, List, Sequence
 
 import numpy as np
-import pandas as pd
 from numpy.typing import NDArray
 
-from .artifact_loader import load_feature_names, load_model, load_scaler
+from .artifact_loader import ArtifactBundle, add_reload_listener, current_bundle
+from .attribution import DEFAULT_TOP_K, Attribution, AttributionMethod, DriverAttributor, default_top_k
+from .binding import SchemaBinding
+from .cache import CachedScore, ScoreCache
+from .ensemble import EnsembleEvaluator
 from .input_schema import ScenarioPayload
+from .metrics import stage
 from .surrogate import SurrogateRegressor
+from .uncertainty import UncertaintyEstimator, UncertaintyReport
 
 
 Vector = NDArray[np.float64]
+Matrix = NDArray[np.float64]
+
+FAST_START_ENV = "FLOOD_AI_FAST_START"
+
+
+def fast_start_enabled() -> bool:
+    """Whether scorers defer loading artifacts until first use (``FLOOD_AI_FAST_START``)."""
+    return os.getenv(FAST_START_ENV, "").strip().lower() in {"1", "true", "yes", "on"}
 
 
 class RiskBand(str, Enum):
@@ -26,6 +41,10 @@ class RiskBand(str, Enum):
     SEVERE = "Severe"
 
 
+# Positional band lookup used by the vectorized scoring path (index == band code).
+BAND_ORDER: tuple[RiskBand, ...] = (RiskBand.LOW, RiskBand.MODERATE, RiskBand.HIGH, RiskBand.SEVERE)
+
+
 @dataclass
 class FloodRiskResult:
     score: float
@@ -34,9 +53,11 @@ class FloodRiskResult:
     feature_order: Sequence[str]
     scenario: ScenarioPayload
     drivers: Sequence[Dict[str, float]]
+    model_version: str | None = None
+    uncertainty: UncertaintyReport | None = None
 
     def to_dict(self) -> Dict[str, object]:
-        return {
+        payload: Dict[str, object] = {
             "score": round(self.score, 2),
             "band": self.band.value,
             "confidence": round(self.confidence, 2),
@@ -44,16 +65,139 @@ class FloodRiskResult:
             "state": self.scenario.state,
             "timestamp": self.scenario.timestamp.isoformat(),
             "drivers": self.drivers,
+            "model_version": self.model_version,
         }
+        if self.uncertainty is not None:
+            payload["uncertainty"] = self.uncertainty.to_dict()
+        return payload
 
 
-class FloodRiskScorer:
-    def __init__(self):
-        self.feature_names: list[str] = list(load_feature_names())
-        self.scaler = load_scaler()
-        self.model = load_model()
+def _array_transform(scaler: Any, feature_names: Sequence[str]) -> Callable[[Matrix], Matrix] | None:
+    """Plain-numpy equivalent of ``scaler.transform`` for fitted ``StandardScaler`` objects.
+
+    Performs the same in-place float64 operations as sklearn, minus input validation and
+    the DataFrame that would otherwise be built to satisfy its feature-name check.
+    """
+    if type(scaler).__name__ != "StandardScaler" or not type(scaler).__module__.startswith("sklearn."):
+        return None
+    fitted_names = getattr(scaler, "feature_names_in_", None)
+    if fitted_names is not None and list(fitted_names) != list(feature_names):
+        return None
+    if getattr(scaler, "n_features_in_", len(feature_names)) != len(feature_names):
+        return None
+    mean = scaler.mean_ if scaler.with_mean else None
+    scale = scaler.scale_ if scaler.with_std else None
+
+    def transform(matrix: Matrix) -> Matrix:
+        samples = np.array(matrix, dtype=np.float64)
+        if mean is not None:
+            samples -= mean
+        if scale is not None:
+            samples /= scale
+        return samples
+
+    return transform
+
+
+@dataclass
+class MatrixScores:
+    """Scores for a raw feature matrix, as parallel arrays."""
+
+    model_version: str
+    scores: Vector
+    band_codes: NDArray[np.intp]
+    confidence: Vector
+
+    def bands(self) -> List[str]:
+        return [BAND_ORDER[code].value for code in self.band_codes.tolist()]
+
+
+class ScoringModel:
+    """One loaded artifact version plus the helpers derived from it.
+
+    Instances are never mutated; ``FloodRiskScorer.swap`` replaces the whole object so
+    a batch that started on one version finishes on it.
+    """
+
+    def __init__(self, bundle: ArtifactBundle):
+        self.bundle = bundle
+        self.version = bundle.version
+        self.feature_names: list[str] = list(bundle.feature_names)
+        self.scaler = bundle.scaler
+        self.model = bundle.model
         self.uses_surrogate = isinstance(self.model, SurrogateRegressor)
         self.feature_importances = getattr(self.model, "feature_importances_", None)
+        # resolved once per version; raises SchemaBindingError if the artifacts and schema disagree
+        self.binding = SchemaBinding.build(self.feature_names)
+        self.ensemble = EnsembleEvaluator(self.model)
+        self.attributor = DriverAttributor(self.feature_names, self.model, forest=self.ensemble.compiled)
+        self._transform = None if self.uses_surrogate else _array_transform(self.scaler, self.feature_names)
+
+    def _samples(self, matrix: Matrix) -> Matrix:
+        """Model input for a raw feature matrix (scaled unless the model is the surrogate)."""
+        if self.uses_surrogate:
+            return matrix
+        if self._transform is not None:
+            return self._transform(matrix)
+        import pandas as pd  # only scalers without a numpy fast path need a DataFrame
+
+        frame = pd.DataFrame(matrix, columns=list(self.feature_names))
+        return self.scaler.transform(frame)
+
+    def transform(self, matrix: Matrix) -> Matrix:
+        """``_samples`` timed as the transform stage; pass the result on to avoid rescaling."""
+        with stage("transform"):
+            return self._samples(matrix)
+
+    def predict_many(self, matrix: Matrix, samples: Matrix | None = None) -> tuple[Vector, Vector]:
+        """Run a single ensemble pass over a stacked feature matrix.
+
+        Returns predictions and confidences computed from the same per-estimator outputs.
+        ``samples`` is the already transformed matrix, when the caller has it.
+        """
+        if samples is None:
+            samples = self.transform(matrix)
+        output = self.ensemble.evaluate(samples)
+        return output.prediction, output.confidence
+
+    def attribute(self, matrix: Matrix) -> Attribution:
+        return self.attributor.attribute(matrix, self._samples(matrix))
+
+    def drivers_many(
+        self, matrix: Matrix, top_k: int = DEFAULT_TOP_K, samples: Matrix | None = None
+    ) -> List[Sequence[Dict[str, float]]]:
+        if not self.attributor.available:
+            return [[] for _ in range(matrix.shape[0])]
+        if self.attributor.method is AttributionMethod.IMPORTANCE:
+            samples = matrix
+        elif samples is None:
+            samples = self.transform(matrix)
+        with stage("drivers"):
+            return self.attributor.drivers(matrix, samples, top_k)
+
+
+class FloodRiskScorer:
+    def __init__(
+        self,
+        cache: ScoreCache | None = None,
+        bundle: ArtifactBundle | None = None,
+        uncertainty: UncertaintyEstimator | None = None,
+        top_k: int | None = None,
+        lazy: bool | None = None,
+    ):
+        # with ``lazy`` (default: FLOOD_AI_FAST_START) the active version loads on first use
+        self._model: ScoringModel | None = None
+        self._load_lock = threading.Lock()
+        if bundle is not None or not (fast_start_enabled() if lazy is None else lazy):
+            self._model = ScoringModel(bundle or current_bundle())
+        # optional memoization of repeat scenarios (FLOOD_AI_CACHE_SIZE > 0 enables it)
+        self.cache = cache if cache is not None else ScoreCache.from_env()
+        if self.cache is not None:
+            add_reload_listener(self.cache.clear)
+        # optional Monte Carlo spread per result (FLOOD_AI_UNCERTAINTY_SAMPLES > 0 enables it)
+        self.uncertainty = uncertainty if uncertainty is not None else UncertaintyEstimator.from_env()
+        # drivers reported per result unless a call asks for another count (FLOOD_AI_DRIVER_TOP_K)
+        self.top_k = top_k if top_k is not None else default_top_k()
         # Model outputs 0-1 range, so thresholds should match
         self.thresholds: Dict[RiskBand, tuple[float, float]] = {
             RiskBand.LOW: (0, 0.25),
@@ -62,60 +206,196 @@ class FloodRiskScorer:
             RiskBand.SEVERE: (0.75, 1.01),
         }
 
+    @property
+    def _active(self) -> ScoringModel:
+        model = self._model
+        if model is None:
+            with self._load_lock:
+                if self._model is None:
+                    self._model = ScoringModel(current_bundle())
+                model = self._model
+        return model
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def warm_up(self) -> float:
+        """Load the active version and score one scenario; returns the seconds it took."""
+        started = time.perf_counter()
+        active = self._active
+        row = np.full((1, len(active.feature_names)), 50.0)
+        self.score_matrix(row, active)
+        active.drivers_many(row, self.top_k)
+        return time.perf_counter() - started
+
+    # The active model's attributes, kept for callers that predate versioned swaps.
+    @property
+    def active_model(self) -> ScoringModel:
+        return self._active
+
+    @property
+    def model_version(self) -> str:
+        return self._active.version
+
+    @property
+    def feature_names(self) -> list[str]:
+        return self._active.feature_names
+
+    @property
+    def scaler(self):
+        return self._active.scaler
+
+    @property
+    def model(self):
+        return self._active.model
+
+    @property
+    def uses_surrogate(self) -> bool:
+        return self._active.uses_surrogate
+
+    @property
+    def feature_importances(self):
+        return self._active.feature_importances
+
+    def swap(self, bundle: ArtifactBundle) -> str | None:
+        """Atomically make ``bundle`` the active version; returns the previous one (None if never loaded).
+
+        Derived state is built before the single reference assignment, so concurrent
+        scoring never observes a half-initialised model.
+        """
+        replacement = ScoringModel(bundle)
+        with self._load_lock:
+            previous, self._model = self._model, replacement
+        if self.cache is not None:
+            self.cache.clear()
+        return previous.version if previous is not None else None
+
     def _band_for_score(self, score: float) -> RiskBand:
         for band, (low, high) in self.thresholds.items():
             if low <= score < high:
                 return band
         return RiskBand.SEVERE
 
-    def _confidence(self, sample: Vector) -> float:
-        estimators = getattr(self.model, "estimators_", None)
-        if not estimators:
-            return 0.65
-        tree_scores = [est.predict(sample)[0] for est in estimators]
-        return max(0.0, 100.0 - pstdev(tree_scores))
+    def _band_codes(self, scores: Vector) -> NDArray[np.intp]:
+        """Vectorized equivalent of ``_band_for_score`` returning ``BAND_ORDER`` indices."""
+        lows = np.array([self.thresholds[band][0] for band in BAND_ORDER])
+        highs = np.array([self.thresholds[band][1] for band in BAND_ORDER])
+        codes = np.searchsorted(highs, scores, side="right")
+        # anything outside the configured ranges (or NaN) falls back to SEVERE,
+        # mirroring the scalar lookup above
+        outside = ~((scores >= lows[0]) & (scores < highs[-1]))
+        codes[outside] = BAND_ORDER.index(RiskBand.SEVERE)
+        return np.minimum(codes, len(BAND_ORDER) - 1)
 
-    def _drivers(self, vector: Vector) -> Sequence[Dict[str, float]]:
-        if self.feature_importances is None:
-            return []
-        importances = np.asarray(self.feature_importances)
-        if importances.size != vector.size:
-            return []
-        baseline = 50.0
-        contributions = importances * np.abs(vector - baseline)
-        top_idx = np.argsort(contributions)[::-1][:3]
-        drivers: list[Dict[str, float]] = []
-        for idx in top_idx:
-            if contributions[idx] <= 0:
-                continue
-            drivers.append(
-                {
-                    "feature": self.feature_names[idx],
-                    "score": round(float(vector[idx]), 2),
-                    "impact": round(float(contributions[idx]), 2),
-                }
+    def score(self, scenario: ScenarioPayload) -> FloodRiskResult:
+        return self.score_many([scenario])[0]
+
+    def _score_matrix(self, active: ScoringModel, matrix: Matrix) -> List[CachedScore]:
+        # transform once: the ensemble pass and path attribution read the same samples
+        samples = active.transform(matrix)
+        predictions, confidences = active.predict_many(matrix, samples)
+        band_codes = self._band_codes(predictions)
+        drivers = active.drivers_many(matrix, self.top_k, samples)
+        return [
+            CachedScore(score=score, band_code=code, confidence=confidence, drivers=tuple(row_drivers))
+            for score, code, confidence, row_drivers in zip(
+                predictions.tolist(), band_codes.tolist(), confidences.tolist(), drivers
             )
-        return drivers
+        ]
 
-    def score(self, scenario: ScenarioPayload) -> FloodRiskResult:
-        vector: Vector = np.asarray(scenario.vector(self.feature_names), dtype=float)
-        if self.uses_surrogate:
-            sample = vector.reshape(1, -1)
-            prediction = float(self.model.predict(sample)[0])
-            confidence = self._confidence(sample)
-        else:
-            frame = pd.DataFrame([vector], columns=list(self.feature_names))
-            scaled = self.scaler.transform(frame)
-            prediction = float(self.model.predict(scaled)[0])
-            confidence = self._confidence(scaled)
-        band = self._band_for_score(prediction)
-        drivers = self._drivers(vector)
-        return FloodRiskResult(
-            score=prediction,
-            band=band,
-            confidence=confidence,
-            feature_order=self.feature_names,
-            scenario=scenario,
-            drivers=drivers,
+    def score_matrix(self, matrix: Matrix, active: ScoringModel | None = None) -> MatrixScores:
+        """Score a feature matrix (columns in ``feature_names`` order) in one pass.
+
+        Skips drivers, the result cache and per-row result objects, which makes it the
+        path for large synthetic batches such as what-if sweeps. Pass ``active`` to pin
+        the model version the matrix was built for.
+        """
+        active = active or self._active
+        matrix = np.asarray(matrix, dtype=float).reshape(-1, len(active.feature_names))
+        predictions, confidences = active.predict_many(matrix)
+        return MatrixScores(
+            model_version=active.version,
+            scores=predictions,
+            band_codes=self._band_codes(predictions),
+            confidence=confidences,
         )
 
+    def estimate_uncertainty(self, matrix: Matrix, active: ScoringModel | None = None) -> List[UncertaintyReport]:
+        """Monte Carlo score distribution for each row of ``matrix``, one predict for all samples."""
+        if self.uncertainty is None:
+            raise RuntimeError("Uncertainty estimation is not configured")
+        active = active or self._active
+
+        def score(samples: Matrix) -> tuple[Vector, NDArray[np.intp]]:
+            predictions, _ = active.predict_many(samples)
+            return predictions, self._band_codes(predictions)
+
+        band_names = [band.value for band in BAND_ORDER]
+        with stage("uncertainty"):
+            return self.uncertainty.estimate(matrix, active.binding.fields, score, band_names)
+
+    def _score_through_cache(self, active: ScoringModel, matrix: Matrix) -> List[CachedScore]:
+        assert self.cache is not None
+        with stage("cache"):
+            keys = self.cache.keys(active.version, matrix)
+            rows = self.cache.get_many(keys)
+        missing = [idx for idx, row in enumerate(rows) if row is None]
+        if missing:
+            fresh = self._score_matrix(active, matrix[missing])
+            self.cache.put_many([keys[idx] for idx in missing], fresh)
+            for idx, row in zip(missing, fresh):
+                rows[idx] = row
+        return rows  # type: ignore[return-value]
+
+    def explain(self, matrix: Matrix, active: ScoringModel | None = None) -> Attribution:
+        """Per-feature contributions for every row of a feature matrix, in one pass."""
+        active = active or self._active
+        return active.attribute(np.asarray(matrix, dtype=float).reshape(-1, len(active.feature_names)))
+
+    def score_many(
+        self, scenarios: Sequence[ScenarioPayload], matrix: Matrix | None = None, top_k: int | None = None
+    ) -> List[FloodRiskResult]:
+        """Score a batch of scenarios with one transform/predict pass.
+
+        Results are returned in input order and match ``score`` applied per scenario.
+        ``matrix`` may carry the scenarios' features already stacked in ``feature_names``
+        order (see ``columnar.validate_records``) to skip re-reading them.
+        ``top_k`` overrides the number of drivers per result for this call.
+        With a cache configured, only scenarios without a cached result are scored.
+        With an uncertainty estimator configured, each result also carries its
+        Monte Carlo report.
+        The whole batch is scored by the version that was active when it started.
+        """
+        if not scenarios:
+            return []
+        active = self._active
+        expected = (len(scenarios), len(active.feature_names))
+        if matrix is None:
+            with stage("vectorize"):
+                matrix = active.binding.matrix(scenarios)
+        elif matrix.shape != expected:
+            raise ValueError(f"Feature matrix has shape {matrix.shape}, expected {expected}")
+        if self.cache is None:
+            rows = self._score_matrix(active, matrix)
+        else:
+            rows = self._score_through_cache(active, matrix)
+        if top_k is not None and top_k != self.top_k:
+            drivers = active.drivers_many(matrix, top_k)
+            rows = [replace(row, drivers=tuple(row_drivers)) for row, row_drivers in zip(rows, drivers)]
+        reports: Sequence[UncertaintyReport | None] = (
+            self.estimate_uncertainty(matrix, active) if self.uncertainty is not None else [None] * len(rows)
+        )
+        return [
+            FloodRiskResult(
+                score=row.score,
+                band=BAND_ORDER[row.band_code],
+                confidence=row.confidence,
+                feature_order=active.feature_names,
+                scenario=scenario,
+                drivers=list(row.drivers),
+                model_version=active.version,
+                uncertainty=report,
+            )
+            for scenario, row, report in zip(scenarios, rows, reports)
+        ]
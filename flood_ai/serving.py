@@ -0,0 +1,265 @@
+"""Pre-fork serving: load artifacts once in a parent process and share them with workers.
+
+``uvicorn --workers N`` spawns fresh interpreters, so every worker unpickles its own
+copy of the scaler, feature names and model. Here the parent imports the app (which
+builds the scoring service and loads every artifact), freezes the garbage collector
+so collections never touch those objects, and forks the workers. Children attach to
+the parent's pages copy-on-write: model arrays (numpy buffers and the trees' node
+arrays) are only read, so they stay physically shared no matter how many workers run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import importlib
+import logging
+import os
+import signal
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict
+
+import uvicorn
+
+logger = logging.getLogger(__name__)
+
+RESTART_BACKOFF_ENV = "FLOOD_AI_RESTART_BACKOFF"
+RESTART_MAX_ENV = "FLOOD_AI_RESTART_MAX"
+RESTART_WINDOW_ENV = "FLOOD_AI_RESTART_WINDOW"
+
+_SMAPS_ROLLUP = Path("/proc/self/smaps_rollup")
+_MEMORY_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+_process: Dict[str, Any] = {
+    "role": "single",
+    "worker_index": None,
+    "started_at": time.perf_counter(),
+    "preload_seconds": None,
+    "startup_seconds": None,
+}
+
+
+def memory_usage() -> Dict[str, int]:
+    """Memory of the current process in kB (PSS and private/shared split when available)."""
+    if _SMAPS_ROLLUP.exists():
+        usage: Dict[str, int] = {}
+        for line in _SMAPS_ROLLUP.read_text().splitlines():
+            name, _, rest = line.partition(":")
+            if name in _MEMORY_FIELDS:
+                usage[name.lower()] = int(rest.split()[0])
+        return usage
+    try:
+        import resource
+    except ImportError:  # Windows
+        return {}
+    # ru_maxrss is kB on Linux and bytes on macOS; only the peak is available here
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"max_rss": peak // 1024 if os.uname().sysname == "Darwin" else peak}
+
+
+def is_primary() -> bool:
+    """True in a single-process server and in pre-fork worker 0 (which runs maintenance)."""
+    return _process["role"] == "single" or _process["worker_index"] == 0
+
+
+def is_worker() -> bool:
+    """True in a forked worker of the pre-fork server, where each process has its own model."""
+    return _process["role"] == "worker"
+
+
+def worker_report() -> Dict[str, Any]:
+    return {
+        "pid": os.getpid(),
+        "role": _process["role"],
+        "worker_index": _process["worker_index"],
+        "preload_seconds": _process["preload_seconds"],
+        "startup_seconds": _process["startup_seconds"],
+        "memory_kb": memory_usage(),
+    }
+
+
+async def _on_startup() -> None:
+    _process["startup_seconds"] = round(time.perf_counter() - _process["started_at"], 4)
+    report = worker_report()
+    logger.info(
+        "flood-ai %s %s ready in %.3fs (pss=%s kB, private_dirty=%s kB)",
+        report["role"],
+        report["pid"],
+        report["startup_seconds"],
+        report["memory_kb"].get("pss", "?"),
+        report["memory_kb"].get("private_dirty", "?"),
+    )
+
+
+class RestartPolicy:
+    """Exponential backoff for re-forking crashed workers, giving up on a crash loop.
+
+    A worker that crashed ``n`` times within ``window`` seconds is restarted after
+    ``backoff * 2 ** (n - 1)`` seconds (at most ``max_backoff``); more than
+    ``max_restarts`` crashes within the window means it fails at startup (bad port,
+    config or artifacts), and the server shuts down instead of fork-looping.
+    """
+
+    def __init__(
+        self, backoff: float = 0.5, max_backoff: float = 30.0, max_restarts: int = 5, window: float = 60.0
+    ):
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_restarts = max_restarts
+        self.window = window
+        self._crashes: Dict[int, Deque[float]] = {}
+
+    @classmethod
+    def from_env(cls) -> "RestartPolicy":
+        return cls(
+            backoff=float(os.getenv(RESTART_BACKOFF_ENV, "0.5")),
+            max_restarts=int(os.getenv(RESTART_MAX_ENV, "5")),
+            window=float(os.getenv(RESTART_WINDOW_ENV, "60")),
+        )
+
+    def delay(self, index: int, now: float) -> float | None:
+        """Seconds to wait before restarting worker ``index``, or None to give up."""
+        crashes = self._crashes.setdefault(index, deque())
+        crashes.append(now)
+        while crashes and crashes[0] <= now - self.window:
+            crashes.popleft()
+        if len(crashes) > self.max_restarts:
+            return None
+        return min(self.max_backoff, self.backoff * 2 ** (len(crashes) - 1))
+
+
+def _reap(timeout: float | None) -> tuple[int, int]:
+    """Wait for a child to exit; ``(0, 0)`` when ``timeout`` passes first."""
+    if timeout is None:
+        return os.wait()
+    deadline = time.monotonic() + timeout
+    while True:
+        pid, status = os.waitpid(-1, os.WNOHANG)
+        if pid or time.monotonic() >= deadline:
+            return pid, status
+        time.sleep(min(0.05, max(0.0, deadline - time.monotonic())))
+
+
+def _preload(app_path: str) -> Any:
+    started = time.perf_counter()
+    module_name, _, attr = app_path.partition(":")
+    module = importlib.import_module(module_name)
+    app = getattr(module, attr or "app")
+    warm_up = getattr(module, "warm_up", None)
+    if callable(warm_up):
+        # load artifacts before forking even in fast-start mode, so workers share them
+        warm_up()
+    app.add_event_handler("startup", _on_startup)
+    # collect once, then move every surviving object to the permanent generation so
+    # the children's collectors never write to (and un-share) the preloaded pages
+    gc.collect()
+    gc.freeze()
+    _process["preload_seconds"] = round(time.perf_counter() - started, 4)
+    return app
+
+
+def serve(
+    app_path: str = "api:app",
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    workers: int = 1,
+    log_level: str = "info",
+) -> None:
+    logging.basicConfig(level=log_level.upper())
+    if workers <= 1 or not hasattr(os, "fork"):
+        app = _preload(app_path)
+        uvicorn.run(app, host=host, port=port, log_level=log_level)
+        return
+
+    app = _preload(app_path)
+    _process["role"] = "parent"
+    logger.info("Preloaded %s in %.3fs; parent memory %s", app_path, _process["preload_seconds"], memory_usage())
+    config = uvicorn.Config(app, host=host, port=port, log_level=log_level)
+    sock = config.bind_socket()
+    children: Dict[int, int] = {}
+    restarts: Dict[int, float] = {}  # worker index -> monotonic time its restart is due
+    policy = RestartPolicy.from_env()
+    stopping = False
+    failed = False
+
+    def spawn(index: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                _process.update(role="worker", worker_index=index, started_at=time.perf_counter())
+                uvicorn.Server(config).run(sockets=[sock])
+            except BaseException:
+                logger.exception("Worker %d crashed", index)
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = index
+
+    def stop(signum: int, frame: Any) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for index in range(workers):
+        spawn(index)
+    while children or (restarts and not stopping):
+        now = time.monotonic()
+        for index, due in list(restarts.items()):
+            if stopping:
+                restarts.clear()
+            elif due <= now:
+                del restarts[index]
+                spawn(index)
+        timeout = max(0.0, min(restarts.values()) - now) if restarts else None
+        if not children:
+            time.sleep(timeout or 0)
+            continue
+        try:
+            pid, _status = _reap(timeout)
+        except ChildProcessError:
+            break
+        index = children.pop(pid, None)
+        if index is None or stopping:
+            continue
+        delay = policy.delay(index, time.monotonic())
+        if delay is None:
+            logger.error(
+                "Worker %d crashed %d times within %.0fs; shutting down", index, policy.max_restarts + 1, policy.window
+            )
+            failed = True
+            stop(signal.SIGTERM, None)
+            continue
+        logger.warning("Worker %d (pid %d) exited; restarting in %.1fs", index, pid, delay)
+        restarts[index] = time.monotonic() + delay
+    sock.close()
+    if failed:
+        raise SystemExit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the Flood AI API with preloaded, shared artifacts")
+    parser.add_argument("--app", default="api:app", help="Application import path (module:attribute)")
+    parser.add_argument("--host", default=os.getenv("HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("FLOOD_AI_WORKERS", "1")))
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+    serve(args.app, host=args.host, port=args.port, workers=args.workers, log_level=args.log_level)
+
+
+if __name__ == "__main__":
+    # run through the importable module so the app reports the same process state
+    from flood_ai import serving
+
+    serving.main()
@@ -1,19 +1,60 @@
 """Lightweight persistence for assessments using SQLite.
 
-This module provides a tiny sync-backed API to store and retrieve
-assessment JSON blobs. It keeps dependencies minimal and is intended
-for prototyping; a production deployment should replace this with
-PostgreSQL or another managed DB with proper migrations.
+This module provides a tiny API to store and retrieve assessment JSON blobs.
+Writes are queued and committed in groups by a background writer over a
+long-lived WAL-mode connection so the request path never waits on fsync.
+It keeps dependencies minimal and is intended for prototyping; a production
+deployment should replace this with PostgreSQL or another managed DB with
+proper migrations.
 """
 
 from __future__ import annotations
 
+import atexit
 import json
+import logging
+import os
+import queue
 import sqlite3
+import threading
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Iterable, List
+from typing import Any, Callable, Dict, Iterable, List, Sequence
+
+from . import rollups
+
+logger = logging.getLogger(__name__)
 
 DB_PATH = Path(__file__).resolve().parents[1] / "assessments.db"
+DB_PATH_ENV = "FLOOD_AI_DB_PATH"
+
+INSERT_SQL = (
+    "INSERT INTO assessments (district, state, timestamp, score, band, band_rank, confidence, payload, inserted_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+# Ordinal rank of each risk band so "band >= High" can be answered from an index.
+BAND_RANKS = {"Low": 0, "Moderate": 1, "High": 2, "Severe": 3}
+
+_BAND_LOOKUP = {band.lower(): rank for band, rank in BAND_RANKS.items()}
+
+# Columns added after the first release; older databases are migrated in place.
+_DERIVED_COLUMNS = {"score": "REAL", "band": "TEXT", "band_rank": "INTEGER", "confidence": "REAL"}
+
+# Bumped when a migration rewrites existing rows; stored in ``PRAGMA user_version``.
+_SCHEMA_VERSION = 1
+
+# Summary fields returned by queries and commit notifications without decoding JSON.
+SUMMARY_FIELDS = ("id", "district", "state", "timestamp", "score", "band", "confidence")
+
+CommitListener = Callable[[List[Dict[str, Any]]], None]
+
+
+def resolve_db_path() -> Path:
+    custom = os.getenv(DB_PATH_ENV)
+    if custom:
+        return Path(custom).expanduser().resolve()
+    return DB_PATH
 
 
 def _ensure_db(conn: sqlite3.Connection) -> None:
@@ -24,40 +65,554 @@ def _ensure_db(conn: sqlite3.Connection) -> None:
             district TEXT,
             state TEXT,
             timestamp TEXT,
-            payload TEXT
+            payload TEXT,
+            score REAL,
+            band TEXT,
+            band_rank INTEGER,
+            confidence REAL,
+            inserted_at TEXT
         )
         """
     )
-
-
-def save_assessment(record: Dict) -> None:
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
-    try:
-        _ensure_db(conn)
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(assessments)")}
+    if "inserted_at" not in existing:
+        # retention is keyed on when a row was stored; legacy rows count as stored now,
+        # so they get a full horizon rather than being judged by their scenario time
+        conn.execute("ALTER TABLE assessments ADD COLUMN inserted_at TEXT")
+        conn.execute("UPDATE assessments SET inserted_at = ?", (_utc_now(),))
+    missing = [name for name in _DERIVED_COLUMNS if name not in existing]
+    for name in missing:
+        conn.execute(f"ALTER TABLE assessments ADD COLUMN {name} {_DERIVED_COLUMNS[name]}")
+    if missing:
+        # backfill the new columns from the stored JSON once, at migration time
+        rank_case = " ".join(f"WHEN '{band}' THEN {rank}" for band, rank in BAND_RANKS.items())
         conn.execute(
-            "INSERT INTO assessments (district, state, timestamp, payload) VALUES (?, ?, ?, ?)",
-            (record.get("risk", {}).get("district"), record.get("risk", {}).get("state"), record.get("risk", {}).get("timestamp"), json.dumps(record)),
+            f"""
+            UPDATE assessments SET
+                score = json_extract(payload, '$.risk.score'),
+                band = json_extract(payload, '$.risk.band'),
+                band_rank = CASE json_extract(payload, '$.risk.band') {rank_case} END,
+                confidence = json_extract(payload, '$.risk.confidence')
+            WHERE json_valid(payload)
+            """
         )
-        conn.commit()
-    finally:
-        conn.close()
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_assessments_state_district ON assessments (state, district, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_assessments_state_band ON assessments (state, band_rank, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_assessments_band_score ON assessments (band_rank, score)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_assessments_timestamp ON assessments (timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_assessments_inserted_at ON assessments (inserted_at)")
+    if conn.execute("PRAGMA user_version").fetchone()[0] < _SCHEMA_VERSION:
+        _normalize_legacy_timestamps(conn)
+        conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+    rollups.ensure_schema(conn)
 
 
-def list_assessments(limit: int = 100) -> List[Dict]:
-    conn = sqlite3.connect(DB_PATH)
-    try:
-        _ensure_db(conn)
-        cur = conn.execute("SELECT id, district, state, timestamp, payload FROM assessments ORDER BY id DESC LIMIT ?", (limit,))
-        rows = cur.fetchall()
-        results: List[Dict] = []
-        for _id, district, state, timestamp, payload in rows:
+def _normalize_legacy_timestamps(conn: sqlite3.Connection) -> None:
+    """Rewrite timestamps stored before writes were normalized as UTC ISO-8601.
+
+    Time-window filters, rollups and retention compare the text, so a legacy
+    ``+05:30`` offset would otherwise sort as the wrong instant. Rows that only become
+    bucketable now are folded into existing rollups (a new rollup table backfills them).
+    """
+    has_rollups = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'assessment_rollups'"
+    ).fetchone()
+    updates: List[tuple] = []
+    newly_bucketed: List[tuple] = []
+    rows = conn.execute(
+        "SELECT id, district, state, timestamp, score, band, band_rank, confidence "
+        "FROM assessments WHERE timestamp IS NOT NULL"
+    )
+    for row_id, district, state, timestamp, score, band, band_rank, confidence in rows:
+        normalized = _normalize_timestamp(timestamp)
+        if normalized == timestamp:
+            continue
+        updates.append((normalized, row_id))
+        if has_rollups and rollups.bucket_for(timestamp, "hourly") is None:
+            newly_bucketed.append((district, state, normalized, score, band, band_rank, confidence, None))
+    conn.executemany("UPDATE assessments SET timestamp = ? WHERE id = ?", updates)
+    if newly_bucketed:
+        rollups.apply(conn, newly_bucketed)
+
+
+def _normalize_timestamp(value: Any) -> str | None:
+    """Render timestamps as UTC ISO-8601 with microseconds so text order is time order."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return str(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="microseconds")
+
+
+def _row_for(record: Dict, inserted_at: str) -> tuple:
+    risk = record.get("risk", {})
+    band = risk.get("band")
+    return (
+        risk.get("district"),
+        risk.get("state"),
+        _normalize_timestamp(risk.get("timestamp")),
+        risk.get("score"),
+        band,
+        BAND_RANKS.get(band),
+        risk.get("confidence"),
+        json.dumps(record),
+        inserted_at,
+    )
+
+
+def _band_ranks(bands: Sequence[str]) -> List[int]:
+    ranks = []
+    for band in bands:
+        rank = _BAND_LOOKUP.get(str(band).lower())
+        if rank is None:
+            raise ValueError(f"Unknown risk band '{band}'")
+        ranks.append(rank)
+    return ranks
+
+
+class AssessmentStore:
+    """SQLite-backed assessment store with a background batched writer.
+
+    Each thread gets one long-lived connection (WAL journal, ``synchronous=NORMAL``).
+    ``enqueue`` puts records on a bounded queue; a writer thread drains whatever is
+    queued (up to ``batch_size``) and commits it as one transaction. When the queue
+    stays full for ``put_timeout`` seconds, that record and the rest of the call's
+    records are written synchronously by the caller instead of being dropped, and
+    the event is counted in ``metrics``.
+    """
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        queue_size: int = 1024,
+        batch_size: int = 256,
+        put_timeout: float = 0.5,
+        listeners: List[CommitListener] | None = None,
+    ):
+        self.path = path or resolve_db_path()
+        # called from the committing thread with the summaries of newly stored rows
+        self.listeners: List[CommitListener] = listeners if listeners is not None else []
+        self.batch_size = batch_size
+        self.put_timeout = put_timeout
+        self._queue: "queue.Queue[tuple | None]" = queue.Queue(maxsize=queue_size)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._writer: threading.Thread | None = None
+        self._closed = False
+        # rows accepted onto the queue and rows the writer has finished with (committed or
+        # failed); ``flush`` waits for the second to reach the first as seen at call time
+        self._submitted = 0
+        self._processed = 0
+        self._progress = threading.Condition()
+        self._stats = {
+            "enqueued": 0,
+            "written": 0,
+            "batches": 0,
+            "max_queue_depth": 0,
+            "backpressure_events": 0,
+            "sync_writes": 0,
+            "write_errors": 0,
+            "compactions": 0,
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # run schema setup once per store rather than on every write
+        _ensure_db(self._connection())
+        self._connection().commit()
+
+    # -- connections -----------------------------------------------------
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        # only takes effect before the file is initialised (i.e. ahead of the WAL switch);
+        # older files are converted by their first compaction
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    # -- writes ----------------------------------------------------------
+    def _ensure_writer(self) -> None:
+        if self._writer is not None and self._writer.is_alive():
+            return
+        with self._lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._drain, name="flood-ai-storage-writer", daemon=True)
+                self._writer.start()
+
+    def _write_rows(self, conn: sqlite3.Connection, rows: List[tuple]) -> None:
+        with conn:
+            conn.executemany(INSERT_SQL, rows)
+            rollups.apply(conn, rows)
+            # one transaction holds the write lock, so the new ids are contiguous
+            last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        if self.listeners:
+            first_id = last_id - len(rows) + 1
+            summaries = [
+                {
+                    "id": first_id + offset,
+                    "district": row[0],
+                    "state": row[1],
+                    "timestamp": row[2],
+                    "score": row[3],
+                    "band": row[4],
+                    "confidence": row[6],
+                }
+                for offset, row in enumerate(rows)
+            ]
+            for listener in list(self.listeners):
+                try:
+                    listener(summaries)
+                except Exception:
+                    logger.exception("Assessment commit listener failed")
+
+    def _drain(self) -> None:
+        conn = self._connect()
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            rows = [row for row in batch if row is not None]
             try:
-                parsed = json.loads(payload)
+                if rows:
+                    self._write_rows(conn, rows)
+                    self._stats["written"] += len(rows)
+                    self._stats["batches"] += 1
             except Exception:
-                parsed = {"raw": payload}
-            results.append({"id": _id, "district": district, "state": state, "timestamp": timestamp, "assessment": parsed})
+                # any failure (SQLite or rollup code) must not kill the writer and strand flush()
+                self._stats["write_errors"] += len(rows)
+                logger.exception("Failed to persist %d assessments", len(rows))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+                with self._progress:
+                    self._processed += len(rows)
+                    self._progress.notify_all()
+            if len(rows) != len(batch):
+                # a ``None`` sentinel was received: stop after committing the batch
+                conn.close()
+                return
+
+    def enqueue(self, record: Dict) -> None:
+        self.enqueue_many([record])
+
+    def enqueue_many(self, records: Iterable[Dict]) -> None:
+        if self._closed:
+            raise RuntimeError("AssessmentStore is closed")
+        self._ensure_writer()
+        overflow: List[tuple] = []
+        accepted = 0
+        inserted_at = _utc_now()
+        for record in records:
+            row = _row_for(record, inserted_at)
+            if overflow:
+                # the writer is behind: wait at most one ``put_timeout`` per call, not per row
+                overflow.append(row)
+                continue
+            try:
+                self._queue.put(row, timeout=self.put_timeout)
+                accepted += 1
+            except queue.Full:
+                overflow.append(row)
+        with self._progress:
+            self._submitted += accepted
+        depth = self._queue.qsize()
+        with self._lock:
+            self._stats["enqueued"] += accepted
+            self._stats["backpressure_events"] += len(overflow)
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], depth)
+        if overflow:
+            # never drop audit records: write them on the caller's connection
+            self._write_rows(self._connection(), overflow)
+            with self._lock:
+                self._stats["sync_writes"] += len(overflow)
+
+    def flush(self) -> None:
+        """Block until every record accepted before this call has been committed.
+
+        Rows queued after the call started are not waited for, so readers are not held
+        up by a sustained write stream.
+        """
+        with self._progress:
+            target = self._submitted
+            while self._processed < target:
+                if self._writer is None or not self._writer.is_alive():
+                    return
+                self._progress.wait(timeout=1.0)
+
+    def close(self) -> None:
+        """Flush pending writes, stop the writer and close all connections."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            **self._stats,
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize,
+        }
+
+    # -- reads -----------------------------------------------------------
+    def list(self, limit: int = 100) -> List[Dict]:
+        # reads observe every write accepted before them
+        self.flush()
+        cur = self._connection().execute(
+            "SELECT id, district, state, timestamp, payload FROM assessments ORDER BY id DESC LIMIT ?", (limit,)
+        )
+        results: List[Dict] = []
+        for _id, district, state, timestamp, payload in cur.fetchall():
+            results.append(
+                {"id": _id, "district": district, "state": state, "timestamp": timestamp, "assessment": _decode(payload)}
+            )
         return results
-    finally:
-        conn.close()
 
+    def query(
+        self,
+        *,
+        state: str | None = None,
+        district: str | None = None,
+        bands: Sequence[str] | None = None,
+        min_band: str | None = None,
+        min_score: float | None = None,
+        max_score: float | None = None,
+        since: datetime | str | None = None,
+        until: datetime | str | None = None,
+        before_id: int | None = None,
+        after_id: int | None = None,
+        limit: int = 50,
+        include_payload: bool = False,
+    ) -> Dict[str, Any]:
+        """Filter assessments with keyset pagination over ``id``.
+
+        Pages run newest-first; pass the returned ``next_before_id`` as ``before_id`` to
+        continue. With only ``after_id`` set, rows newer than the cursor are returned
+        oldest-first (``next_after_id`` continues forward). The JSON payload is decoded
+        only when ``include_payload`` is set.
+        """
+        clauses: List[str] = []
+        params: List[Any] = []
+        if state is not None:
+            clauses.append("state = ?")
+            params.append(state)
+        if district is not None:
+            clauses.append("district = ?")
+            params.append(district)
+        if bands:
+            ranks = _band_ranks(bands)
+            clauses.append(f"band_rank IN ({', '.join('?' * len(ranks))})")
+            params.extend(ranks)
+        if min_band is not None:
+            clauses.append("band_rank >= ?")
+            params.append(_band_ranks([min_band])[0])
+        if min_score is not None:
+            clauses.append("score >= ?")
+            params.append(min_score)
+        if max_score is not None:
+            clauses.append("score <= ?")
+            params.append(max_score)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(_normalize_timestamp(since))
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(_normalize_timestamp(until))
+        if before_id is not None:
+            clauses.append("id < ?")
+            params.append(before_id)
+        if after_id is not None:
+            clauses.append("id > ?")
+            params.append(after_id)
+        forward = after_id is not None and before_id is None
+        columns = ", ".join(SUMMARY_FIELDS) + (", payload" if include_payload else "")
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = f"SELECT {columns} FROM assessments {where} ORDER BY id {'ASC' if forward else 'DESC'} LIMIT ?"
+        self.flush()
+        rows = self._connection().execute(sql, (*params, limit + 1)).fetchall()
+        has_more = len(rows) > limit
+        items: List[Dict[str, Any]] = []
+        for row in rows[:limit]:
+            item = dict(zip(SUMMARY_FIELDS, row))
+            if include_payload:
+                item["assessment"] = _decode(row[len(SUMMARY_FIELDS)])
+            items.append(item)
+        page: Dict[str, Any] = {"items": items, "next_before_id": None, "next_after_id": None}
+        if items:
+            if forward:
+                page["next_after_id"] = items[-1]["id"]
+            elif has_more:
+                page["next_before_id"] = items[-1]["id"]
+        return page
+
+    def trends(
+        self,
+        grain: str = "daily",
+        state: str | None = None,
+        district: str | None = None,
+        since: datetime | str | None = None,
+        until: datetime | str | None = None,
+        by: str | None = None,
+        limit: int = 500,
+    ) -> List[Dict[str, Any]]:
+        """Bucketed counts, mean/max score and band histograms, read from the rollups only."""
+        self.flush()
+        return rollups.trends(
+            self._connection(),
+            grain=grain,
+            state=state,
+            district=district,
+            since=_normalize_timestamp(since),
+            until=_normalize_timestamp(until),
+            by=by,
+            limit=limit,
+        )
+
+    def compact(self, policy: rollups.RetentionPolicy | None = None, now: datetime | None = None) -> Dict[str, Any]:
+        """Apply the retention policy (``FLOOD_AI_RAW_RETENTION_DAYS`` etc. by default)."""
+        self.flush()
+        with self._lock:
+            self._stats["compactions"] += 1
+        return rollups.compact(self._connection(), policy or rollups.RetentionPolicy.from_env(), now=now)
+
+    def latest_id(self) -> int:
+        """Id of the newest committed assessment (0 when empty)."""
+        self.flush()
+        return self._connection().execute("SELECT COALESCE(MAX(id), 0) FROM assessments").fetchone()[0]
+
+
+def _decode(payload: str) -> Any:
+    try:
+        return json.loads(payload)
+    except Exception:
+        return {"raw": payload}
+
+
+_store: AssessmentStore | None = None
+_store_lock = threading.Lock()
+_commit_listeners: List[CommitListener] = []
+
+
+def get_store() -> AssessmentStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = AssessmentStore(listeners=_commit_listeners)
+    return _store
+
+
+def save_assessment(record: Dict) -> None:
+    get_store().enqueue(record)
+
+
+def save_assessments(records: Iterable[Dict]) -> None:
+    """Queue many assessments; the writer commits them together."""
+    get_store().enqueue_many(records)
+
+
+def list_assessments(limit: int = 100) -> List[Dict]:
+    return get_store().list(limit=limit)
+
+
+def query_assessments(**filters: Any) -> Dict[str, Any]:
+    """See ``AssessmentStore.query`` for the supported filters."""
+    return get_store().query(**filters)
+
+
+def assessment_trends(**filters: Any) -> List[Dict[str, Any]]:
+    """See ``AssessmentStore.trends`` for the supported filters."""
+    return get_store().trends(**filters)
+
+
+def compact_assessments(policy: rollups.RetentionPolicy | None = None) -> Dict[str, Any]:
+    return get_store().compact(policy)
+
+
+def retention_scheduler(policy: rollups.RetentionPolicy | None = None) -> rollups.RetentionScheduler:
+    """Scheduler that compacts the default store periodically (see ``RetentionPolicy``)."""
+    policy = policy or rollups.RetentionPolicy.from_env()
+    return rollups.RetentionScheduler(lambda: compact_assessments(policy), policy)
+
+
+def latest_assessment_id() -> int:
+    return get_store().latest_id()
+
+
+def add_commit_listener(listener: CommitListener) -> None:
+    """Register a callback receiving summaries of assessments as they are committed."""
+    _commit_listeners.append(listener)
+
+
+def remove_commit_listener(listener: CommitListener) -> None:
+    try:
+        _commit_listeners.remove(listener)
+    except ValueError:
+        pass
+
+
+def flush() -> None:
+    if _store is not None:
+        _store.flush()
+
+
+def shutdown() -> None:
+    """Flush and close the default store (registered to run at interpreter exit)."""
+    global _store
+    with _store_lock:
+        store, _store = _store, None
+    if store is not None:
+        store.close()
+
+
+def storage_metrics() -> Dict[str, int]:
+    return get_store().metrics()
+
+
+def _reset_after_fork() -> None:
+    # SQLite connections and the writer thread must not cross a fork; the child
+    # opens its own store on first use. The parent's objects are kept referenced
+    # (never closed from the child) so finalizers do not touch shared handles.
+    global _store
+    if _store is not None:
+        _inherited_stores.append(_store)
+    _store = None
+
+
+_inherited_stores: List[AssessmentStore] = []
+
+atexit.register(shutdown)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
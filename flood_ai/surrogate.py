@@ -4,6 +4,8 @@ from __future__ import annotations
 
 import numpy as np
 
+from .binding import SchemaBindingError, canonical_name
+
 FEATURE_WEIGHTS = {
     "MonsoonIntensity": 0.18,
     "TopographyDrainage": -0.08,
@@ -20,7 +22,7 @@ FEATURE_WEIGHTS = {
     "CoastalVulnerability": 0.09,
     "Landslides": 0.07,
     "Watersheds": -0.05,
-    "InfrastructureDecay": 0.08,
+    "DeterioratingInfrastructure": 0.08,
     "PopulationScore": 0.11,
     "WetlandLoss": 0.07,
     "InadequatePlanning": 0.10,
@@ -28,6 +30,14 @@ FEATURE_WEIGHTS = {
 }
 
 
+def _weight_for(name: str) -> float:
+    """Heuristic weight of a feature, accepting schema aliases; unknown names are an error."""
+    field = canonical_name(name)
+    if field not in FEATURE_WEIGHTS:
+        raise SchemaBindingError(f"Surrogate has no weight for feature '{name}'")
+    return FEATURE_WEIGHTS[field]
+
+
 class _StubEstimator:
     def __init__(self, offset: float):
         self.offset = offset
@@ -39,36 +49,67 @@ class _StubEstimator:
 
 
 class SurrogateRegressor:
+    """Weighted heuristic scorer with its coefficients compiled once per feature order.
+
+    ``prediction = clip(c + 0.15 * (c - 0.5) ** 2, 0.1, 0.95)`` where
+    ``c = 0.6 * (X / 100) @ w + 0.4 * mean(X) / 100``. Both linear terms are folded into
+    one coefficient column and the row mean into a second, so a batch is reduced by a
+    single ``(n, f) @ (f, 2)`` product and the rest is elementwise work done in place.
+    """
+
     def __init__(self, feature_order: list[str]):
         self.feature_order = feature_order
         self.estimators_ = [_StubEstimator(offset) for offset in (-5, 0, 5)]
+        weights = np.array([_weight_for(name) for name in feature_order], dtype=float)
         # approximate feature importances from the heuristic weights (absolute, normalized)
-        weights = [abs(FEATURE_WEIGHTS.get(name, 0.0)) for name in feature_order]
-        total = sum(weights) or 1.0
-        import numpy as _np
+        total = np.abs(weights).sum() or 1.0
+        self.feature_importances_ = np.abs(weights) / total
+        n_features = max(len(feature_order), 1)
+        # column 0: 60% weighted + 40% baseline, both on the 0-1 scale; column 1: row mean
+        self._coefficients = np.column_stack(
+            [0.6 * weights / 100.0 + 0.4 / (100.0 * n_features), np.full(len(feature_order), 1.0 / n_features)]
+        )
+        self._offsets = np.array([est.offset for est in self.estimators_], dtype=float)
+
+    def _reduce(self, X: np.ndarray) -> np.ndarray:
+        return np.asarray(X, dtype=float) @ self._coefficients
+
+    def _combine(self, combined: np.ndarray) -> np.ndarray:
+        # slight non-linearity to spread scores: high values are pushed higher
+        adjusted = combined - 0.5
+        np.square(adjusted, out=adjusted)
+        adjusted *= 0.15
+        adjusted += combined
+        return np.clip(adjusted, 0.1, 0.95, out=adjusted)
 
-        self.feature_importances_ = _np.array([w / total for w in weights])
+    def _estimators_from_mean(self, mean: np.ndarray) -> np.ndarray:
+        stacked = mean[None, :] + self._offsets[:, None]
+        stacked /= 100.0
+        return np.clip(stacked, 0, 1.0, out=stacked)
+
+    def predict_estimators(self, X: np.ndarray) -> np.ndarray:
+        """Return every stub estimator's prediction as an ``(n_estimators, n_samples)`` matrix."""
+        return self._estimators_from_mean(self._reduce(X)[:, 1])
+
+    def predict_with_estimators(self, X: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Prediction and per-estimator outputs from one pass over ``X``."""
+        reduced = self._reduce(X)
+        return self._combine(reduced[:, 0]), self._estimators_from_mean(reduced[:, 1])
+
+    def feature_contributions(self, X: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Split the linear score ``c`` into a bias and one term per feature.
+
+        Terms are measured against a neutral scenario (every feature at 50), so
+        ``bias + contributions.sum(axis=1) == c``; the final curve is monotonic in ``c``.
+        """
+        weights = self._coefficients[:, 0]
+        contributions = (np.asarray(X, dtype=float) - 50.0) * weights
+        bias = np.full(contributions.shape[0], 50.0 * weights.sum())
+        return bias, contributions
 
     def predict(self, X: np.ndarray) -> np.ndarray:
         """Predict flood risk scores using weighted heuristic.
-        
+
         Returns scores in 0-1 range with realistic variation based on features.
         """
-        weights = np.array([FEATURE_WEIGHTS.get(name, 0.0) for name in self.feature_order])
-        
-        # Weighted contribution from each feature (normalized to 0-1 scale)
-        weighted = np.dot(X / 100.0, weights)
-        
-        # Base score from overall feature average
-        baseline = X.mean(axis=1) / 100.0
-        
-        # Combine weighted and baseline (60% weighted, 40% baseline)
-        combined = 0.6 * weighted + 0.4 * baseline
-        
-        # Apply slight non-linearity to spread scores better
-        # High values get pushed higher, low values stay lower
-        adjusted = combined + 0.15 * (combined - 0.5) ** 2
-        
-        # Clip to valid range 0-1
-        return np.clip(adjusted, 0.1, 0.95)
-
+        return self._combine(self._reduce(X)[:, 0])
@@ -0,0 +1,178 @@
+"""Monte Carlo uncertainty of risk scores under input noise.
+
+Field scores are estimates, so each scenario is also scored at ``samples`` perturbed
+copies of itself (Gaussian noise with a per-feature sigma, clipped to 0-100). All
+copies of a batch go through one ``predict`` call, and the spread of the results
+becomes score quantiles and band probabilities.
+
+The noise table is drawn once from ``seed`` and shared by every scenario (common
+random numbers), so a scenario's report is reproducible and does not depend on the
+other scenarios in its batch.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .binding import canonical_name
+
+UNCERTAINTY_SAMPLES_ENV = "FLOOD_AI_UNCERTAINTY_SAMPLES"
+UNCERTAINTY_SIGMA_ENV = "FLOOD_AI_UNCERTAINTY_SIGMA"
+UNCERTAINTY_SEED_ENV = "FLOOD_AI_UNCERTAINTY_SEED"
+UNCERTAINTY_BUDGET_ENV = "FLOOD_AI_UNCERTAINTY_BUDGET"
+
+Matrix = NDArray[np.float64]
+# maps a (n, n_features) matrix to (scores, band codes)
+ScoreFn = Callable[[Matrix], Tuple[NDArray[np.float64], NDArray[np.intp]]]
+
+FEATURE_RANGE = (0.0, 100.0)
+
+
+@dataclass(frozen=True)
+class UncertaintyReport:
+    samples: int
+    mean: float
+    std: float
+    quantiles: Dict[str, float]
+    band_probabilities: Dict[str, float]
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "samples": self.samples,
+            "mean": round(self.mean, 4),
+            "std": round(self.std, 4),
+            "quantiles": {key: round(value, 4) for key, value in self.quantiles.items()},
+            "band_probabilities": {key: round(value, 4) for key, value in self.band_probabilities.items()},
+        }
+
+
+def parse_sigma(spec: str) -> tuple[float, Dict[str, float]]:
+    """Parse ``"5"`` or ``"5,Siltation=10,MonsoonIntensity=8"`` into (default, per-feature)."""
+    default = 5.0
+    per_feature: Dict[str, float] = {}
+    for part in filter(None, (item.strip() for item in spec.split(","))):
+        name, sep, value = part.partition("=")
+        if sep:
+            per_feature[name.strip()] = float(value)
+        else:
+            default = float(name)
+    return default, per_feature
+
+
+class UncertaintyEstimator:
+    """Scores noisy copies of each scenario and summarizes the resulting distribution.
+
+    ``budget`` bounds the rows of a single scoring call: a batch of ``n`` scenarios
+    uses ``min(samples, budget // n)`` samples each, so large batches degrade to
+    coarser estimates instead of slower responses. Below ``min_samples`` the estimate
+    would be meaningless, so very large batches keep that floor and are scored in
+    chunks of at most ``budget`` perturbed rows (total work then exceeds the budget).
+    """
+
+    def __init__(
+        self,
+        samples: int = 128,
+        sigma: float = 5.0,
+        feature_sigma: Mapping[str, float] | None = None,
+        seed: int = 0,
+        budget: int = 65_536,
+        min_samples: int = 16,
+        quantiles: Sequence[float] = (0.05, 0.5, 0.95),
+    ):
+        if samples <= 0:
+            raise ValueError("samples must be positive")
+        if sigma < 0 or any(value < 0 for value in (feature_sigma or {}).values()):
+            raise ValueError("sigma must be non-negative")
+        self.samples = samples
+        self.sigma = sigma
+        self.feature_sigma = dict(feature_sigma or {})
+        self.seed = seed
+        self.budget = budget
+        self.min_samples = min(min_samples, samples)
+        self.quantiles = tuple(quantiles)
+        self._noise: Dict[tuple[str, ...], Matrix] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "UncertaintyEstimator | None":
+        """Build from ``FLOOD_AI_UNCERTAINTY_*`` settings; ``None`` when disabled (0 samples)."""
+        samples = int(os.getenv(UNCERTAINTY_SAMPLES_ENV, "0") or 0)
+        if samples <= 0:
+            return None
+        sigma, feature_sigma = parse_sigma(os.getenv(UNCERTAINTY_SIGMA_ENV, ""))
+        budget = os.getenv(UNCERTAINTY_BUDGET_ENV)
+        return cls(
+            samples=samples,
+            sigma=sigma,
+            feature_sigma=feature_sigma,
+            seed=int(os.getenv(UNCERTAINTY_SEED_ENV, "0") or 0),
+            budget=int(budget) if budget else 65_536,
+        )
+
+    def samples_for(self, n_scenarios: int) -> int:
+        if n_scenarios <= 0:
+            return 0
+        return max(self.min_samples, min(self.samples, self.budget // n_scenarios))
+
+    def noise(self, fields: Sequence[str]) -> Matrix:
+        """Scaled ``(samples, n_features)`` noise table for a feature order, drawn once."""
+        key = tuple(fields)
+        table = self._noise.get(key)
+        if table is None:
+            sigmas = np.full(len(key), self.sigma)
+            for name, value in self.feature_sigma.items():
+                field = canonical_name(name)
+                if field in key:
+                    sigmas[key.index(field)] = value
+            generator = np.random.default_rng(self.seed)
+            table = generator.standard_normal((self.samples, len(key))) * sigmas
+            with self._lock:
+                table = self._noise.setdefault(key, table)
+        return table
+
+    def estimate(
+        self, matrix: Matrix, fields: Sequence[str], score: ScoreFn, band_names: Sequence[str]
+    ) -> List[UncertaintyReport]:
+        """Reports for each row of ``matrix`` (features in ``fields`` order)."""
+        n_rows = matrix.shape[0]
+        samples = self.samples_for(n_rows)
+        if samples == 0:
+            return []
+        noise = self.noise(fields)[:samples]
+        # (rows, samples, f) -> one scoring pass per chunk of at most ``budget`` rows
+        chunk = max(1, self.budget // samples)
+        score_parts, code_parts = [], []
+        for start in range(0, n_rows, chunk):
+            block = matrix[start : start + chunk]
+            perturbed = block[:, None, :] + noise[None, :, :]
+            np.clip(perturbed, *FEATURE_RANGE, out=perturbed)
+            chunk_scores, chunk_codes = score(perturbed.reshape(block.shape[0] * samples, -1))
+            score_parts.append(np.asarray(chunk_scores).reshape(block.shape[0], samples))
+            code_parts.append(np.asarray(chunk_codes).reshape(block.shape[0], samples))
+        scores = score_parts[0] if len(score_parts) == 1 else np.concatenate(score_parts)
+        codes = code_parts[0] if len(code_parts) == 1 else np.concatenate(code_parts)
+
+        quantiles = np.quantile(scores, self.quantiles, axis=1).T
+        means = scores.mean(axis=1)
+        stds = scores.std(axis=1)
+        # band probabilities: share of samples per band code
+        counts = np.zeros((n_rows, len(band_names)), dtype=np.int64)
+        np.add.at(counts, (np.repeat(np.arange(n_rows), samples), codes.ravel()), 1)
+        probabilities = counts / samples
+        labels = [f"p{round(q * 100):02d}" for q in self.quantiles]
+        return [
+            UncertaintyReport(
+                samples=samples,
+                mean=float(mean),
+                std=float(std),
+                quantiles=dict(zip(labels, row_quantiles.tolist())),
+                band_probabilities=dict(zip(band_names, row_probabilities.tolist())),
+            )
+            for mean, std, row_quantiles, row_probabilities in zip(means, stds, quantiles, probabilities)
+        ]
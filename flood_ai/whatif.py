@@ -0,0 +1,247 @@
+"""What-if sweeps: score base scenarios under grids of feature changes.
+
+A sweep expands one or more base scenarios into a feature matrix, either over the full
+cartesian product of the grids or one feature at a time, and scores it with a single
+``FloodRiskScorer.score_matrix`` pass. Nothing is added to the ledger or storage.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, List, Mapping, Sequence
+
+import numpy as np
+from numpy.typing import NDArray
+from pydantic import BaseModel, Field, field_validator
+
+from .binding import SchemaBindingError, canonical_name
+from .input_schema import ScenarioPayload
+from .scoring import BAND_ORDER, FloodRiskScorer, Matrix, MatrixScores
+
+MAX_SWEEP_POINTS_ENV = "FLOOD_AI_MAX_SWEEP_POINTS"
+DEFAULT_MAX_SWEEP_POINTS = 250_000
+FEATURE_RANGE = (0.0, 100.0)
+
+_BAND_NAMES = np.array([band.value for band in BAND_ORDER])
+
+
+class SweepMode(str, Enum):
+    CARTESIAN = "cartesian"
+    ONE_AT_A_TIME = "one_at_a_time"
+
+
+class SweepTooLarge(ValueError):
+    """Raised when a sweep would score more points than the configured limit."""
+
+
+class WhatIfRequest(BaseModel):
+    base: List[ScenarioPayload] = Field(..., min_length=1, description="One scenario or a list of them")
+    grid: Dict[str, List[float]] = Field(..., min_length=1, description="Values to try per feature")
+    mode: SweepMode = SweepMode.CARTESIAN
+    relative: bool = Field(False, description="Treat grid values as changes to each base value")
+
+    @field_validator("base", mode="before")
+    @classmethod
+    def _single_base(cls, value: Any) -> Any:
+        return [value] if isinstance(value, Mapping) else value
+
+
+@dataclass
+class SweepResult:
+    mode: SweepMode
+    features: tuple[str, ...]
+    grid: Dict[str, NDArray[np.float64]]
+    relative: bool
+    bases: Sequence[ScenarioPayload]
+    baseline: MatrixScores
+    # cartesian: one (n_bases, *grid sizes) surface under "*"; one-at-a-time: (n_bases, size) per feature
+    surfaces: Dict[str, NDArray[np.float64]] = field(default_factory=dict)
+    band_surfaces: Dict[str, NDArray[np.intp]] = field(default_factory=dict)
+
+    @property
+    def points(self) -> int:
+        return int(sum(surface.size for surface in self.surfaces.values()))
+
+    def sensitivities(self) -> Dict[str, Dict[str, float]]:
+        """Per-feature effect of the sweep, averaged over bases.
+
+        ``slope`` is the least-squares score change per unit of the feature and ``swing``
+        the score range across its grid. In one-at-a-time sweeps ``max_drop`` is the
+        largest fall below the baseline and ``band_change_share`` the share of points
+        whose band differs from the baseline. In cartesian sweeps both are taken along
+        the feature's axis: ``max_drop`` from the curve averaged over the other
+        features, and ``band_change_share`` as the share of grid steps that change band.
+        """
+        baseline = self.baseline.scores
+        report: Dict[str, Dict[str, float]] = {}
+        for axis, name in enumerate(self.features, start=1):
+            if self.mode is SweepMode.CARTESIAN:
+                scores = np.moveaxis(self.surfaces["*"], axis, -1)
+                bands = np.moveaxis(self.band_surfaces["*"], axis, -1)
+                curve = scores.reshape(len(baseline), -1, scores.shape[-1]).mean(axis=1)
+                changes = np.diff(bands, axis=-1) != 0 if bands.shape[-1] > 1 else np.zeros(1, dtype=bool)
+            else:
+                scores = curve = self.surfaces[name]
+                changes = self.band_surfaces[name] != self.baseline.band_codes[:, None]
+            values = self.grid[name]
+            centered = values - values.mean()
+            spread = float(centered @ centered)
+            slope = (scores @ centered) / spread if spread > 0 else np.zeros(scores.shape[:-1])
+            report[name] = {
+                "slope": round(float(np.mean(slope)), 6),
+                "swing": round(float(np.mean(scores.max(axis=-1) - scores.min(axis=-1))), 4),
+                "max_drop": round(float(np.mean(baseline - curve.min(axis=-1))), 4),
+                "band_change_share": round(float(np.mean(changes)), 4),
+            }
+        return report
+
+    def _best(self, index: int) -> Dict[str, Any]:
+        """Lowest-scoring point of the sweep for base ``index``."""
+        if self.mode is SweepMode.CARTESIAN:
+            surface = self.surfaces["*"][index]
+            position = np.unravel_index(int(np.argmin(surface)), surface.shape)
+            changes = {name: float(self.grid[name][pos]) for name, pos in zip(self.features, position)}
+            score, code = float(surface[position]), int(self.band_surfaces["*"][index][position])
+        else:
+            candidates = [
+                (float(self.surfaces[name][index].min()), name, int(np.argmin(self.surfaces[name][index])))
+                for name in self.features
+            ]
+            score, name, pos = min(candidates)
+            changes = {name: float(self.grid[name][pos])}
+            code = int(self.band_surfaces[name][index][pos])
+        return {"changes": changes, "score": round(score, 4), "band": BAND_ORDER[code].value}
+
+    def to_dict(self) -> Dict[str, Any]:
+        bases = []
+        for index, scenario in enumerate(self.bases):
+            entry: Dict[str, Any] = {
+                "district": scenario.district,
+                "state": scenario.state,
+                "baseline": {
+                    "score": round(float(self.baseline.scores[index]), 4),
+                    "band": BAND_ORDER[int(self.baseline.band_codes[index])].value,
+                },
+                "best": self._best(index),
+            }
+            if self.mode is SweepMode.CARTESIAN:
+                entry["scores"] = np.round(self.surfaces["*"][index], 4).tolist()
+                entry["bands"] = _BAND_NAMES[self.band_surfaces["*"][index]].tolist()
+            else:
+                entry["features"] = {
+                    name: {
+                        "scores": np.round(self.surfaces[name][index], 4).tolist(),
+                        "bands": _BAND_NAMES[self.band_surfaces[name][index]].tolist(),
+                    }
+                    for name in self.features
+                }
+            bases.append(entry)
+        sensitivity = self.sensitivities()
+        return {
+            "mode": self.mode.value,
+            "relative": self.relative,
+            "model_version": self.baseline.model_version,
+            "features": list(self.features),
+            "grid": {name: values.tolist() for name, values in self.grid.items()},
+            "points": self.points,
+            "bases": bases,
+            "sensitivity": sensitivity,
+            "ranking": sorted(sensitivity, key=lambda name: sensitivity[name]["max_drop"], reverse=True),
+        }
+
+
+class WhatIfAnalyzer:
+    def __init__(self, scorer: FloodRiskScorer, max_points: int = DEFAULT_MAX_SWEEP_POINTS):
+        self.scorer = scorer
+        self.max_points = max_points
+
+    @classmethod
+    def from_env(cls, scorer: FloodRiskScorer) -> "WhatIfAnalyzer":
+        return cls(scorer, max_points=int(os.getenv(MAX_SWEEP_POINTS_ENV, str(DEFAULT_MAX_SWEEP_POINTS))))
+
+    def _grid(self, grid: Mapping[str, Sequence[float]], relative: bool) -> Dict[str, NDArray[np.float64]]:
+        resolved: Dict[str, NDArray[np.float64]] = {}
+        for name, values in grid.items():
+            field_name = canonical_name(name)
+            if field_name in resolved:
+                raise SchemaBindingError(f"Feature '{field_name}' appears more than once in the grid")
+            array = np.asarray(values, dtype=float).ravel()
+            if array.size == 0:
+                raise ValueError(f"Grid for '{name}' is empty")
+            if not np.isfinite(array).all():
+                raise ValueError(f"Grid for '{name}' contains non-finite values")
+            low, high = FEATURE_RANGE
+            if not relative and ((array < low) | (array > high)).any():
+                raise ValueError(f"Grid values for '{name}' must lie within [{low:g}, {high:g}]")
+            resolved[field_name] = array
+        return resolved
+
+    def sweep(
+        self,
+        base: ScenarioPayload | Sequence[ScenarioPayload],
+        grid: Mapping[str, Sequence[float]],
+        mode: SweepMode | str = SweepMode.CARTESIAN,
+        relative: bool = False,
+    ) -> SweepResult:
+        """Score every base scenario at every grid point.
+
+        With ``relative`` the grid holds changes added to each base value (clipped to the
+        feature range) instead of absolute values.
+        """
+        mode = SweepMode(mode)
+        bases = [base] if isinstance(base, ScenarioPayload) else list(base)
+        if not bases:
+            raise ValueError("At least one base scenario is required")
+        values = self._grid(grid, relative)
+        features = tuple(values)
+        sizes = [values[name].size for name in features]
+        per_base = int(np.prod(sizes)) if mode is SweepMode.CARTESIAN else int(sum(sizes))
+        total = per_base * len(bases)
+        if total > self.max_points:
+            raise SweepTooLarge(f"Sweep needs {total} points; the limit is {self.max_points}")
+
+        # one model version for the whole sweep, even if a reload lands meanwhile
+        active = self.scorer.active_model
+        missing = [name for name in features if name not in active.binding.fields]
+        if missing:
+            raise SchemaBindingError(f"Model {active.version} has no feature {', '.join(missing)}")
+        base_matrix = active.binding.matrix(bases)
+        columns = [active.binding.fields.index(name) for name in features]
+        baseline = self.scorer.score_matrix(base_matrix, active)
+        result = SweepResult(
+            mode=mode, features=features, grid=values, relative=relative, bases=bases, baseline=baseline
+        )
+
+        if mode is SweepMode.CARTESIAN:
+            mesh = [axis.ravel() for axis in np.meshgrid(*(values[name] for name in features), indexing="ij")]
+            matrix = _expand(base_matrix, columns, mesh, relative)
+            scored = self.scorer.score_matrix(matrix, active)
+            shape = (len(bases), *sizes)
+            result.surfaces["*"] = scored.scores.reshape(shape)
+            result.band_surfaces["*"] = scored.band_codes.reshape(shape)
+            return result
+
+        blocks = [_expand(base_matrix, [column], [values[name]], relative) for name, column in zip(features, columns)]
+        scored = self.scorer.score_matrix(np.concatenate(blocks), active)
+        offset = 0
+        for name, size in zip(features, sizes):
+            stop = offset + size * len(bases)
+            result.surfaces[name] = scored.scores[offset:stop].reshape(len(bases), size)
+            result.band_surfaces[name] = scored.band_codes[offset:stop].reshape(len(bases), size)
+            offset = stop
+        return result
+
+
+def _expand(base_matrix: Matrix, columns: Sequence[int], points: Sequence[NDArray[np.float64]], relative: bool) -> Matrix:
+    """Rows ``base x point`` (base-major) with ``columns`` set from ``points``."""
+    n_points = points[0].size
+    matrix = np.repeat(base_matrix, n_points, axis=0)
+    for column, point_values in zip(columns, points):
+        tiled = np.tile(point_values, base_matrix.shape[0])
+        if relative:
+            matrix[:, column] = np.clip(matrix[:, column] + tiled, *FEATURE_RANGE)
+        else:
+            matrix[:, column] = tiled
+    return matrix
@@ -2,14 +2,20 @@
 
 from __future__ import annotations
 
+import logging
 from dataclasses import dataclass
-from typing import Dict
+from typing import Any, Dict, List, Sequence
 
+from .alerts import AlertTracker
+from .binding import FEATURE_FIELDS
 from .history import HistoryLedger
 from .input_schema import ScenarioPayload
+from .metrics import PERSIST_FAILURES, stage
 from .response import ResponseEngine
-from .scoring import FloodRiskResult, FloodRiskScorer
-from .storage import save_assessment, list_assessments
+from .scoring import FloodRiskResult, FloodRiskScorer, Matrix
+from .storage import list_assessments, query_assessments, save_assessments
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -23,30 +29,79 @@ class FloodAssessment:
             "actions": self.actions,
         }
 
+    def to_record(self) -> Dict[str, object]:
+        """``to_dict`` plus the scenario's feature values, as persisted for audit/export."""
+        record = self.to_dict()
+        scenario = self.risk.scenario
+        record["features"] = {name: getattr(scenario, name) for name in FEATURE_FIELDS}
+        return record
+
 
 class FloodAssessmentService:
-    def __init__(self):
-        self.scorer = FloodRiskScorer()
-        self.response_engine = ResponseEngine()
-        self.ledger = HistoryLedger(capacity=30)
+    def __init__(self, scorer: FloodRiskScorer | None = None):
+        self.scorer = scorer or FloodRiskScorer()
+        self.response_engine = ResponseEngine.from_env()
+        self.ledger = HistoryLedger.from_env()
+        # one alert per band transition or large score move per district, not per assessment
+        self.alerts = AlertTracker.from_env(self.scorer.thresholds)
 
-    def assess(self, payload: ScenarioPayload) -> FloodAssessment:
+    def warm_up(self) -> float:
+        """Load artifacts and exercise scoring once, so the first request does not pay for it."""
+        return self.scorer.warm_up()
+
+    def _actions_for(self, result: FloodRiskResult) -> Dict[str, str]:
+        return self._actions_many([result])[0]
+
+    def _actions_many(self, results: Sequence[FloodRiskResult]) -> List[Dict[str, str]]:
+        # precompiled, read-only blocks shared by every assessment in the same playbook cell
+        with stage("playbook"):
+            return self.response_engine.blocks_for(results)
+
+    def evaluate(self, payload: ScenarioPayload) -> FloodAssessment:
+        """Score a scenario and build its actions without recording it anywhere."""
         result = self.scorer.score(payload)
-        actions = {
-            action.agency: f"{action.priority}: {action.description}"
-            for action in self.response_engine.recommend(result)
-        }
-        assessment = FloodAssessment(risk=result, actions=actions)
+        return FloodAssessment(risk=result, actions=self._actions_for(result))
+
+    def evaluate_many(
+        self, payloads: Sequence[ScenarioPayload], matrix: Matrix | None = None, top_k: int | None = None
+    ) -> List[FloodAssessment]:
+        results = self.scorer.score_many(payloads, matrix=matrix, top_k=top_k)
+        return [
+            FloodAssessment(risk=result, actions=actions)
+            for result, actions in zip(results, self._actions_many(results))
+        ]
+
+    def record(self, assessments: Sequence[FloodAssessment]) -> None:
+        """Add assessments to the in-memory ledger and queue them for persistence."""
         # keep an in-memory ledger for quick UI views
-        self.ledger.add(result)
-        # persist full assessment for audit/history (non-fatal)
+        results = [assessment.risk for assessment in assessments]
+        with stage("ledger"):
+            self.ledger.add_many(results)
+        with stage("alerts"):
+            self.alerts.observe(results, [assessment.actions for assessment in assessments])
+        # persist full assessment for audit/history (non-fatal, but counted and logged)
         try:
-            save_assessment(assessment.to_dict())
+            with stage("persist"):
+                save_assessments(assessment.to_record() for assessment in assessments)
         except Exception:
-            # best-effort only in prototype
-            pass
+            PERSIST_FAILURES.inc(len(assessments))
+            logger.exception("Could not queue %d assessment(s) for persistence", len(assessments))
+
+    def assess(self, payload: ScenarioPayload) -> FloodAssessment:
+        assessment = self.evaluate(payload)
+        self.record([assessment])
         return assessment
 
+    def assess_many(self, payloads: Sequence[ScenarioPayload]) -> List[FloodAssessment]:
+        """Assess a batch of scenarios with one vectorized scoring pass.
+
+        Assessments are returned in input order and queued for persistence; the
+        background writer commits them in its own batches (see ``AssessmentStore``).
+        """
+        assessments = self.evaluate_many(payloads)
+        self.record(assessments)
+        return assessments
+
     def history(self, limit: int | None = None):
         # prefer persisted history but guard tests and dev runs by returning
         # the in-memory ledger if persisted storage contains older entries
@@ -63,3 +118,6 @@ class FloodAssessmentService:
         except Exception:
             return self.ledger.list(limit=limit)
 
+    def search_history(self, **filters: Any) -> Dict[str, Any]:
+        """Filtered, keyset-paginated view over persisted assessments."""
+        return query_assessments(**filters)
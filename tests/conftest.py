@@ -0,0 +1,37 @@
+"""Shared test fixtures.
+
+The shipped ``flood_scaler.pkl``/``flood_model.pkl`` are Git LFS objects that are not
+always checked out, so the suite builds a small, fully functional artifact directory
+(real feature names, a fitted scaler and a small forest) and points the loader at it.
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from joblib import dump
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _build_artifacts(target: Path) -> None:
+    shutil.copy(REPO_ROOT / "feature_names.pkl", target / "feature_names.pkl")
+    rng = np.random.default_rng(0)
+    features = rng.uniform(0, 100, size=(400, 20))
+    labels = np.clip(features.mean(axis=1) / 100 + rng.normal(0, 0.02, 400), 0, 1)
+    scaler = StandardScaler().fit(features)
+    model = RandomForestRegressor(n_estimators=12, max_depth=6, random_state=0).fit(scaler.transform(features), labels)
+    dump(scaler, target / "flood_scaler.pkl")
+    dump(model, target / "flood_model.pkl")
+
+
+def pytest_configure(config):
+    artifact_dir = Path(tempfile.mkdtemp(prefix="flood-ai-artifacts-"))
+    _build_artifacts(artifact_dir)
+    os.environ["FLOOD_AI_ARTIFACT_DIR"] = str(artifact_dir)
+    # keep test writes out of the repository's assessments.db
+    os.environ["FLOOD_AI_DB_PATH"] = str(artifact_dir / "assessments.db")
@@ -0,0 +1,86 @@
+import asyncio
+from datetime import datetime, timezone
+
+from flood_ai.alerts import AlertTracker
+from flood_ai.binding import FEATURE_FIELDS
+from flood_ai.input_schema import ScenarioPayload
+from flood_ai.scoring import BAND_ORDER, FloodRiskResult, FloodRiskScorer, RiskBand
+
+THRESHOLDS = {
+    RiskBand.LOW: (0, 0.25),
+    RiskBand.MODERATE: (0.25, 0.50),
+    RiskBand.HIGH: (0.50, 0.75),
+    RiskBand.SEVERE: (0.75, 1.01),
+}
+
+
+def _result(score, district="Dhubri", state="Assam"):
+    band = next(band for band in BAND_ORDER if THRESHOLDS[band][0] <= score < THRESHOLDS[band][1])
+    scenario = ScenarioPayload(
+        district=district,
+        state=state,
+        timestamp=datetime(2025, 7, 1, tzinfo=timezone.utc),
+        **{name: 50.0 for name in FEATURE_FIELDS},
+    )
+    return FloodRiskResult(
+        score=score, band=band, confidence=90.0, feature_order=FEATURE_FIELDS, scenario=scenario, drivers=[]
+    )
+
+
+def test_alerts_only_on_transitions_and_jumps():
+    tracker = AlertTracker(THRESHOLDS, score_delta=0.1, band_margin=0.02)
+    scores = [0.45, 0.46, 0.47, 0.51, 0.49, 0.53, 0.56, 0.70, 0.72, 0.20]
+    raised = []
+    for score in scores:
+        raised.extend(tracker.observe([_result(score)], [{"NDMA": f"act at {score}"}]))
+    # 0.51 and 0.49 hover on the 0.5 boundary inside the margin and are coalesced
+    assert [(alert.kind, alert.score) for alert in raised] == [
+        ("new", 0.45),
+        ("escalation", 0.53),
+        ("score_jump", 0.70),
+        ("de-escalation", 0.20),
+    ]
+    assert [alert.suppressed for alert in raised] == [0, 4, 1, 1]
+    assert raised[1].previous_band == "Moderate" and raised[1].band == "High"
+    assert raised[1].actions == {"NDMA": "act at 0.53"}
+
+    state = tracker.district("Dhubri", "Assam")
+    assert state["assessments"] == len(scores)
+    assert state["alerts"] == 4 and state["unchanged"] == 0
+    assert tracker.stats()["suppressed"] == len(scores) - 4
+    assert [alert.id for alert in tracker.since(2)] == [3, 4]
+
+    other = tracker.observe([_result(0.40, district="Dhubri", state="Meghalaya")])
+    assert other[0].kind == "new"  # same district name in another state is tracked apart
+
+
+def test_stream_replays_after_last_event_id_and_pushes_new_alerts():
+    tracker = AlertTracker(THRESHOLDS)
+    tracker.observe([_result(0.3, district="A"), _result(0.3, district="B")])
+
+    async def consume():
+        stream = tracker.stream(last_event_id=1, heartbeat=5)
+        first = await stream.__anext__()
+        pushed = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+        await asyncio.to_thread(tracker.observe, [_result(0.9, district="A")])
+        second = await asyncio.wait_for(pushed, timeout=5)
+        await stream.aclose()
+        return first, second
+
+    first, second = asyncio.run(consume())
+    assert first.startswith("id: 2\nevent: new\n")
+    assert second.startswith("id: 3\nevent: escalation\n")
+    assert '"previous_band": "Moderate"' in second
+
+
+def test_service_feeds_alert_tracker():
+    from flood_ai.workflow import FloodAssessmentService
+
+    service = FloodAssessmentService(FloodRiskScorer())
+    scenario = ScenarioPayload(district="Patna", state="Bihar", **{name: 80.0 for name in FEATURE_FIELDS})
+    for _ in range(3):
+        service.assess(scenario)
+    stats = service.alerts.stats()
+    assert stats["alerts"] == 1 and stats["suppressed"] == 2
+    assert service.alerts.since()[0].actions
@@ -0,0 +1,56 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from flood_ai.binding import SchemaBinding, SchemaBindingError
+from flood_ai.columnar import validate_records
+from flood_ai.input_schema import ScenarioPayload
+from flood_ai.scoring import FloodRiskScorer
+from flood_ai.surrogate import SurrogateRegressor
+
+SAMPLES = sorted((Path(__file__).resolve().parents[1] / "sample_inputs").glob("*.json"))
+
+
+def test_sample_inputs_bind_through_the_alias():
+    scorer = FloodRiskScorer()
+    binding = scorer.active_model.binding
+    records = [json.loads(path.read_text()) for path in SAMPLES]
+    assert all("InfrastructureDecay" in record for record in records)
+
+    payloads = [ScenarioPayload(**record) for record in records]
+    batch = validate_records(records, scorer.feature_names)
+    assert batch.errors == {}
+    np.testing.assert_array_equal(batch.matrix, binding.matrix(payloads))
+    column = binding.index["InfrastructureDecay"]
+    assert binding.fields[column] == "DeterioratingInfrastructure"
+    assert batch.matrix[:, column].tolist() == [record["InfrastructureDecay"] for record in records]
+
+
+def test_binding_fails_fast_and_resolves_legacy_names():
+    names = list(FloodRiskScorer().feature_names)
+    legacy = [("InfrastructureDecay" if name == "DeterioratingInfrastructure" else name) for name in names]
+    binding = SchemaBinding.build(legacy)
+    assert binding.fields == tuple(names)
+    np.testing.assert_array_equal(
+        SurrogateRegressor(legacy).predict(np.full((1, len(names)), 40.0)),
+        SurrogateRegressor(names).predict(np.full((1, len(names)), 40.0)),
+    )
+
+    with pytest.raises(SchemaBindingError, match="Unknown feature 'Rainfall'"):
+        SchemaBinding.build(names + ["Rainfall"])
+    with pytest.raises(SchemaBindingError, match="several model features"):
+        SchemaBinding.build(names + ["InfrastructureDecay"])
+    with pytest.raises(SchemaBindingError):
+        SurrogateRegressor(names[:-1] + ["Rainfall"])
+
+
+def test_column_map_prefers_the_canonical_column():
+    binding = SchemaBinding.build(FloodRiskScorer().feature_names)
+    columns = ["district", "InfrastructureDecay", *binding.fields]
+    mapping = binding.column_map(columns)
+    assert mapping[0] == -1 and mapping[1] == -1
+    assert mapping[2:].tolist() == list(range(len(binding.fields)))
+    with pytest.raises(SchemaBindingError, match="missing features"):
+        binding.column_map(columns[2:-1])
@@ -0,0 +1,51 @@
+import io
+import json
+
+import pytest
+
+from flood_ai.bulk import read_records, run_bulk
+from flood_ai.scoring import FloodRiskScorer
+
+
+def _scenario(index):
+    values = {name: float(20 + index % 60) for name in FloodRiskScorer().feature_names}
+    return {"district": f"D{index}", "state": "Odisha", **values}
+
+
+def _ndjson_input():
+    lines = [json.dumps(_scenario(i)) for i in range(7)]
+    lines.insert(2, "")
+    lines.insert(3, "{not json")
+    lines.append(json.dumps({"request_id": "req-1", "title": "x", "body": json.dumps(_scenario(99))}))
+    lines.append(json.dumps({"request_id": "req-2", "title": "x", "body": "free text"}))
+    return io.StringIO("\n".join(lines) + "\n")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_bulk_streams_results_in_input_order(workers):
+    output = io.StringIO()
+    records = read_records(_ndjson_input(), "ndjson")
+    report = run_bulk(records, output, workers=workers, chunk_size=3)
+
+    rows = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [row["id"] for row in rows] == [1, 2, 4, 5, 6, 7, 8, 9, "req-1", "req-2"]
+    assert rows[1]["assessment"]["risk"]["district"] == "D1"
+    assert rows[8]["assessment"]["risk"]["district"] == "D99"
+    assert rows[2]["error"][0]["type"] == "json_invalid"
+    assert rows[9]["error"][0]["type"] == "model_type"
+    assert (report.records, report.assessed, report.invalid, report.chunks) == (10, 8, 2, 4)
+
+
+def test_bulk_reads_csv_with_blank_optional_cells():
+    scenario = _scenario(3)
+    header = list(scenario) + ["timestamp"]
+    rows = [",".join(header), ",".join(str(scenario[key]) for key in scenario) + ","]
+    missing = dict(scenario, MonsoonIntensity="")
+    rows.append(",".join(str(missing[key]) for key in scenario) + ",")
+    output = io.StringIO()
+    report = run_bulk(read_records(io.StringIO("\n".join(rows)), "csv"), output, workers=1)
+
+    first, second = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert first["id"] == 2 and first["assessment"]["risk"]["state"] == "Odisha"
+    assert second["error"][0]["loc"] == ["MonsoonIntensity"]
+    assert report.assessed == 1 and report.invalid == 1
@@ -0,0 +1,73 @@
+import random
+from decimal import Decimal
+
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from flood_ai.binding import SchemaBindingError
+from flood_ai.columnar import FEATURE_BOUNDS, validate_records
+from flood_ai.input_schema import ScenarioPayload
+
+FEATURES = list(FEATURE_BOUNDS)
+ODD_VALUES = ["12.5", " 12 ", "abc", "", "nan", "1e3", None, True, [1], Decimal("5"), b"5",
+              float("nan"), float("inf"), float("-inf"), -1, 101, 0, 100]
+
+
+def _records(count, seed=11):
+    rng = random.Random(seed)
+    records = []
+    for index in range(count):
+        record = {name: rng.uniform(0, 100) for name in FEATURES}
+        record.update(district=f" D{index} ", state="Assam")
+        for _ in range(rng.choice([0, 0, 1, 2, 3])):
+            name = rng.choice(FEATURES + ["district", "state", "timestamp"])
+            if rng.random() < 0.2:
+                record.pop(name, None)
+            elif name == "DeterioratingInfrastructure" and rng.random() < 0.5:
+                record["InfrastructureDecay"] = rng.choice([12.0, "x", 150])
+                if rng.random() < 0.5:
+                    record.pop(name)
+            else:
+                record[name] = rng.choice(ODD_VALUES + ["2024-06-01T00:00:00Z", 7])
+        records.append(record)
+    return records
+
+
+def _strip_ctx(errors):
+    return [{key: list(value) if key == "loc" else value for key, value in error.items() if key != "ctx"} for error in errors]
+
+
+def test_columnar_validation_matches_pydantic_per_row():
+    records = _records(600)
+    order = list(reversed(FEATURES))
+    batch = validate_records(records, order)
+    payloads = batch.payloads()
+    valid_rows = batch.rows.tolist()
+    for index, record in enumerate(records):
+        try:
+            expected = ScenarioPayload(**record)
+        except ValidationError as exc:
+            assert index in batch.errors
+            assert repr(_strip_ctx(batch.errors[index])) == repr(_strip_ctx(exc.errors(include_url=False)))
+            continue
+        assert index not in batch.errors
+        position = valid_rows.index(index)
+        assert batch.matrix[position].tolist() == expected.vector(order)
+        assert payloads[position].district == expected.district
+        assert payloads[position].vector(order) == expected.vector(order)
+    assert 0 < batch.n_valid < len(records)
+
+
+def test_columnar_fast_path_and_unknown_features():
+    records = [{**{name: 50 for name in FEATURES}, "district": "Puri", "state": "Odisha"} for _ in range(4)]
+    records[2]["Siltation"] = 100.5
+    batch = validate_records(records, FEATURES)
+    assert batch.rows.tolist() == [0, 1, 3]
+    assert batch.errors[2] == [
+        {"type": "less_than_equal", "loc": ["Siltation"], "msg": "Input should be less than or equal to 100",
+         "input": 100.5, "ctx": {"le": 100.0}}
+    ]
+    np.testing.assert_array_equal(batch.matrix, np.full((3, len(FEATURES)), 50.0))
+    with pytest.raises(SchemaBindingError):
+        validate_records(records, ["NotAFeature"])
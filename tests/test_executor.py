@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from flood_ai.executor import AssessmentExecutor, ExecutorSaturated
+from flood_ai.input_schema import ScenarioPayload
+from flood_ai.workflow import FloodAssessmentService
+
+
+def _payload(service, district):
+    values = {name: 55.0 for name in service.scorer.feature_names}
+    return ScenarioPayload(district=district, state="Kerala", **values)
+
+
+@pytest.mark.parametrize("mode", ["thread", "process"])
+def test_executor_scores_off_loop_and_records(mode):
+    service = FloodAssessmentService()
+    executor = AssessmentExecutor(service, mode=mode, max_workers=2)
+
+    async def run():
+        single = executor.assess(_payload(service, "Wayanad"))
+        batch = executor.assess_many([_payload(service, f"D{i}") for i in range(3)])
+        return await asyncio.gather(single, batch)
+
+    try:
+        single, batch = asyncio.run(run())
+    finally:
+        executor.shutdown()
+    assert single.risk.scenario.district == "Wayanad"
+    assert [a.risk.scenario.district for a in batch] == ["D0", "D1", "D2"]
+    assert len(service.ledger.list()) == 4
+    stats = executor.stats()
+    assert stats["completed"] == 4 and stats["pending"] == 0
+
+
+def test_executor_rejects_when_queue_is_full():
+    service = FloodAssessmentService()
+    executor = AssessmentExecutor(service, max_workers=1, max_pending=2)
+    try:
+        executor._acquire(1)  # one assessment already in flight
+        with pytest.raises(ExecutorSaturated):
+            asyncio.run(executor.assess_many([_payload(service, f"D{i}") for i in range(2)]))
+        assert executor.stats()["rejected"] == 2
+        executor._release(1, failed=False)
+        # an idle executor admits a batch larger than max_pending instead of rejecting it forever
+        batch = asyncio.run(executor.assess_many([_payload(service, f"D{i}") for i in range(5)]))
+        assert len(batch) == 5
+        assert executor.stats()["pending"] == 0
+    finally:
+        executor.shutdown()
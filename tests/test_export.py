@@ -0,0 +1,64 @@
+import csv
+import io
+
+import pytest
+
+from flood_ai.export import ExportSchema, export_assessments, stream_csv
+from flood_ai.input_schema import ScenarioPayload
+from flood_ai.storage import AssessmentStore, latest_assessment_id
+from flood_ai.workflow import FloodAssessmentService
+
+
+def _assess(count):
+    service = FloodAssessmentService()
+    start = latest_assessment_id()
+    service.assess_many(
+        [
+            ScenarioPayload(district=f"E{i}", state="Odisha", **{name: 10.0 + i for name in service.scorer.feature_names})
+            for i in range(count)
+        ]
+    )
+    return start
+
+
+def test_csv_export_flattens_records_and_resumes():
+    start = _assess(5)
+    first = io.StringIO()
+    report = export_assessments(first, "csv", after_id=start, chunk_size=2, limit=3)
+    assert (report.rows, report.chunks, report.first_id, report.last_id) == (3, 2, start + 1, start + 3)
+
+    # resume after the last id reported, appending without a header
+    report = export_assessments(first, "csv", after_id=report.last_id, chunk_size=2, header=False)
+    assert report.rows == 2
+    rows = list(csv.DictReader(io.StringIO(first.getvalue())))
+    assert [row["district"] for row in rows] == [f"E{i}" for i in range(5)]
+    assert [int(row["id"]) for row in rows] == list(range(start + 1, start + 6))
+    assert float(rows[4]["feature_MonsoonIntensity"]) == 14.0
+    assert float(rows[4]["feature_DeterioratingInfrastructure"]) == 14.0
+    assert rows[0]["driver_1_feature"]
+    assert any(row[column] for row in rows for column in ExportSchema().action_columns.values())
+
+    streamed = "".join(stream_csv(after_id=start, chunk_size=2))
+    assert streamed == first.getvalue()
+
+
+def test_export_tolerates_legacy_rows(tmp_path):
+    path = tmp_path / "legacy.db"
+    store = AssessmentStore(path)
+    store.enqueue({"risk": {"district": "Old", "state": "Assam", "score": 0.4, "band": "Moderate"}, "actions": {"Unknown": "x"}})
+    store.close()
+    output = io.StringIO()
+    export_assessments(output, "csv", db_path=path)
+    row = next(csv.DictReader(io.StringIO(output.getvalue())))
+    assert row["district"] == "Old" and row["feature_Siltation"] == "" and row["actions_other"] == '{"Unknown": "x"}'
+
+
+def test_arrow_formats_round_trip(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    start = _assess(3)
+    report = export_assessments(tmp_path / "out.parquet", "parquet", after_id=start, chunk_size=2)
+    table = pq.read_table(tmp_path / "out.parquet")
+    assert table.num_rows == report.rows == 3
+    assert table.schema.field("feature_Siltation").type == pa.float64()
@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from flood_ai.history import HistoryLedger
+from flood_ai.input_schema import ScenarioPayload
+from flood_ai.scoring import BAND_ORDER, FloodRiskResult
+
+FEATURES = {name: 50.0 for name in ScenarioPayload.model_fields if ScenarioPayload.model_fields[name].annotation is float}
+START = datetime(2025, 7, 1, tzinfo=timezone(timedelta(hours=5, minutes=30)))
+
+
+def _result(district, state, score, minutes=0, timestamp=None):
+    scenario = ScenarioPayload(
+        district=district, state=state, timestamp=timestamp or START + timedelta(minutes=minutes), **FEATURES
+    )
+    band = BAND_ORDER[min(int(score * 4), 3)]
+    return FloodRiskResult(
+        score=score, band=band, confidence=90.0, feature_order=[], scenario=scenario, drivers=[]
+    )
+
+
+def test_ring_buffer_keeps_newest_entries_first():
+    ledger = HistoryLedger(capacity=4)
+    results = [_result(f"D{i}", "Kerala", i / 10, minutes=i) for i in range(6)]
+    ledger.add_many(results[:3])
+    for result in results[3:]:
+        ledger.add(result)
+
+    items = ledger.list()
+    assert len(ledger) == 4
+    assert [item["district"] for item in items] == ["D5", "D4", "D3", "D2"]
+    assert items[0]["timestamp"] == results[5].scenario.timestamp.isoformat()
+    assert [item["district"] for item in ledger.list(limit=2)] == ["D5", "D4"]
+
+    naive = datetime(2025, 1, 2, 3, 4, 5, 678901)
+    ledger.add(_result("N", "Goa", 0.5, timestamp=naive))
+    assert ledger.list(limit=1)[0]["timestamp"] == naive.isoformat()
+
+    ledger.add_many([_result(f"B{i}", "Goa", 0.1) for i in range(7)])
+    assert [item["district"] for item in ledger.list()] == ["B6", "B5", "B4", "B3"]
+
+
+def test_aggregates_match_a_sequential_reference():
+    rng = np.random.default_rng(5)
+    alpha = 0.25
+    ledger = HistoryLedger(capacity=8, ewma_alpha=alpha)
+    results = [
+        _result(f"D{rng.integers(3)}", ["Assam", "Bihar"][rng.integers(2)], float(rng.uniform(0, 1)), int(rng.integers(50)))
+        for _ in range(60)
+    ]
+    for start in range(0, 60, 13):
+        if start % 2:
+            ledger.add_many(results[start : start + 13])
+        else:
+            for result in results[start : start + 13]:
+                ledger.add(result)
+
+    for state in ("Assam", "Bihar"):
+        mine = [r for r in results if r.scenario.state == state]
+        ewma = mine[0].score
+        for r in mine[1:]:
+            ewma = alpha * r.score + (1 - alpha) * ewma
+        latest = max(enumerate(mine), key=lambda item: (item[1].scenario.timestamp, item[0]))[1]
+        summary = ledger.state_summary(state)
+        assert summary["count"] == len(mine)
+        assert summary["ewma_score"] == pytest.approx(ewma, abs=1e-6)
+        assert summary["max_score"] == max(r.score for r in mine)
+        assert summary["latest_score"] == latest.score
+        assert sum(summary["band_counts"].values()) == len(mine)
+
+    districts = ledger.summaries("district")
+    assert sum(item["count"] for item in districts) == 60
+    assert ledger.district_summary("D0", "Assam")["count"] == sum(
+        1 for r in results if (r.scenario.district, r.scenario.state) == ("D0", "Assam")
+    )
+    assert ledger.state_summary("Goa") is None
+    with pytest.raises(ValueError):
+        ledger.summaries("city")
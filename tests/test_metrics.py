@@ -0,0 +1,84 @@
+import json
+import threading
+import time
+from pathlib import Path
+
+from flood_ai import metrics, workflow
+from flood_ai.input_schema import ScenarioPayload
+from flood_ai.workflow import FloodAssessmentService
+
+
+def _scenario():
+    sample_path = Path(__file__).resolve().parents[1] / "sample_inputs" / "assam_flood.json"
+    return ScenarioPayload(**json.loads(sample_path.read_text()))
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = metrics.Registry()
+    histogram = registry.histogram("demo_seconds", "Demo", ("stage",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "a")
+    histogram.observe(0.5, "a")
+    histogram.observe(5.0, "a")
+    registry.register_collector("queue", lambda: {"depth": 3, "written": 7, "mode": "thread"}, counters=("written",))
+    text = registry.render()
+    assert 'demo_seconds_bucket{stage="a",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{stage="a",le="1.0"} 2' in text
+    assert 'demo_seconds_bucket{stage="a",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{stage="a"} 3' in text
+    assert "flood_ai_queue_depth 3" in text
+    assert "flood_ai_queue_written_total 7" in text
+    assert "mode" not in text  # non-numeric stats are skipped
+    assert histogram.snapshot("a")["p50"] == 1.0
+
+
+def test_assessment_records_stage_timings():
+    before = {name: metrics.STAGE_SECONDS.snapshot(name)["count"] for name in ("predict", "playbook", "persist")}
+    FloodAssessmentService().assess(_scenario())
+    for name, count in before.items():
+        assert metrics.STAGE_SECONDS.snapshot(name)["count"] == count + 1
+
+    metrics.set_enabled(False)
+    try:
+        FloodAssessmentService().assess(_scenario())
+    finally:
+        metrics.set_enabled(True)
+    assert metrics.STAGE_SECONDS.snapshot("predict")["count"] == before["predict"] + 1
+
+
+def test_persistence_failures_are_counted(monkeypatch):
+    def broken(records):
+        list(records)
+        raise OSError("disk full")
+
+    monkeypatch.setattr(workflow, "save_assessments", broken)
+    before = metrics.PERSIST_FAILURES.value()
+    assessment = FloodAssessmentService().assess(_scenario())
+    assert assessment.actions
+    assert metrics.PERSIST_FAILURES.value() == before + 1
+    assert "flood_ai_persist_failures_total" in metrics.render()
+
+
+def test_profiler_collects_stacks_while_running():
+    profiler = metrics.SamplingProfiler(interval=0.001)
+    stop = threading.Event()
+
+    def busy():
+        while not stop.is_set():
+            sum(range(1000))
+
+    worker = threading.Thread(target=busy)
+    worker.start()
+    profiler.start()
+    try:
+        deadline = time.monotonic() + 5
+        while profiler.samples < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        profiler.stop()
+        stop.set()
+        worker.join()
+    assert not profiler.running
+    assert profiler.samples >= 5
+    assert "test_metrics.py:busy" in profiler.collapsed()
+    profiler.reset()
+    assert profiler.status()["samples"] == 0
@@ -0,0 +1,142 @@
+import os
+import shutil
+import time
+from pathlib import Path
+
+import pytest
+
+from flood_ai.artifact_loader import load_bundle, reload_artifacts
+from flood_ai.binding import FEATURE_FIELDS
+from flood_ai.input_schema import ScenarioPayload
+from flood_ai.model_registry import ModelReloader
+from flood_ai.scoring import FloodRiskScorer
+
+
+@pytest.fixture
+def versioned_root(tmp_path, monkeypatch):
+    source = Path(os.environ["FLOOD_AI_ARTIFACT_DIR"])
+    for version in ("v1", "v2"):
+        target = tmp_path / "versions" / version
+        target.mkdir(parents=True)
+        for name in ("feature_names.pkl", "flood_scaler.pkl", "flood_model.pkl"):
+            shutil.copy(source / name, target / name)
+    (tmp_path / "CURRENT").write_text("v1\n")
+    monkeypatch.setenv("FLOOD_AI_ARTIFACT_DIR", str(tmp_path))
+    reload_artifacts()
+    yield tmp_path
+    monkeypatch.undo()
+    reload_artifacts()
+
+
+def _payload(scorer):
+    return ScenarioPayload(district="Dhubri", state="Assam", **{name: 70.0 for name in scorer.feature_names})
+
+
+def test_reload_swaps_version_and_results_record_it(versioned_root):
+    scorer = FloodRiskScorer(bundle=load_bundle())
+    assert scorer.score(_payload(scorer)).model_version == "v1"
+
+    (versioned_root / "CURRENT").write_text("v2")
+    outcome = ModelReloader(scorer).reload()
+    assert outcome["previous"] == "v1" and outcome["current"] == "v2"
+    result = scorer.score(_payload(scorer))
+    assert result.model_version == "v2"
+    assert result.to_dict()["model_version"] == "v2"
+
+
+def test_failed_reload_keeps_serving_previous_version(versioned_root):
+    scorer = FloodRiskScorer(bundle=load_bundle())
+    reloader = ModelReloader(scorer)
+    with pytest.raises(FileNotFoundError):
+        reloader.reload("missing")
+    assert scorer.model_version == "v1"
+    assert reloader.status()["last_error"].startswith("FileNotFoundError")
+
+
+@pytest.mark.parametrize("name", ["../v1", "v1/../v2", "..", str(Path("/etc").resolve()), "v1\\.."])
+def test_reload_rejects_version_names_that_are_paths(versioned_root, name):
+    scorer = FloodRiskScorer(bundle=load_bundle())
+    with pytest.raises(ValueError):
+        ModelReloader(scorer).reload(name)
+    assert scorer.model_version == "v1"
+
+
+def test_reload_only_resolves_listed_versions(versioned_root):
+    (versioned_root / "versions" / "notes.txt").write_text("not a version")
+    scorer = FloodRiskScorer(bundle=load_bundle())
+    with pytest.raises(FileNotFoundError):
+        ModelReloader(scorer).reload("notes.txt")
+
+
+def test_watcher_follows_current_pointer(versioned_root):
+    scorer = FloodRiskScorer(bundle=load_bundle())
+    reloader = ModelReloader(scorer, poll_interval=0.02)
+    reloader.start()
+    try:
+        (versioned_root / "CURRENT").write_text("v2")
+        deadline = time.monotonic() + 5
+        while scorer.model_version != "v2" and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert scorer.model_version == "v2"
+        assert reloader.status()["available"] == ["v1", "v2"]
+    finally:
+        reloader.stop()
+
+
+def test_watcher_keeps_an_explicit_reload_until_the_pointer_moves(versioned_root):
+    scorer = FloodRiskScorer(bundle=load_bundle())
+    reloader = ModelReloader(scorer, poll_interval=0.02)
+    reloader.start()
+    try:
+        reloader.reload("v2")  # CURRENT still says v1
+        time.sleep(0.2)
+        assert scorer.model_version == "v2"
+        assert reloader.status()["pointer"] == "v1"
+
+        (versioned_root / "CURRENT").write_text("v2")
+        time.sleep(0.1)
+        (versioned_root / "CURRENT").write_text("v1")
+        deadline = time.monotonic() + 5
+        while scorer.model_version != "v1" and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert scorer.model_version == "v1"
+    finally:
+        reloader.stop()
+
+
+def test_publish_moves_the_pointer_for_every_watcher(versioned_root):
+    # two scorers stand in for two pre-fork workers sharing the artifact directory
+    serving_worker = FloodRiskScorer(bundle=load_bundle())
+    other_worker = FloodRiskScorer(bundle=load_bundle())
+    watcher = ModelReloader(other_worker, poll_interval=0.02)
+    watcher.start()
+    try:
+        outcome = ModelReloader(serving_worker).publish("v2")
+        assert outcome["current"] == "v2"
+        assert (versioned_root / "CURRENT").read_text().strip() == "v2"
+        deadline = time.monotonic() + 5
+        while other_worker.model_version != "v2" and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert other_worker.model_version == "v2"
+    finally:
+        watcher.stop()
+
+    with pytest.raises(FileNotFoundError):
+        ModelReloader(serving_worker).publish("missing")
+    assert (versioned_root / "CURRENT").read_text().strip() == "v2"
+
+
+def test_lazy_scorer_loads_on_first_use_and_skips_surrogate_scaler(versioned_root):
+    (versioned_root / "versions" / "v1" / "flood_scaler.pkl").unlink()
+    scorer = FloodRiskScorer(lazy=True)
+    assert not scorer.loaded
+    result = scorer.score(ScenarioPayload(district="Dhubri", state="Assam", **{name: 70.0 for name in FEATURE_FIELDS}))
+    assert scorer.loaded
+    assert result.model_version == "v1"
+    assert scorer.uses_surrogate and scorer.scaler is None
+    assert load_bundle("v1").scaler is None
+
+    pending = FloodRiskScorer(lazy=True)
+    assert pending.swap(load_bundle("v2")) is None
+    assert pending.model_version == "v2"
+    assert pending.warm_up() >= 0
@@ -0,0 +1,70 @@
+import json
+import pickle
+from datetime import datetime, timezone
+
+import pytest
+
+from flood_ai.binding import FEATURE_FIELDS
+from flood_ai.input_schema import ScenarioPayload
+from flood_ai.response import PLAYBOOK_ENV, ResponseEngine, parse_rules
+from flood_ai.scoring import FloodRiskResult, RiskBand
+
+
+def _result(band, population=50.0, state="Assam"):
+    scenario = ScenarioPayload(
+        district="Dhubri",
+        state=state,
+        timestamp=datetime(2025, 7, 1, tzinfo=timezone.utc),
+        **{**{name: 50.0 for name in FEATURE_FIELDS}, "PopulationScore": population},
+    )
+    return FloodRiskResult(
+        score=0.5, band=band, confidence=90.0, feature_order=FEATURE_FIELDS, scenario=scenario, drivers=[]
+    )
+
+
+def test_default_blocks_are_shared_and_read_only():
+    engine = ResponseEngine()
+    results = [_result(RiskBand.HIGH, 70), _result(RiskBand.HIGH, 71), _result(RiskBand.HIGH, 40, "Bihar")]
+    blocks = engine.blocks_for(results)
+    assert list(blocks[0]) == ["NDRF", "Ministry of Jal Shakti"]
+    assert list(blocks[1]) == ["NDRF", "Ministry of Jal Shakti", "MoHFW"]
+    assert blocks[2] is blocks[0]  # same cell, same object
+    assert blocks[1]["MoHFW"] == "Emergency: Deploy mobile health units and epidemic surveillance teams"
+    assert list(engine.block_for(_result(RiskBand.LOW, 95))) == ["IMD", "State Water Resources"]
+    with pytest.raises(TypeError):
+        blocks[0]["NDRF"] = "changed"
+    assert json.loads(json.dumps(blocks[1])) == dict(blocks[1])
+    assert pickle.loads(pickle.dumps(blocks[1])) == blocks[1]
+
+
+def test_playbook_file_adds_state_rules(tmp_path, monkeypatch):
+    path = tmp_path / "playbook.json"
+    rule = {
+        "agency": "ASDMA",
+        "priority": "High",
+        "description": "Open relief camps on char islands",
+        "bands": ["high", "Severe"],
+        "states": ["Assam"],
+        "min_population": 60,
+    }
+    path.write_text(json.dumps({"rules": [rule]}))
+    monkeypatch.setenv(PLAYBOOK_ENV, str(path))
+    engine = ResponseEngine.from_env()
+    assert "ASDMA" in engine.block_for(_result(RiskBand.HIGH, 61, "assam"))
+    assert "ASDMA" not in engine.block_for(_result(RiskBand.HIGH, 60, "Assam"))
+    assert "ASDMA" not in engine.block_for(_result(RiskBand.HIGH, 90, "Bihar"))
+    assert "ASDMA" not in engine.block_for(_result(RiskBand.MODERATE, 90, "Assam"))
+    assert engine.agencies()[-1] == "ASDMA"
+
+    replaced = ResponseEngine(parse_rules({"extend": False, "rules": [{**rule, "states": None}]}))
+    assert list(replaced.block_for(_result(RiskBand.SEVERE, 80, "Bihar"))) == ["ASDMA"]
+    override = {"agency": "NDRF", "priority": "Emergency", "description": "Deploy all battalions"}
+    overridden = ResponseEngine(parse_rules({"rules": [override]}))
+    actions = overridden.recommend(_result(RiskBand.HIGH))
+    assert [action.agency for action in actions] == ["NDRF", "Ministry of Jal Shakti"]
+    assert actions[0].priority == "Emergency"
+    assert overridden.block_for(_result(RiskBand.HIGH))["NDRF"] == actions[0].text
+    with pytest.raises(ValueError):
+        parse_rules({"rules": [{**rule, "bands": ["Extreme"]}]})
+    with pytest.raises(ValueError):
+        parse_rules({"rules": [{"agency": "ASDMA"}]})
@@ -0,0 +1,208 @@
+import numpy as np
+import pytest
+
+from flood_ai.input_schema import ScenarioPayload
+from flood_ai.scoring import FloodRiskScorer, RiskBand
+
+
+def _scenarios(count, seed=7):
+    rng = np.random.default_rng(seed)
+    scorer_features = FloodRiskScorer().feature_names
+    scenarios = []
+    for idx in range(count):
+        values = dict(zip(scorer_features, rng.uniform(0, 100, len(scorer_features)).round(1)))
+        scenarios.append(ScenarioPayload(district=f"District {idx}", state="Bihar", **values))
+    return scenarios
+
+
+def test_score_many_matches_single_scoring():
+    scorer = FloodRiskScorer()
+    scenarios = _scenarios(25)
+    batch = scorer.score_many(scenarios)
+    assert [result.scenario.district for result in batch] == [s.district for s in scenarios]
+    for scenario, result in zip(scenarios, batch):
+        single = scorer.score(scenario)
+        assert result.score == pytest.approx(single.score)
+        assert result.band is single.band
+        assert result.confidence == pytest.approx(single.confidence)
+        assert result.drivers == single.drivers
+
+
+def test_band_codes_follow_thresholds():
+    scorer = FloodRiskScorer()
+    scores = np.array([0.0, 0.2499, 0.25, 0.5, 0.74, 0.75, 1.0, 1.5, -0.1])
+    codes = scorer._band_codes(scores)
+    expected = [scorer._band_for_score(score) for score in scores]
+    assert [RiskBand(band) for band in expected] == [
+        [RiskBand.LOW, RiskBand.MODERATE, RiskBand.HIGH, RiskBand.SEVERE][code] for code in codes
+    ]
+
+
+def test_score_many_empty_batch():
+    assert FloodRiskScorer().score_many([]) == []
+
+
+def _forest():
+    from sklearn.ensemble import RandomForestRegressor
+
+    rng = np.random.default_rng(1)
+    features = rng.normal(size=(300, 20))
+    labels = features[:, 0] * 0.3 + features[:, 3] * 0.1 + rng.normal(0, 0.05, 300)
+    return RandomForestRegressor(n_estimators=15, max_depth=5, random_state=0).fit(features, labels), features
+
+
+def test_ensemble_evaluator_matches_forest_predict():
+    from statistics import pstdev
+
+    from flood_ai.ensemble import EnsembleEvaluator
+
+    model, features = _forest()
+    samples = features[:40]
+    output = EnsembleEvaluator(model).evaluate(samples)
+    np.testing.assert_array_equal(output.prediction, model.predict(samples))
+    assert output.estimator_predictions.shape == (15, 40)
+    expected = [max(0.0, 100.0 - pstdev([est.predict(samples[i : i + 1])[0] for est in model.estimators_])) for i in range(3)]
+    np.testing.assert_allclose(output.confidence[:3], expected)
+
+
+def test_compiled_forest_is_bit_exact_with_sklearn():
+    from sklearn.ensemble import ExtraTreesRegressor, RandomForestRegressor
+
+    from flood_ai.forest import CompiledForest
+
+    rng = np.random.default_rng(5)
+    features = rng.uniform(0, 100, size=(400, 20))
+    labels = features[:, 2] / 100 + rng.normal(0, 0.1, 400)
+    features[rng.random(features.shape) < 0.05] = np.nan
+    samples = rng.uniform(0, 100, size=(257, 20))
+    samples[rng.random(samples.shape) < 0.05] = np.nan
+    for model in (
+        RandomForestRegressor(n_estimators=9, random_state=0).fit(features, labels),
+        ExtraTreesRegressor(n_estimators=9, random_state=0).fit(np.nan_to_num(features), labels),
+    ):
+        compiled = CompiledForest.from_estimator(model)
+        per_tree = compiled.predict_trees(samples, chunk_size=64)
+        np.testing.assert_array_equal(per_tree, np.vstack([est.predict(samples) for est in model.estimators_]))
+        np.testing.assert_array_equal(compiled.predict(samples), model.predict(samples))
+
+
+def test_scaler_fast_path_matches_sklearn_transform():
+    import pandas as pd
+    from sklearn.preprocessing import StandardScaler
+
+    from flood_ai.scoring import _array_transform
+
+    names = FloodRiskScorer().feature_names
+    matrix = np.random.default_rng(8).uniform(0, 100, size=(30, len(names)))
+    scaler = StandardScaler().fit(pd.DataFrame(matrix, columns=names))
+    transform = _array_transform(scaler, names)
+    np.testing.assert_array_equal(transform(matrix), scaler.transform(pd.DataFrame(matrix, columns=names)))
+    assert _array_transform(scaler, list(reversed(names))) is None
+
+
+def test_surrogate_stacked_estimators_match_stubs():
+    from flood_ai.surrogate import SurrogateRegressor
+
+    names = FloodRiskScorer().feature_names
+    model = SurrogateRegressor(list(names))
+    samples = np.random.default_rng(3).uniform(0, 100, size=(10, len(names)))
+    stacked = model.predict_estimators(samples)
+    np.testing.assert_allclose(stacked, np.vstack([est.predict(samples) for est in model.estimators_]))
+
+
+def test_surrogate_fused_pass_matches_reference_formula():
+    from flood_ai.surrogate import FEATURE_WEIGHTS, SurrogateRegressor
+
+    names = FloodRiskScorer().feature_names
+    model = SurrogateRegressor(list(names))
+    samples = np.random.default_rng(4).uniform(0, 100, size=(50, len(names)))
+    weights = np.array([FEATURE_WEIGHTS[name] for name in names])
+    combined = 0.6 * np.dot(samples / 100.0, weights) + 0.4 * samples.mean(axis=1) / 100.0
+    expected = np.clip(combined + 0.15 * (combined - 0.5) ** 2, 0.1, 0.95)
+    prediction, stacked = model.predict_with_estimators(samples)
+    np.testing.assert_allclose(prediction, expected, rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(prediction, model.predict(samples))
+    np.testing.assert_array_equal(stacked, model.predict_estimators(samples))
+
+
+def test_score_cache_hits_quantized_vectors_and_clears_on_reload():
+    from flood_ai.artifact_loader import reload_artifacts
+    from flood_ai.cache import ScoreCache
+
+    cache = ScoreCache(max_entries=2, precision=0.1)
+    scorer = FloodRiskScorer(cache=cache)
+    first, second, third = _scenarios(3)
+    nudged = first.model_copy(update={"MonsoonIntensity": first.MonsoonIntensity + 0.01, "district": "Other"})
+
+    baseline = scorer.score(first)
+    repeat = scorer.score(nudged)
+    assert repeat.score == baseline.score
+    assert repeat.scenario.district == "Other"
+    assert cache.stats()["hits"] == 1
+
+    scorer.score_many([second, third])
+    assert cache.stats()["evictions"] == 1
+
+    reload_artifacts()
+    assert cache.stats()["size"] == 0
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_path_contributions_add_up_to_forest_prediction():
+    from flood_ai.forest import CompiledForest
+
+    model, features = _forest()
+    forest = CompiledForest.from_estimator(model)
+    contributions = forest.contributions(features[:50], chunk_size=16)
+    assert contributions.shape == (50, 20)
+    np.testing.assert_allclose(forest.bias + contributions.sum(axis=1), model.predict(features[:50]), atol=1e-10)
+    # the label only depends on features 0 and 3, so they dominate the attribution
+    assert set(np.argsort(-np.abs(contributions).mean(axis=0))[:2]) == {0, 3}
+
+
+def test_top_k_drivers_use_partial_selection_in_rank_order():
+    from flood_ai.attribution import top_k_indices
+
+    weights = np.array([[0.1, 0.9, 0.5, 0.7], [4.0, 1.0, 3.0, 2.0]])
+    np.testing.assert_array_equal(top_k_indices(weights, 2), [[1, 3], [0, 2]])
+    np.testing.assert_array_equal(top_k_indices(weights, 9), [[1, 3, 2, 0], [0, 2, 3, 1]])
+    assert top_k_indices(weights, 0).shape == (2, 0)
+
+    scorer = FloodRiskScorer()
+    scenario = _scenarios(1)[0]
+    five = scorer.score_many([scenario], top_k=5)[0].drivers
+    assert len(five) <= 5 and len(scorer.score(scenario).drivers) <= 3
+    assert [driver["feature"] for driver in five[:3]] == [driver["feature"] for driver in scorer.score(scenario).drivers]
+    impacts = [abs(driver["impact"]) for driver in five]
+    assert impacts == sorted(impacts, reverse=True)
+
+
+def test_explain_decomposes_surrogate_linear_score():
+    from flood_ai.surrogate import SurrogateRegressor
+
+    names = list(FloodRiskScorer().feature_names)
+    model = SurrogateRegressor(names)
+    samples = np.random.default_rng(3).uniform(0, 100, size=(6, len(names)))
+    bias, contributions = model.feature_contributions(samples)
+    np.testing.assert_allclose(bias + contributions.sum(axis=1), model._reduce(samples)[:, 0])
+    assert np.all(contributions[np.full_like(samples, 50.0) == samples] == 0)
+
+
+def test_tree_path_scales_each_batch_once(monkeypatch):
+    from pathlib import Path
+
+    from sklearn.preprocessing import StandardScaler
+
+    from flood_ai.artifact_loader import ArtifactBundle
+
+    names = FloodRiskScorer().feature_names
+    model, features = _forest()
+    bundle = ArtifactBundle("tree", Path("."), tuple(names), StandardScaler().fit(features * 10 + 50), model)
+    scorer = FloodRiskScorer(bundle=bundle, uncertainty=None)
+    active = scorer.active_model
+    calls = []
+    original = active._samples
+    monkeypatch.setattr(active, "_samples", lambda matrix: calls.append(matrix.shape) or original(matrix))
+    results = scorer.score_many(_scenarios(8))
+    assert calls == [(8, 20)]
+    assert all(len(result.drivers) == scorer.top_k for result in results)
@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+from flood_ai import serving, storage
+
+
+def test_worker_report_includes_memory_and_role():
+    report = serving.worker_report()
+    assert report["pid"] == os.getpid()
+    assert report["role"] == "single"
+    assert isinstance(report["memory_kb"], dict)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+def test_storage_is_not_shared_across_fork():
+    parent_store = storage.get_store()
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        fresh = storage.get_store() is not parent_store
+        os.write(write_fd, b"1" if fresh else b"0")
+        os._exit(0)
+    os.close(write_fd)
+    assert os.read(read_fd, 1) == b"1"
+    os.waitpid(pid, 0)
+
+
+def test_restart_policy_backs_off_and_gives_up():
+    policy = serving.RestartPolicy(backoff=0.5, max_backoff=2.0, max_restarts=3, window=60.0)
+    assert [policy.delay(0, t) for t in (0.0, 1.0, 2.0)] == [0.5, 1.0, 2.0]
+    assert policy.delay(1, 2.5) == 0.5  # tracked per worker
+    assert policy.delay(0, 3.0) is None  # a fourth crash within the window
+    # crashes older than the window no longer count
+    assert policy.delay(1, 100.0) == 0.5
+
+
+def test_only_one_process_runs_maintenance(monkeypatch):
+    assert serving.is_primary()
+    monkeypatch.setitem(serving._process, "role", "worker")
+    monkeypatch.setitem(serving._process, "worker_index", 1)
+    assert not serving.is_primary()
+    monkeypatch.setitem(serving._process, "worker_index", 0)
+    assert serving.is_primary()
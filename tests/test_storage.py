@@ -0,0 +1,290 @@
+import sqlite3
+import threading
+import time
+
+from flood_ai.storage import AssessmentStore
+
+
+def _record(idx):
+    return {"risk": {"district": f"D{idx}", "state": "Assam", "timestamp": f"2025-07-01T00:00:{idx % 60:02d}+00:00"}}
+
+
+def test_background_writer_groups_inserts(tmp_path):
+    store = AssessmentStore(tmp_path / "a.db", queue_size=64, batch_size=32)
+    try:
+        store.enqueue_many(_record(i) for i in range(200))
+        store.flush()
+        metrics = store.metrics()
+        assert metrics["written"] + metrics["sync_writes"] == 200
+        assert metrics["batches"] < 200
+        assert metrics["queue_depth"] == 0
+        rows = store.list(limit=5)
+        assert [row["district"] for row in rows] == ["D199", "D198", "D197", "D196", "D195"]
+        mode = sqlite3.connect(tmp_path / "a.db").execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+    finally:
+        store.close()
+
+
+def test_full_queue_falls_back_to_synchronous_write(tmp_path):
+    store = AssessmentStore(tmp_path / "b.db", queue_size=1, put_timeout=0.2)
+    gate = threading.Event()
+    original = store._write_rows
+
+    def slow_write(conn, rows):
+        # stall only the background writer so the queue stays full
+        if threading.current_thread().name == "flood-ai-storage-writer":
+            gate.wait(5)
+        original(conn, rows)
+
+    store._write_rows = slow_write
+    try:
+        started = time.perf_counter()
+        store.enqueue_many(_record(i) for i in range(50))
+        # one put_timeout for the whole call, not one per overflowing record
+        assert time.perf_counter() - started < 2.0
+        assert store.metrics()["backpressure_events"] >= 48
+        gate.set()
+        store.flush()
+        assert len(store.list(limit=100)) == 50
+    finally:
+        gate.set()
+        store.close()
+
+
+def test_close_flushes_pending_writes(tmp_path):
+    store = AssessmentStore(tmp_path / "c.db")
+    store.enqueue(_record(1))
+    store.close()
+    count = sqlite3.connect(tmp_path / "c.db").execute("SELECT COUNT(*) FROM assessments").fetchone()[0]
+    assert count == 1
+
+
+def test_writer_survives_errors_and_flush_ignores_later_rows(tmp_path):
+    store = AssessmentStore(tmp_path / "e.db")
+    original = store._write_rows
+    gates = {3: threading.Event(), 4: threading.Event()}
+    calls = []
+
+    def flaky_write(conn, rows):
+        calls.append(len(rows))
+        if len(calls) == 1:
+            raise RuntimeError("rollup bug")
+        if len(calls) in gates:
+            gates[len(calls)].wait(5)
+        original(conn, rows)
+
+    store._write_rows = flaky_write
+    try:
+        store.enqueue(_record(1))
+        store.flush()  # returns even though the batch failed
+        assert store.metrics()["write_errors"] == 1
+        store.enqueue(_record(2))
+        store.flush()
+        store.enqueue(_record(3))  # stalls in the writer
+        while len(calls) < 3:
+            threading.Event().wait(0.01)
+        reader = threading.Thread(target=store.flush)
+        reader.start()
+        reader.join(0.2)
+        assert reader.is_alive()  # row 3 was accepted before the flush
+        store.enqueue(_record(4))  # accepted after the flush started, and stalls too
+        gates[3].set()
+        reader.join(5)
+        assert not reader.is_alive()
+        gates[4].set()
+        store.flush()
+        assert [row["district"] for row in store.list(limit=5)] == ["D4", "D3", "D2"]
+    finally:
+        for gate in gates.values():
+            gate.set()
+        store.close()
+
+
+def _scored(idx, state, district, band, score, hour):
+    return {
+        "risk": {
+            "district": district,
+            "state": state,
+            "timestamp": f"2025-07-01T{hour:02d}:00:00Z",
+            "score": score,
+            "band": band,
+        }
+    }
+
+
+def test_query_filters_and_keyset_pagination(tmp_path):
+    store = AssessmentStore(tmp_path / "q.db")
+    bands = ["Low", "Moderate", "High", "Severe"]
+    try:
+        store.enqueue_many(
+            _scored(i, "Assam" if i % 2 else "Bihar", f"D{i % 3}", bands[i % 4], (i % 4) / 4 + 0.1, i % 24)
+            for i in range(40)
+        )
+        page = store.query(state="Assam", min_band="high", limit=4)
+        assert len(page["items"]) == 4
+        assert all(item["band"] in {"High", "Severe"} and item["state"] == "Assam" for item in page["items"])
+        assert "assessment" not in page["items"][0]
+        ids = [item["id"] for item in page["items"]]
+        assert ids == sorted(ids, reverse=True)
+
+        seen = list(ids)
+        while page["next_before_id"]:
+            page = store.query(state="Assam", min_band="High", limit=4, before_id=page["next_before_id"])
+            seen.extend(item["id"] for item in page["items"])
+        assert len(seen) == len(set(seen)) == 10
+
+        window = store.query(since="2025-07-01T05:00:00+00:00", until="2025-07-01T07:00:00+00:00", limit=100)
+        assert {item["timestamp"][11:13] for item in window["items"]} == {"05", "06"}
+
+        newer = store.query(after_id=38, include_payload=True)
+        assert [item["id"] for item in newer["items"]] == [39, 40]
+        assert newer["items"][0]["assessment"]["risk"]["district"] == "D2"
+        assert newer["next_after_id"] == 40
+
+        scored = store.query(min_score=0.8, max_score=1.0, limit=100)
+        assert {item["band"] for item in scored["items"]} == {"Severe"}
+    finally:
+        store.close()
+
+
+def test_legacy_database_is_migrated(tmp_path):
+    path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE assessments (id INTEGER PRIMARY KEY AUTOINCREMENT, district TEXT, state TEXT, timestamp TEXT, payload TEXT)"
+    )
+    conn.execute(
+        "INSERT INTO assessments (district, state, timestamp, payload) VALUES (?, ?, ?, ?)",
+        ("Pune", "Maharashtra", "2025-07-01T00:00:00+00:00", '{"risk": {"score": 0.6, "band": "High"}}'),
+    )
+    conn.execute(
+        "INSERT INTO assessments (district, state, timestamp, payload) VALUES (?, ?, ?, ?)",
+        ("Patna", "Bihar", "2025-07-01T03:00:00+05:30", '{"risk": {"score": 0.2, "band": "Low"}}'),
+    )
+    conn.commit()
+    conn.close()
+    store = AssessmentStore(path)
+    try:
+        page = store.query(min_band="High")
+        assert page["items"][0]["score"] == 0.6
+        assert page["items"][0]["district"] == "Pune"
+        # 03:00+05:30 is 21:30 UTC the previous day
+        earlier = store.query(until="2025-07-01T00:00:00Z")
+        assert [item["timestamp"] for item in earlier["items"]] == ["2025-06-30T21:30:00.000000+00:00"]
+        daily = store.trends(grain="daily", by="state")
+        assert {(row["bucket"][:10], row["state"]) for row in daily} == {
+            ("2025-06-30", "Bihar"),
+            ("2025-07-01", "Maharashtra"),
+        }
+    finally:
+        store.close()
+
+
+def test_feed_polls_incrementally_and_streams_commits():
+    import asyncio
+
+    from flood_ai import storage
+    from flood_ai.feed import AssessmentFeed
+
+    feed = AssessmentFeed()
+    start = feed.poll()["cursor"]
+    storage.save_assessments(_scored(i, "Assam", "Dhubri", "High", 0.6, 1) for i in range(3))
+    page = feed.poll(since_id=start)
+    assert [item["id"] for item in page["items"]] == [start + 1, start + 2, start + 3]
+    assert page["cursor"] == start + 3
+    assert feed.etag(since_id=page["cursor"]) == f'W/"{start + 3}:{start + 3}:30"'
+    assert feed.poll(since_id=page["cursor"])["items"] == []
+
+    # a truncated poll must not be answered 304 when the client asks for the next page
+    truncated = feed.poll(since_id=start, limit=2)
+    assert truncated["has_more"] and truncated["cursor"] == start + 2
+    validator = feed.etag(since_id=start, limit=2)
+    assert feed.etag(since_id=start, limit=2) == validator  # same poll, nothing new: 304
+    assert feed.etag(since_id=truncated["cursor"], limit=2) != validator
+    rest = feed.poll(since_id=truncated["cursor"], limit=2)
+    assert [item["id"] for item in rest["items"]] == [start + 3] and not rest["has_more"]
+
+    async def first_pushed_frame():
+        stream = feed.stream(last_event_id=start + 2)
+        replayed = await stream.__anext__()
+        pending = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0.05)
+        await asyncio.to_thread(storage.save_assessment, _scored(9, "Assam", "Jorhat", "Severe", 0.9, 2))
+        pushed = await asyncio.wait_for(pending, 5)
+        await stream.aclose()
+        return replayed, pushed
+
+    replayed, pushed = asyncio.run(first_pushed_frame())
+    assert replayed.startswith(f"id: {start + 3}\n")
+    assert f"id: {start + 4}\n" in pushed and '"district": "Jorhat"' in pushed
+
+    async def frame_from_other_process():
+        # another worker's store: its commits never reach this process's listeners
+        other = AssessmentStore(storage.resolve_db_path())
+        stream = AssessmentFeed(poll_interval=0.05).stream()
+        pending = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0.2)
+        await asyncio.to_thread(other.enqueue, _scored(10, "Bihar", "Patna", "High", 0.7, 3))
+        await asyncio.to_thread(other.close)
+        frame = await asyncio.wait_for(pending, 5)
+        await stream.aclose()
+        return frame
+
+    frame = asyncio.run(frame_from_other_process())
+    assert frame.startswith(f"id: {start + 5}\n") and '"district": "Patna"' in frame
+
+
+def test_rollups_track_inserts_and_survive_compaction(tmp_path):
+    from datetime import datetime, timedelta, timezone
+
+    from flood_ai.rollups import RetentionPolicy, backfill
+
+    path = tmp_path / "r.db"
+    store = AssessmentStore(path, batch_size=7)
+    bands = ["Low", "Moderate", "High", "Severe"]
+    try:
+        records = [
+            _scored(i, "Assam" if i % 2 else "Bihar", f"D{i % 3}", bands[i % 4], (i % 4) / 4 + 0.1, i % 6)
+            for i in range(48)
+        ]
+        records[0]["risk"]["timestamp"] = "2025-06-20T10:30:00+05:30"
+        store.enqueue_many(records)
+        store.enqueue(_record(1))  # no score or band
+        daily = store.trends(grain="daily")
+        assert [item["bucket"][:10] for item in daily] == ["2025-06-20", "2025-07-01"]
+        assert sum(item["count"] for item in daily) == 49
+
+        hourly = store.trends(grain="hourly", state="Assam", by="district")
+        assam = [r for r in records if r["risk"]["state"] == "Assam"]
+        assert sum(item["count"] for item in hourly) == len(assam) + 1
+        first = [r["risk"]["score"] for r in assam if r["risk"]["timestamp"].startswith("2025-07-01T01") and r["risk"]["district"] == "D1"]
+        bucket = next(item for item in hourly if item["bucket"].startswith("2025-07-01T01") and item["district"] == "D1")
+        assert bucket["mean_score"] == round(sum(first) / len(first), 6)
+        assert bucket["max_score"] == max(first)
+        assert sum(bucket["bands"].values()) == len(first)
+
+        # incremental upserts agree with a rebuild from raw rows
+        conn = sqlite3.connect(path)
+        dump = "SELECT grain, bucket, state, district, count, scored, round(score_sum, 9), score_max, low, moderate, high, severe FROM assessment_rollups ORDER BY 1, 2, 3, 4"
+        incremental = conn.execute(dump).fetchall()
+        conn.execute("DELETE FROM assessment_rollups")
+        backfill(conn)
+        assert conn.execute(dump).fetchall() == incremental
+        conn.commit()
+        conn.close()
+
+        # raw retention follows when rows were stored: July 2025 scenarios stored today stay
+        report = store.compact(RetentionPolicy(raw_days=3, hourly_days=10), now=datetime(2025, 7, 5, tzinfo=timezone.utc))
+        assert report["raw_deleted"] == 0 and report["hourly_deleted"] == 1
+        assert len(store.query(limit=100)["items"]) == 49
+
+        later = datetime.now(timezone.utc) + timedelta(days=4)
+        report = store.compact(RetentionPolicy(raw_days=3, hourly_days=None), now=later)
+        assert report["raw_deleted"] == 49
+        assert report["vacuum"] == "incremental"
+        assert store.query(limit=10)["items"] == []
+        assert sum(item["count"] for item in store.trends(grain="daily")) == 49
+        assert sqlite3.connect(path).execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    finally:
+        store.close()
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from flood_ai.input_schema import ScenarioPayload
+from flood_ai.scoring import FloodRiskScorer
+from flood_ai.uncertainty import UncertaintyEstimator, parse_sigma
+
+
+def _scenarios(scorer, count=3):
+    return [
+        ScenarioPayload(district=f"D{i}", state="Assam", **{name: 25.0 + 25 * i for name in scorer.feature_names})
+        for i in range(count)
+    ]
+
+
+def test_reports_are_deterministic_and_independent_of_the_batch():
+    scorer = FloodRiskScorer(uncertainty=UncertaintyEstimator(samples=64, sigma=8.0, seed=7))
+    scenarios = _scenarios(scorer)
+    batch = scorer.score_many(scenarios)
+    single = scorer.score(scenarios[1])
+
+    assert batch[1].uncertainty == single.uncertainty
+    report = batch[1].uncertainty
+    assert report.samples == 64
+    assert report.quantiles["p05"] <= report.quantiles["p50"] <= report.quantiles["p95"]
+    assert sum(report.band_probabilities.values()) == pytest.approx(1.0)
+    assert set(report.band_probabilities) == {"Low", "Moderate", "High", "Severe"}
+    assert "uncertainty" in batch[0].to_dict()
+    # the point estimate itself is unchanged
+    assert batch[1].score == pytest.approx(FloodRiskScorer(uncertainty=None).score(scenarios[1]).score)
+
+
+def test_samples_are_scored_in_one_predict_and_clipped(monkeypatch):
+    scorer = FloodRiskScorer(uncertainty=UncertaintyEstimator(samples=32, sigma=50.0))
+    seen = []
+    original = scorer.active_model.predict_many
+
+    def spy(matrix):
+        seen.append(matrix.copy())
+        return original(matrix)
+
+    monkeypatch.setattr(scorer.active_model, "predict_many", spy)
+    scorer.estimate_uncertainty(scorer.active_model.binding.matrix(_scenarios(scorer)))
+
+    assert len(seen) == 1
+    assert seen[0].shape == (3 * 32, len(scorer.feature_names))
+    assert seen[0].min() >= 0.0 and seen[0].max() <= 100.0
+
+
+def test_budget_caps_samples_per_scenario():
+    estimator = UncertaintyEstimator(samples=128, budget=1000, min_samples=16)
+
+    assert estimator.samples_for(4) == 128
+    assert estimator.samples_for(20) == 50
+    assert estimator.samples_for(500) == 16
+
+
+def test_floor_sampled_batches_are_chunked_within_the_budget():
+    estimator = UncertaintyEstimator(samples=32, budget=100, min_samples=16, seed=3)
+    matrix = np.linspace(0, 100, 10 * 4).reshape(10, 4)
+    calls = []
+
+    def score(rows):
+        calls.append(rows.shape[0])
+        return rows.mean(axis=1) / 100, np.zeros(rows.shape[0], dtype=np.intp)
+
+    reports = estimator.estimate(matrix, ["a", "b", "c", "d"], score, ["Low"])
+    # 10 scenarios x 16 samples = 160 rows, scored as 96 + 64
+    assert calls == [96, 64]
+    assert len(reports) == 10 and all(report.samples == 16 for report in reports)
+    single = estimator.estimate(matrix[7:8], ["a", "b", "c", "d"], score, ["Low"])[0]
+    assert single.samples == 32  # a lone scenario gets the full sample count
+
+
+def test_per_feature_sigma_accepts_aliases_and_zero_noise():
+    assert parse_sigma("4,InfrastructureDecay=0") == (4.0, {"InfrastructureDecay": 0.0})
+    estimator = UncertaintyEstimator(samples=8, sigma=3.0, feature_sigma={"InfrastructureDecay": 0.0})
+    fields = ("MonsoonIntensity", "DeterioratingInfrastructure")
+    noise = estimator.noise(fields)
+
+    assert noise.shape == (8, 2)
+    assert np.all(noise[:, 1] == 0.0)
+    assert np.any(noise[:, 0] != 0.0)
+
+
+def test_from_env_is_disabled_by_default(monkeypatch):
+    monkeypatch.delenv("FLOOD_AI_UNCERTAINTY_SAMPLES", raising=False)
+    assert UncertaintyEstimator.from_env() is None
+    monkeypatch.setenv("FLOOD_AI_UNCERTAINTY_SAMPLES", "40")
+    monkeypatch.setenv("FLOOD_AI_UNCERTAINTY_SIGMA", "2,Siltation=6")
+    estimator = UncertaintyEstimator.from_env()
+    assert estimator.samples == 40 and estimator.sigma == 2.0 and estimator.feature_sigma == {"Siltation": 6.0}
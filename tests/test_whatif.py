@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from flood_ai.input_schema import ScenarioPayload
+from flood_ai.scoring import FloodRiskScorer
+from flood_ai.storage import latest_assessment_id
+from flood_ai.whatif import SweepMode, SweepTooLarge, WhatIfAnalyzer
+
+
+def _bases(scorer):
+    return [
+        ScenarioPayload(district=f"D{i}", state="Bihar", **{name: 30.0 + 20 * i for name in scorer.feature_names})
+        for i in range(3)
+    ]
+
+
+def test_cartesian_sweep_matches_scoring_each_point():
+    scorer = FloodRiskScorer()
+    bases = _bases(scorer)
+    result = WhatIfAnalyzer(scorer).sweep(bases, {"Siltation": [88, 60], "MonsoonIntensity": [10, 50, 90]})
+
+    assert result.surfaces["*"].shape == (3, 2, 3)
+    for b, base in enumerate(bases):
+        for i, siltation in enumerate([88, 60]):
+            for j, monsoon in enumerate([10, 50, 90]):
+                point = base.model_copy(update={"Siltation": float(siltation), "MonsoonIntensity": float(monsoon)})
+                expected = scorer.score(point)
+                assert result.surfaces["*"][b, i, j] == pytest.approx(expected.score)
+                assert result.band_surfaces["*"][b, i, j] == ["Low", "Moderate", "High", "Severe"].index(expected.band.value)
+    body = result.to_dict()
+    assert body["points"] == 18
+    assert set(body["sensitivity"]) == {"Siltation", "MonsoonIntensity"}
+    assert body["sensitivity"]["MonsoonIntensity"]["slope"] > 0
+    best = body["bases"][0]["best"]
+    assert best["score"] == pytest.approx(result.surfaces["*"][0].min(), abs=1e-4)
+
+
+def test_one_at_a_time_relative_sweep_clips_and_records_nothing():
+    scorer = FloodRiskScorer()
+    bases = _bases(scorer)
+    latest = latest_assessment_id()
+    result = WhatIfAnalyzer(scorer).sweep(
+        bases, {"Urbanization": [-40, 0], "InfrastructureDecay": [60]}, mode=SweepMode.ONE_AT_A_TIME, relative=True
+    )
+
+    assert result.features == ("Urbanization", "DeterioratingInfrastructure")
+    assert result.surfaces["Urbanization"].shape == (3, 2)
+    np.testing.assert_allclose(result.surfaces["Urbanization"][:, 1], result.baseline.scores)
+    clipped = bases[2].model_copy(update={"DeterioratingInfrastructure": 100.0})
+    assert result.surfaces["DeterioratingInfrastructure"][2, 0] == pytest.approx(scorer.score(clipped).score)
+    assert latest_assessment_id() == latest
+
+
+def test_sweep_limits_and_grid_validation():
+    scorer = FloodRiskScorer()
+    analyzer = WhatIfAnalyzer(scorer, max_points=10)
+    with pytest.raises(SweepTooLarge):
+        analyzer.sweep(_bases(scorer), {"Siltation": [1, 2], "Landslides": [1, 2]})
+    with pytest.raises(ValueError, match="within"):
+        analyzer.sweep(_bases(scorer)[0], {"Siltation": [101]})
+    with pytest.raises(ValueError, match="more than once"):
+        analyzer.sweep(_bases(scorer)[0], {"DeterioratingInfrastructure": [1], "InfrastructureDecay": [2]})
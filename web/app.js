@@ -4,7 +4,9 @@ const API_BASE = currentOrigin.startsWith('http') && currentOrigin !== 'file://'
   ? currentOrigin
   : DEFAULT_API_BASE;
 const API_URL = `${API_BASE}/assess`;
-const HISTORY_URL = `${API_BASE}/history`;
+const HISTORY_FEED_URL = `${API_BASE}/history/feed`;
+const HISTORY_STREAM_URL = `${API_BASE}/history/stream`;
+const HISTORY_LIMIT = 30;
 
 const FEATURES = [
   'MonsoonIntensity',
@@ -61,9 +63,16 @@ const actionsContainer = document.getElementById('actions');
 const historyContainer = document.getElementById('history');
 const sampleBtn = document.getElementById('loadSample');
 
+// Incremental history state: newest-first items, cursor/ETag from the feed
+let historyItems = [];
+let historyCursor = null;
+let historyEtag = null;
+let historyStream = null;
+
 // Initialize map centered on India
 let map;
-let markers = [];
+// assessment id -> marker, for the entries currently in historyItems
+const markers = new Map();
 const INDIA_CENTER = [20.5937, 78.9629];
 const DEFAULT_ZOOM = 5;
 
@@ -431,15 +440,17 @@ function addMarkerToMap(assessment) {
   `;
   
   marker.bindPopup(popupContent);
-  markers.push(marker);
-  
-  // Pan to marker if it's a new assessment
-  map.setView(coords, 8, { animate: true });
+  markers.set(assessment.id, marker);
 }
 
-function clearMarkers() {
-  markers.forEach(marker => map.removeLayer(marker));
-  markers = [];
+function pruneMarkers() {
+  // drop markers of entries that fell out of the HISTORY_LIMIT window
+  const kept = new Set(historyItems.map((item) => item.id));
+  markers.forEach((marker, id) => {
+    if (kept.has(id)) return;
+    map.removeLayer(marker);
+    markers.delete(id);
+  });
 }
 
 function createFeatureControl(name) {
@@ -574,64 +585,78 @@ function renderResults(data) {
     actionList.appendChild(item);
   });
   actionsContainer.appendChild(actionList);
-  
-  // Add marker to map for current assessment
-  addMarkerToMap({
-    district: risk.district,
-    state: risk.state,
-    band: risk.band,
-    score: risk.score,
-    confidence: risk.confidence,
-    timestamp: risk.timestamp
-  });
+  // The map marker for this assessment arrives through the history feed/stream;
+  // only the user's own submission moves the map
+  map.setView(getDistrictCoords(risk.district), 8, { animate: true });
 }
 
-function renderHistory(items) {
-  if (!items || !items.length) {
+function historyRow(item) {
+  const row = document.createElement('li');
+  row.innerHTML = `
+    <div class="risk-pill ${bandClass(item.band)}">${item.band}</div>
+    <strong>${item.district}, ${item.state}</strong>
+    <p class="muted">Score ${item.score.toFixed(2)} · Confidence ${item.confidence.toFixed(1)}% · ${new Date(item.timestamp).toLocaleString()}</p>
+  `;
+  return row;
+}
+
+function renderHistory() {
+  if (!historyItems.length) {
     historyContainer.innerHTML = '<p class="muted">No prior assessments recorded in this session.</p>';
     return;
   }
   historyContainer.innerHTML = '<h3>Recent assessments</h3>';
   const list = document.createElement('ul');
   list.className = 'history-list';
-  
-  // Clear existing markers and re-add all from history
-  clearMarkers();
-  
-  items.forEach((item) => {
-    const row = document.createElement('li');
-    row.innerHTML = `
-      <div class="risk-pill ${bandClass(item.band)}">${item.band}</div>
-      <strong>${item.district}, ${item.state}</strong>
-      <p class="muted">Score ${item.score.toFixed(2)} · Confidence ${item.confidence.toFixed(1)}% · ${new Date(item.timestamp).toLocaleString()}</p>
-    `;
-    list.appendChild(row);
-    
-    // Add marker for each history item
+  historyItems.forEach((item) => list.appendChild(historyRow(item)));
+  historyContainer.appendChild(list);
+}
+
+function appendHistory(items) {
+  // items arrive oldest first; only entries past the cursor get new markers
+  const fresh = items.filter((item) => historyCursor === null || item.id > historyCursor);
+  if (!fresh.length) return;
+  fresh.forEach((item) => {
+    historyItems.unshift(item);
     addMarkerToMap(item);
   });
-  
-  historyContainer.appendChild(list);
-  
-  // Reset map view to show all markers
-  if (items.length > 0) {
-    const lastItem = items[0];
-    const coords = getDistrictCoords(lastItem.district);
-    map.setView(coords, 6, { animate: true });
-  }
+  historyCursor = fresh[fresh.length - 1].id;
+  historyItems = historyItems.slice(0, HISTORY_LIMIT);
+  pruneMarkers();
+  renderHistory();
 }
 
 async function loadHistory() {
   try {
-    const res = await fetch(HISTORY_URL);
+    const url = historyCursor === null
+      ? `${HISTORY_FEED_URL}?limit=${HISTORY_LIMIT}`
+      : `${HISTORY_FEED_URL}?since_id=${historyCursor}&limit=${HISTORY_LIMIT}`;
+    const headers = historyEtag ? { 'If-None-Match': historyEtag } : {};
+    const res = await fetch(url, { headers });
+    if (res.status === 304) return;
     if (!res.ok) throw new Error('Unable to load history');
+    historyEtag = res.headers.get('ETag');
     const data = await res.json();
-    renderHistory(data.items);
+    appendHistory(data.items);
+    if (!historyItems.length) renderHistory();
   } catch (error) {
     historyContainer.innerHTML = `<p class="muted">${error.message}</p>`;
   }
 }
 
+function subscribeHistory() {
+  // Push new assessments as they are stored; polling remains the fallback
+  if (!window.EventSource || historyStream) return;
+  historyStream = new EventSource(HISTORY_STREAM_URL);
+  historyStream.addEventListener('assessment', (event) => {
+    appendHistory([JSON.parse(event.data)]);
+  });
+  historyStream.onerror = () => {
+    historyStream.close();
+    historyStream = null;
+  };
+}
+
 async function submitScenario(event) {
   event.preventDefault();
   const submitBtn = form.querySelector('button[type="submit"]');
@@ -661,7 +686,7 @@ async function submitScenario(event) {
 
     const data = await response.json();
     renderResults(data);
-  loadHistory();
+    if (!historyStream) loadHistory();
   } catch (error) {
     riskSummary.innerHTML = `<p class="muted">${error.message}. Ensure the FastAPI server is running on ${API_URL} and CORS is enabled.</p>`;
   } finally {
@@ -679,5 +704,5 @@ sampleBtn.addEventListener('click', (event) => {
 });
 
 loadSample();
-loadHistory();
+loadHistory().then(subscribeHistory);
 